@@ -1,3 +1,5 @@
+from .circuit_breaker import CircuitBreaker
+from .codec import JSONCodec, ORJSONCodec, StandardJSONCodec
 from .context_value import get_context_value
 from .copy import (
     copy_argument,
@@ -19,9 +21,12 @@ from .copy import (
     copy_schema_types,
     copy_union,
 )
+from .deadline import set_deadline
 from .errors import UpstreamGraphQLError, raise_upstream_error
+from .fields_ownership import FieldsOwnership
 from .foreign_key_resolver import ForeignKeyResolver
 from .get_operation import get_operation
+from .hedging import HedgingPolicy
 from .merge import (
     merge_args,
     merge_enums,
@@ -38,23 +43,47 @@ from .merge import (
     merge_unions,
 )
 from .narrow_graphql_query import narrow_graphql_query
+from .operation_registry import OperationRegistry
+from .owner_policy import (
+    LatencyOwnerPolicy,
+    OwnerPolicy,
+    PrimaryOwnerPolicy,
+    WeightedOwnerPolicy,
+)
 from .proxy_resolver import ProxyResolver
 from .proxy_root_value import ProxyRootValue
 from .proxy_schema import ProxySchema
-from .query_filter import QueryFilter, QueryFilterContext
+from .query_filter import QueryFilter
+from .query_plan import QueryPlan, QueryPlanCache, SubQuery
 from .remote_schema import get_remote_schema
 from .resolvers import set_resolver, unset_resolver
 from .selections import merge_selection_sets, merge_selections
+from .transport import ProxyTransport, UpstreamSettings, get_default_transport
 from .unwrap_type import unwrap_graphql_type
 
 __all__ = [
+    "CircuitBreaker",
+    "FieldsOwnership",
     "ForeignKeyResolver",
+    "HedgingPolicy",
+    "JSONCodec",
+    "LatencyOwnerPolicy",
+    "ORJSONCodec",
+    "OperationRegistry",
+    "OwnerPolicy",
+    "PrimaryOwnerPolicy",
     "ProxyResolver",
     "ProxyRootValue",
     "ProxySchema",
+    "ProxyTransport",
     "QueryFilter",
-    "QueryFilterContext",
+    "QueryPlan",
+    "QueryPlanCache",
+    "StandardJSONCodec",
+    "SubQuery",
     "UpstreamGraphQLError",
+    "UpstreamSettings",
+    "WeightedOwnerPolicy",
     "copy_argument",
     "copy_arguments",
     "copy_argument_type",
@@ -74,6 +103,7 @@ __all__ = [
     "copy_schema_types",
     "copy_union",
     "get_context_value",
+    "get_default_transport",
     "get_operation",
     "get_remote_schema",
     "merge_args",
@@ -93,6 +123,7 @@ __all__ = [
     "merge_unions",
     "narrow_graphql_query",
     "raise_upstream_error",
+    "set_deadline",
     "set_resolver",
     "setup_root_resolver",
     "unset_resolver",
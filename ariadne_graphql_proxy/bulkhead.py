@@ -0,0 +1,110 @@
+from asyncio import Semaphore, wait_for
+from asyncio import TimeoutError as AsyncTimeoutError
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import AsyncIterator, Dict
+
+from .errors import UpstreamUnavailableError
+
+
+class BulkheadFullError(UpstreamUnavailableError):
+    code = "UPSTREAM_OVERLOADED"
+
+
+class Bulkhead:
+    max_concurrency: int
+    max_queue: int | None
+    max_wait: float | None
+
+    in_flight: int
+    queue_depth: int
+    max_queue_depth: int
+    acquired: int
+    rejected: int
+    wait_time_total: float
+    wait_time_max: float
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int | None = None,
+        max_wait: float | None = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("Bulkhead 'max_concurrency' must be greater than 0.")
+        if max_queue is not None and max_queue < 0:
+            raise ValueError("Bulkhead 'max_queue' can't be negative.")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self._semaphore = Semaphore(max_concurrency)
+
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    @asynccontextmanager
+    async def limit(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self):
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            self._record_acquired(0.0)
+            return
+
+        if self.max_queue is not None and self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise BulkheadFullError("Upstream concurrency limit exceeded.")
+
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        started_at = monotonic()
+        try:
+            if self.max_wait is not None:
+                await wait_for(self._semaphore.acquire(), self.max_wait)
+            else:
+                await self._semaphore.acquire()
+        except AsyncTimeoutError as exc:
+            self.rejected += 1
+            raise BulkheadFullError(
+                "Upstream concurrency limit exceeded, request waited too long."
+            ) from exc
+        finally:
+            self.queue_depth -= 1
+
+        self._record_acquired(monotonic() - started_at)
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def _record_acquired(self, wait_time: float):
+        self.in_flight += 1
+        self.acquired += 1
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+
+    def get_metrics(self) -> Dict[str, int | float]:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "wait_time_total": self.wait_time_total,
+            "wait_time_max": self.wait_time_max,
+            "wait_time_avg": (
+                self.wait_time_total / self.acquired if self.acquired else 0.0
+            ),
+        }
@@ -0,0 +1,176 @@
+from collections import deque
+from time import monotonic
+from typing import Any, Awaitable, Callable, Deque, Dict, Tuple
+
+from .bulkhead import BulkheadFullError
+from .errors import UpstreamUnavailableError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    code = "UPSTREAM_CIRCUIT_OPEN"
+
+
+class CircuitBreaker:
+    failure_rate_threshold: float
+    slow_call_duration: float | None
+    slow_call_rate_threshold: float
+    window_size: int
+    min_calls: int
+    open_duration: float
+    probe_calls: int
+
+    calls: int
+    failures: int
+    slow_calls: int
+    rejected: int
+    opened: int
+
+    def __init__(
+        self,
+        *,
+        failure_rate_threshold: float = 0.5,
+        slow_call_duration: float | None = None,
+        slow_call_rate_threshold: float = 1.0,
+        window_size: int = 20,
+        min_calls: int = 10,
+        open_duration: float = 30.0,
+        probe_calls: int = 1,
+    ):
+        if not 0 < failure_rate_threshold <= 1:
+            raise ValueError(
+                "Circuit breaker 'failure_rate_threshold' must be between 0 and 1."
+            )
+        if not 0 < slow_call_rate_threshold <= 1:
+            raise ValueError(
+                "Circuit breaker 'slow_call_rate_threshold' must be between 0 and 1."
+            )
+        if min_calls < 1 or min_calls > window_size:
+            raise ValueError(
+                "Circuit breaker 'min_calls' must be between 1 and 'window_size'."
+            )
+        if probe_calls < 1:
+            raise ValueError("Circuit breaker 'probe_calls' must be greater than 0.")
+
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.probe_calls = probe_calls
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._probes = 0
+        self._probe_successes = 0
+
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and monotonic() >= self._opened_at + self.open_duration:
+            self._state = HALF_OPEN
+            self._probes = 0
+            self._probe_successes = 0
+
+        return self._state
+
+    async def run(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        self.acquire()
+
+        started_at = monotonic()
+        try:
+            result = await func()
+        except (BulkheadFullError, CircuitOpenError):
+            self.release()
+            raise
+        except Exception:
+            self.record(False, monotonic() - started_at)
+            raise
+        except BaseException:
+            self.release()
+            raise
+
+        self.record(True, monotonic() - started_at)
+        return result
+
+    def acquire(self):
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._probes >= self.probe_calls):
+            self.rejected += 1
+            raise CircuitOpenError("Upstream circuit breaker is open.")
+
+        if state == HALF_OPEN:
+            self._probes += 1
+
+    def release(self):
+        if self._state == HALF_OPEN:
+            self._probes -= 1
+
+    def record(self, success: bool, duration: float):
+        is_slow = bool(
+            self.slow_call_duration is not None and duration > self.slow_call_duration
+        )
+
+        self.calls += 1
+        if not success:
+            self.failures += 1
+        if is_slow:
+            self.slow_calls += 1
+
+        if self._state == HALF_OPEN:
+            self._record_probe(success and not is_slow)
+        elif self._state == CLOSED:
+            self._window.append((success, is_slow))
+            if self._is_failing():
+                self._open()
+
+    def _record_probe(self, success: bool):
+        if not success:
+            self._open()
+            return
+
+        self._probe_successes += 1
+        if self._probe_successes >= self.probe_calls:
+            self._state = CLOSED
+            self._window.clear()
+
+    def _is_failing(self) -> bool:
+        calls = len(self._window)
+        if calls < self.min_calls:
+            return False
+
+        failures = sum(1 for success, _ in self._window if not success)
+        if failures / calls >= self.failure_rate_threshold:
+            return True
+
+        if self.slow_call_duration is None:
+            return False
+
+        slow_calls = sum(1 for _, is_slow in self._window if is_slow)
+        return slow_calls / calls >= self.slow_call_rate_threshold
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = monotonic()
+        self._window.clear()
+        self.opened += 1
+
+    def get_metrics(self) -> Dict[str, int | str]:
+        return {
+            "state": self.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "slow_calls": self.slow_calls,
+            "rejected": self.rejected,
+            "opened": self.opened,
+        }
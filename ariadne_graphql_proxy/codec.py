@@ -0,0 +1,44 @@
+import json
+from typing import Any
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # type: ignore
+
+
+class JSONCodec:
+    content_type: str = "application/json"
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError("JSON codec needs to define custom 'encode' method.")
+
+    def decode(self, value: bytes) -> Any:
+        raise NotImplementedError("JSON codec needs to define custom 'decode' method.")
+
+
+class StandardJSONCodec(JSONCodec):
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, value: bytes) -> Any:
+        return json.loads(value)
+
+
+class ORJSONCodec(JSONCodec):
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("ORJSONCodec requires 'orjson' package.")
+
+    def encode(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    def decode(self, value: bytes) -> Any:
+        return orjson.loads(value)
+
+
+def get_default_codec() -> JSONCodec:
+    if orjson is not None:
+        return ORJSONCodec()
+
+    return StandardJSONCodec()
@@ -0,0 +1,66 @@
+import gzip
+import zlib
+from typing import Callable, Dict
+
+try:
+    import brotli  # type: ignore
+except ImportError:
+    try:
+        import brotlicffi as brotli  # type: ignore
+    except ImportError:
+        brotli = None  # type: ignore
+
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None  # type: ignore
+
+
+Compressor = Callable[[bytes], bytes]
+
+
+def compress_gzip(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def compress_deflate(data: bytes) -> bytes:
+    return zlib.compress(data, 6)
+
+
+def compress_brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=4)
+
+
+def compress_zstd(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+COMPRESSORS: Dict[str, Compressor] = {
+    "gzip": compress_gzip,
+    "deflate": compress_deflate,
+    "br": compress_brotli,
+    "zstd": compress_zstd,
+}
+
+COMPRESSORS_PACKAGES = {
+    "br": "brotli",
+    "zstd": "zstandard",
+}
+
+
+def get_compressor(encoding: str) -> Compressor:
+    if encoding not in COMPRESSORS:
+        raise ValueError(
+            f"Unsupported compression '{encoding}', "
+            f"supported are: {', '.join(COMPRESSORS)}."
+        )
+
+    if (encoding == "br" and brotli is None) or (
+        encoding == "zstd" and zstandard is None
+    ):
+        raise ImportError(
+            f"'{encoding}' compression requires "
+            f"'{COMPRESSORS_PACKAGES[encoding]}' package."
+        )
+
+    return COMPRESSORS[encoding]
@@ -7,6 +7,7 @@ from ariadne_graphql_proxy.cache import (
     CacheSerializer,
     JSONCacheSerializer,
 )
+from ariadne_graphql_proxy.transport import ProxyTransport, get_default_transport
 
 
 class CloudflareCacheError(Exception):
@@ -29,6 +30,7 @@ class CloudflareCacheBackend(CacheBackend):
         headers: Dict[str, str] | None = None,
         base_url: str = "https://api.cloudflare.com/client/v4",
         serializer: CacheSerializer | None = None,
+        transport: ProxyTransport | None = None,
     ) -> None:
         super().__init__(serializer or JSONCacheSerializer())
 
@@ -36,6 +38,7 @@ class CloudflareCacheBackend(CacheBackend):
         self.account_id = account_id
         self.namespace_id = namespace_id
         self.headers = headers or {}
+        self.transport = transport or get_default_transport()
 
         self._assert_namespace_can_be_accessed()
 
@@ -49,27 +52,25 @@ class CloudflareCacheBackend(CacheBackend):
         if not response.is_success or not response.json().get("success", False):
             raise CloudflareCacheError(response)
 
+    def _get_value_url(self, key: str) -> str:
+        return (
+            f"{self.base_url.rstrip('/')}/accounts/{self.account_id}/"
+            f"storage/kv/namespaces/{self.namespace_id}/"
+            f"values/{key}"
+        )
+
     async def set(self, key: str, value: Any, ttl: int | None = None):
-        async with httpx.AsyncClient(
-            base_url=self.base_url, headers=self.headers
-        ) as client:
-            await client.put(
-                f"accounts/{self.account_id}/"
-                f"storage/kv/namespaces/{self.namespace_id}/"
-                f"values/{key}",
-                files={"value": self.serializer.serialize(value), "metadata": "{}"},
-                params={"expiration_ttl": ttl} if ttl is not None else {},
-            )
+        client = self.transport.get_client(self.base_url)
+        await client.put(
+            self._get_value_url(key),
+            headers=self.headers,
+            files={"value": self.serializer.serialize(value), "metadata": "{}"},
+            params={"expiration_ttl": ttl} if ttl is not None else {},
+        )
 
     async def get(self, key: str, default: Any = None) -> Any:
-        async with httpx.AsyncClient(
-            base_url=self.base_url, headers=self.headers
-        ) as client:
-            response = await client.get(
-                f"accounts/{self.account_id}/"
-                f"storage/kv/namespaces/{self.namespace_id}/"
-                f"values/{key}",
-            )
+        client = self.transport.get_client(self.base_url)
+        response = await client.get(self._get_value_url(key), headers=self.headers)
 
         if response.is_success:
             return self.serializer.deserialize(response.content.decode())
@@ -0,0 +1,58 @@
+from asyncio import TimeoutError as AsyncTimeoutError
+from asyncio import wait_for
+from inspect import iscoroutine
+from time import monotonic
+from typing import Any, Awaitable
+
+from httpx import TimeoutException
+
+from .errors import UpstreamUnavailableError
+
+DEADLINE_CONTEXT_KEY = "deadline"
+
+
+class UpstreamTimeoutError(UpstreamUnavailableError):
+    code = "UPSTREAM_TIMEOUT"
+
+
+def set_deadline(context: dict, timeout: float) -> float:
+    deadline = monotonic() + timeout
+    current_deadline = context.get(DEADLINE_CONTEXT_KEY)
+    if current_deadline is None or deadline < current_deadline:
+        context[DEADLINE_CONTEXT_KEY] = deadline
+        return deadline
+
+    return current_deadline
+
+
+def get_deadline(context: Any) -> float | None:
+    if isinstance(context, dict):
+        return context.get(DEADLINE_CONTEXT_KEY)
+
+    return None
+
+
+def get_remaining_time(context: Any, timeout: float | None = None) -> float | None:
+    deadline = get_deadline(context)
+    if deadline is None:
+        return timeout
+
+    remaining_time = deadline - monotonic()
+    if timeout is None:
+        return remaining_time
+
+    return min(timeout, remaining_time)
+
+
+async def run_with_timeout(awaitable: Awaitable[Any], timeout: float | None) -> Any:
+    if timeout is not None and timeout <= 0:
+        if iscoroutine(awaitable):
+            awaitable.close()
+        raise UpstreamTimeoutError("Upstream request deadline exceeded.")
+
+    try:
+        if timeout is None:
+            return await awaitable
+        return await wait_for(awaitable, timeout)
+    except (AsyncTimeoutError, TimeoutException) as exc:
+        raise UpstreamTimeoutError("Upstream request timed out.") from exc
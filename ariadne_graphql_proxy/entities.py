@@ -0,0 +1,227 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    NameNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionNode,
+    SelectionSetNode,
+    VariableDefinitionNode,
+    parse,
+)
+
+from .foreign_key_resolver import (
+    find_path_in_template,
+    get_aliased_template_field,
+    get_aliased_variable_definitions,
+    validate_template,
+)
+from .query_plan import EntityFetch
+
+EntityItem = Tuple[dict, List[str | int]]
+
+# Fields identifying entities are queried under reserved aliases, so they don't
+# conflict with fields selected by the client under the same names.
+ENTITY_TYPENAME_ALIAS = "_entity_typename"
+ENTITY_KEY_ALIAS_PREFIX = "_entity_key_"
+
+
+class EntityKey:
+    schema_id: int
+    type_name: str
+    on: List[str]
+    template: OperationDefinitionNode
+    field: FieldNode
+    path: List[str]
+
+    def __init__(self, schema_id: int, type_name: str, on: List[str], query: str):
+        template = validate_template(parse(query))
+        if template.operation != OperationType.QUERY:
+            raise ValueError("Entity query template must define a query operation.")
+        if len(template.selection_set.selections) != 1:
+            raise ValueError("Entity query template must query a single root field.")
+
+        for variable_definition in template.variable_definitions:
+            variable_name = variable_definition.variable.name.value
+            if variable_name not in on:
+                raise ValueError(
+                    f"Entity query template variable '{variable_name}' "
+                    f"is not a key field of '{type_name}'."
+                )
+
+        self.schema_id = schema_id
+        self.type_name = type_name
+        self.on = on
+        self.template = template
+        self.field = template.selection_set.selections[0]  # type: ignore
+        self.path = find_path_in_template(template.selection_set)
+
+    def get_field(self, alias: str, selections: Sequence[SelectionNode]) -> FieldNode:
+        return get_aliased_template_field(self.field, alias, selections)
+
+    def get_variable_definitions(self, alias: str) -> List[VariableDefinitionNode]:
+        return get_aliased_variable_definitions(self.template, alias)
+
+    def get_variables(self, alias: str, entity: dict) -> dict:
+        return {
+            f"{alias}_{variable_definition.variable.name.value}": entity.get(
+                get_entity_key_alias(variable_definition.variable.name.value)
+            )
+            for variable_definition in self.template.variable_definitions
+        }
+
+    def get_entity_data(self, data: Any) -> Any:
+        for field_name in self.path[1:]:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(field_name)
+        return data
+
+
+def find_entities(
+    data: Any,
+    path: Sequence[str],
+    type_name: str,
+    data_path: List[str | int],
+    entities: List[EntityItem],
+):
+    if isinstance(data, list):
+        for index, item in enumerate(data):
+            find_entities(item, path, type_name, [*data_path, index], entities)
+    elif not isinstance(data, dict):
+        return
+    elif not path:
+        if data.get(ENTITY_TYPENAME_ALIAS) == type_name:
+            entities.append((data, data_path))
+    elif path[0] in data:
+        find_entities(
+            data[path[0]], path[1:], type_name, [*data_path, path[0]], entities
+        )
+
+
+def strip_entity_fields(data: Any, path: Sequence[str]):
+    if isinstance(data, list):
+        for item in data:
+            strip_entity_fields(item, path)
+    elif not isinstance(data, dict):
+        return
+    elif not path:
+        for key in [key for key in data if is_entity_alias(key)]:
+            del data[key]
+    elif path[0] in data:
+        strip_entity_fields(data[path[0]], path[1:])
+
+
+def get_entity_key_alias(key_field: str) -> str:
+    return f"{ENTITY_KEY_ALIAS_PREFIX}{key_field}"
+
+
+def is_entity_alias(key: str) -> bool:
+    return key == ENTITY_TYPENAME_ALIAS or key.startswith(ENTITY_KEY_ALIAS_PREFIX)
+
+
+def merge_entity_data(entity: dict, data: dict):
+    # Data can be shared with other requests by coalescing, so it's copied
+    # into the entity instead of being referenced by it.
+    for key, value in data.items():
+        current_value = entity.get(key)
+        if isinstance(current_value, dict) and isinstance(value, dict):
+            merge_entity_data(current_value, value)
+        elif (
+            isinstance(current_value, list)
+            and isinstance(value, list)
+            and len(current_value) == len(value)
+        ):
+            for index, item in enumerate(value):
+                if isinstance(current_value[index], dict) and isinstance(item, dict):
+                    merge_entity_data(current_value[index], item)
+                else:
+                    current_value[index] = copy_data(item)
+        else:
+            entity[key] = copy_data(value)
+
+
+def copy_data(data: Any) -> Any:
+    if isinstance(data, dict):
+        return {key: copy_data(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [copy_data(item) for item in data]
+    return data
+
+
+class EntitiesQuery:
+    operation_name: str
+    fields: List[FieldNode]
+    variable_definitions: Dict[str, VariableDefinitionNode]
+    variables: dict
+    entities: Dict[str, Tuple[EntityKey, EntityFetch, List[EntityItem]]]
+
+    def __init__(self, operation_name: str | None):
+        self.operation_name = f"{operation_name or ''}Entities"
+        self.fields = []
+        self.variable_definitions = {}
+        self.variables = {}
+        self.entities = {}
+        self._aliases: Dict[Tuple[int, Tuple[Any, ...]], str] = {}
+
+    def add_entity(
+        self,
+        entity_key: EntityKey,
+        entity_fetch: EntityFetch,
+        entity: dict,
+        entity_path: List[str | int],
+    ):
+        key_values = tuple(
+            entity.get(get_entity_key_alias(key_field)) for key_field in entity_key.on
+        )
+        if None in key_values:
+            return
+
+        # Same entity referenced in many places of result is queried once
+        alias_key = (id(entity_fetch), key_values)
+        if alias_key in self._aliases:
+            self.entities[self._aliases[alias_key]][2].append((entity, entity_path))
+            return
+
+        alias = f"_{len(self.fields)}"
+        self._aliases[alias_key] = alias
+        self.entities[alias] = (entity_key, entity_fetch, [(entity, entity_path)])
+        self.fields.append(entity_key.get_field(alias, entity_fetch.selections))
+        self.variables.update(entity_key.get_variables(alias, entity))
+        for variable_definition in entity_key.get_variable_definitions(alias):
+            self.variable_definitions[variable_definition.variable.name.value] = (
+                variable_definition
+            )
+        for variable_definition in entity_fetch.variable_definitions:
+            self.variable_definitions[variable_definition.variable.name.value] = (
+                variable_definition
+            )
+
+    def get_document(self) -> DocumentNode:
+        return DocumentNode(
+            definitions=(
+                OperationDefinitionNode(
+                    operation=OperationType.QUERY,
+                    name=NameNode(value=self.operation_name),
+                    variable_definitions=tuple(self.variable_definitions.values()),
+                    selection_set=SelectionSetNode(selections=tuple(self.fields)),
+                ),
+            )
+        )
+
+    def get_variables(self, variables: dict | None) -> dict:
+        operation_variables = {
+            variable_name: variables[variable_name]
+            for variable_name in self.variable_definitions
+            if variables and variable_name in variables
+        }
+        return {**operation_variables, **self.variables}
+
+    def get_error_path(self, error_path: List[str | int]) -> List[str | int] | None:
+        if not error_path or error_path[0] not in self.entities:
+            return None
+
+        entity_key, _, entities = self.entities[error_path[0]]  # type: ignore
+        return [*entities[0][1], *error_path[len(entity_key.path) :]]
@@ -8,6 +8,30 @@ class UpstreamGraphQLError(GraphQLError):
     pass
 
 
+class UpstreamUnavailableError(Exception):
+    code = "UPSTREAM_UNAVAILABLE"
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+class UpstreamConnectionError(UpstreamUnavailableError):
+    code = "UPSTREAM_CONNECTION_ERROR"
+
+
+class UpstreamInvalidResponseError(UpstreamUnavailableError):
+    code = "UPSTREAM_INVALID_RESPONSE"
+
+
+class UpstreamServerError(UpstreamUnavailableError):
+    code = "UPSTREAM_SERVER_ERROR"
+
+    def __init__(self, message: str, data: Any):
+        super().__init__(message)
+        self.data = data
+
+
 def raise_upstream_error(response: Response):
     upstream_response: Dict[str, Any] = {"status_code": response.status_code}
     try:
@@ -0,0 +1,155 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+from warnings import warn
+
+from graphql import SelectionSetNode
+
+
+class FieldsOwnership:
+    types: Dict[str, Dict[str, int]]
+    owners: Dict[str, int]
+    wholly_owned: Dict[str, int]
+
+    def __init__(
+        self,
+        fields_masks: Dict[str, Dict[str, int]],
+        fields_types: Dict[str, Dict[str, str]] | None = None,
+        unions: Dict[str, List[str]] | None = None,
+        foreign_keys: Dict[str, Dict[str, List[str]]] | None = None,
+        dependencies: Dict[int, Dict[str, Dict[str, SelectionSetNode]]] | None = None,
+    ):
+        if is_fields_map(fields_masks):
+            warn(
+                "Passing sets of schema IDs as fields ownership is deprecated. "
+                "Pass schema masks instead.",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            fields_masks = get_fields_masks(fields_masks)  # type: ignore
+
+        masks: Dict[int, int] = {}
+        self.types = fields_masks
+        self.owners = {}
+
+        for type_name, type_fields in fields_masks.items():
+            for field_name, mask in type_fields.items():
+                # Reuse same int objects for repeated masks to keep index small
+                type_fields[field_name] = masks.setdefault(mask, mask)
+
+            self.owners[type_name] = get_fields_mask(type_fields.values())
+
+        self.wholly_owned = get_wholly_owned_types(
+            self.types,
+            fields_types or {},
+            unions or {},
+            foreign_keys or {},
+            dependencies or {},
+        )
+
+    def get_type_fields(self, type_name: str) -> Dict[str, int]:
+        return self.types.get(type_name, {})
+
+    def get_field_mask(self, type_name: str, field_name: str) -> int:
+        return self.types.get(type_name, {}).get(field_name, 0)
+
+    def is_owner(self, type_name: str, field_name: str, schema_id: int) -> bool:
+        return bool(self.get_field_mask(type_name, field_name) >> schema_id & 1)
+
+    def get_wholly_owning_schema(self, type_name: str) -> int | None:
+        return self.wholly_owned.get(type_name)
+
+
+def is_fields_map(fields: Dict[str, Dict[str, Any]]) -> bool:
+    return any(
+        isinstance(owners, set)
+        for type_fields in fields.values()
+        for owners in type_fields.values()
+    )
+
+
+def get_fields_masks(
+    fields_map: Dict[str, Dict[str, Set[int]]],
+) -> Dict[str, Dict[str, int]]:
+    return {
+        type_name: {
+            field_name: get_schemas_mask(field_owners)
+            for field_name, field_owners in type_fields.items()
+        }
+        for type_name, type_fields in fields_map.items()
+    }
+
+
+def get_schemas_mask(schema_ids: Iterable[int]) -> int:
+    mask = 0
+    for schema_id in schema_ids:
+        mask |= 1 << schema_id
+    return mask
+
+
+def get_fields_mask(masks: Iterable[int]) -> int:
+    type_mask = 0
+    for mask in masks:
+        type_mask |= mask
+    return type_mask
+
+
+@lru_cache(maxsize=1024)
+def get_schema_ids(mask: int) -> Tuple[int, ...]:
+    schema_ids = []
+    schema_id = 0
+    while mask:
+        if mask & 1:
+            schema_ids.append(schema_id)
+        mask >>= 1
+        schema_id += 1
+    return tuple(schema_ids)
+
+
+def get_single_schema_id(mask: int) -> int | None:
+    if not mask or mask & (mask - 1):
+        return None
+    return mask.bit_length() - 1
+
+
+def get_wholly_owned_types(
+    types: Dict[str, Dict[str, int]],
+    fields_types: Dict[str, Dict[str, str]],
+    unions: Dict[str, List[str]],
+    foreign_keys: Dict[str, Dict[str, List[str]]],
+    dependencies: Dict[int, Dict[str, Dict[str, SelectionSetNode]]],
+) -> Dict[str, int]:
+    # Type is wholly owned by schema if that schema is the only owner of all
+    # its fields and of all types reachable from them, so its selections can
+    # be sent to the schema without being filtered.
+    wholly_owned: Dict[str, int] = {}
+    for type_name, type_fields in types.items():
+        schema_id = get_single_schema_id(get_fields_mask(type_fields.values()))
+        if (
+            schema_id is not None
+            and fields_types.get(type_name, {}).keys() == type_fields.keys()
+            and type_name not in foreign_keys
+            and type_name not in dependencies.get(schema_id, {})
+            and all(mask == 1 << schema_id for mask in type_fields.values())
+        ):
+            wholly_owned[type_name] = schema_id
+
+    changed = True
+    while changed:
+        changed = False
+        for type_name, schema_id in list(wholly_owned.items()):
+            for field_type in fields_types[type_name].values():
+                if field_type in unions or (
+                    field_type in types and wholly_owned.get(field_type) != schema_id
+                ):
+                    del wholly_owned[type_name]
+                    changed = True
+                    break
+
+    return wholly_owned
+
+
+def select_owner(mask: int, ranking: Sequence[int]) -> int:
+    for schema_id in ranking:
+        if mask >> schema_id & 1:
+            return 1 << schema_id
+    return mask & -mask
@@ -1,4 +1,8 @@
-from typing import Any, Callable, Dict, List, cast
+import re
+from asyncio import Future, Task, get_running_loop, shield
+from collections import OrderedDict
+from json import dumps
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Set, Tuple, cast
 
 from graphql import (
     DocumentNode,
@@ -6,17 +10,54 @@ from graphql import (
     FragmentSpreadNode,
     GraphQLResolveInfo,
     NameNode,
+    Node,
     OperationDefinitionNode,
     SelectionNode,
     SelectionSetNode,
+    VariableDefinitionNode,
+    VariableNode,
+    Visitor,
     parse,
     print_ast,
+    visit,
 )
+from httpx import Response
 
 from .cache import CacheBackend
+from .errors import UpstreamGraphQLError, raise_upstream_error
+from .hedging import HedgingPolicy
 from .proxy_resolver import ProxyResolver
+from .transport import ProxyTransport
 
 FIELDS_PLACEHOLDER = "__FIELDS"
+FIELDS_PLACEHOLDER_BLOCK = re.compile(r"\{\n  ( *)" + FIELDS_PLACEHOLDER + r"\n\1\}")
+TEMPLATE_QUERIES_CACHE_SIZE = 128
+
+
+class ForeignKeyBatch:
+    info: GraphQLResolveInfo
+    fields: List[FieldNode]
+    variables: dict
+    futures: Dict[Hashable, Tuple[str, Future]]
+    dispatched: bool
+
+    def __init__(self, info: GraphQLResolveInfo):
+        self.info = info
+        self.fields = []
+        self.variables = {}
+        self.futures = {}
+        self.dispatched = False
+
+
+class TemplateQuery:
+    selections: Tuple[SelectionNode, ...]
+    query: str
+    operation: OperationDefinitionNode | None
+
+    def __init__(self, selections: Tuple[SelectionNode, ...], query: str):
+        self.selections = selections
+        self.query = query
+        self.operation = None
 
 
 class ForeignKeyResolver(ProxyResolver):
@@ -24,6 +65,13 @@ class ForeignKeyResolver(ProxyResolver):
     _operation_name: str
     _path: List[str]
     _variables: Dict[str, str] | None
+    _batch: bool
+    _batch_window: float
+    _max_batch_size: int
+    _batches: Dict[Hashable, ForeignKeyBatch]
+    _batch_tasks: Set[Task]
+    _printed_template: Tuple[str, str, str] | None
+    _queries: OrderedDict[Tuple[str, ...], TemplateQuery]
 
     def __init__(
         self,
@@ -34,23 +82,55 @@ class ForeignKeyResolver(ProxyResolver):
         cache: CacheBackend | None = None,
         cache_key: str | Callable[[GraphQLResolveInfo], str] | None = None,
         cache_ttl: int | None = None,
+        transport: ProxyTransport | None = None,
+        coalesce_requests: bool = False,
+        timeout: float | None = None,
+        hedging: HedgingPolicy | None = None,
+        persisted_queries: bool = False,
+        memoize_requests: bool = True,
+        batch: bool = False,
+        batch_window: float = 0.0,
+        max_batch_size: int = 100,
     ):
         parsed_template = parse(template)
 
         self._template = validate_template(parsed_template)
         self._operation_name = cast(NameNode, self._template.name).value
         self._path = find_path_in_template(self._template.selection_set)
+        self._printed_template = split_printed_template(self._template)
+        self._queries = OrderedDict()
+
+        if batch and len(self._template.selection_set.selections) != 1:
+            raise ValueError("Batched query template must query single root field.")
+        if max_batch_size < 1:
+            raise ValueError("Foreign key 'max_batch_size' must be greater than 0.")
+
+        self._batch = batch
+        self._batch_window = batch_window
+        self._max_batch_size = max_batch_size
+        self._batches = {}
+        self._batch_tasks = set()
 
         if variables is not None:
             self._variables = variables
         else:
             self._variables = get_variables_from_template(self._template)
 
-        super().__init__(url, proxy_headers, cache, cache_key, cache_ttl)
+        super().__init__(
+            url,
+            proxy_headers,
+            cache,
+            cache_key,
+            cache_ttl,
+            transport=transport,
+            coalesce_requests=coalesce_requests,
+            timeout=timeout,
+            hedging=hedging,
+            persisted_queries=persisted_queries,
+            memoize_requests=memoize_requests,
+        )
 
     async def __call__(self, obj: Any, info: GraphQLResolveInfo, **arguments) -> Any:
-        operation_node = make_final_operation(self._template, info)
-
         if isinstance(obj, dict):
             data = obj.get(info.field_name)
         else:
@@ -64,27 +144,203 @@ class ForeignKeyResolver(ProxyResolver):
                 else:
                     variables[var_name] = getattr(data, attr_name)
 
+        template_query = self.get_template_query(info)
         payload = {
             "operationName": self._operation_name,
-            "query": print_ast(operation_node),
+            "query": template_query.query,
             "variables": variables,
         }
 
         if self._cache:
+            if not template_query.operation:
+                template_query.operation = make_final_operation(self._template, info)
             return await self.proxy_query_with_cache(
-                data, info, payload, operation_node
+                data, info, payload, template_query.operation
             )
 
         return await self.proxy_query(data, info, payload)
 
-    def get_field_data(self, info: GraphQLResolveInfo, data: dict) -> Any | None:
-        for field_name in self._path:
-            if field_name in data:
-                data = data[field_name]
+    def get_template_query(self, info: GraphQLResolveInfo) -> TemplateQuery:
+        # Query only depends on the field's selection and used fragments,
+        # so it's cached by their source and reused between requests.
+        cache_key = get_selection_key(info)
+        template_query = self._queries.get(cache_key)
+        if template_query:
+            self._queries.move_to_end(cache_key)
+            return template_query
+
+        selections = get_field_selections(info)
+        if self._printed_template and selections:
+            prefix, indent, suffix = self._printed_template
+            printed_fields = print_ast(SelectionSetNode(selections=selections))
+            query = prefix + printed_fields.replace("\n", "\n" + indent) + suffix
+        else:
+            query = print_ast(make_final_operation(self._template, info))
+
+        template_query = TemplateQuery(selections, query)
+        self._queries[cache_key] = template_query
+        while len(self._queries) > TEMPLATE_QUERIES_CACHE_SIZE:
+            self._queries.popitem(last=False)
+
+        return template_query
+
+    def can_fold_into(self, url: str | None, headers: dict | Callable | None) -> bool:
+        return False
+
+    async def proxy_query(
+        self, obj: Any, info: GraphQLResolveInfo, payload: dict
+    ) -> Any:
+        if not self._batch:
+            return await super().proxy_query(obj, info, payload)
+
+        return await self.batch_query(info, payload["variables"])
+
+    async def batch_query(self, info: GraphQLResolveInfo, variables: dict) -> Any:
+        # Lookups are batched for single GraphQL request and proxied headers
+        proxy_headers = self.get_proxy_headers(info)
+        batch_key = (id(info.context), tuple(sorted((proxy_headers or {}).items())))
+        batch = self._batches.get(batch_key)
+        if batch is None:
+            batch = ForeignKeyBatch(info)
+            self._batches[batch_key] = batch
+
+            loop = get_running_loop()
+            if self._batch_window:
+                loop.call_later(self._batch_window, self.dispatch, batch_key, batch)
             else:
-                return None
+                loop.call_soon(self.dispatch, batch_key, batch)
 
-        return data
+        lookup_key = (
+            tuple(id(field_node) for field_node in info.field_nodes),
+            dumps(variables, sort_keys=True, default=str),
+        )
+        if lookup_key not in batch.futures:
+            alias = f"_{len(batch.fields)}"
+            batch.futures[lookup_key] = (alias, get_running_loop().create_future())
+            batch.fields.append(
+                get_aliased_template_field(
+                    self._template.selection_set.selections[0],  # type: ignore
+                    alias,
+                    self.get_template_query(info).selections,
+                )
+            )
+            batch.variables.update(
+                {f"{alias}_{name}": value for name, value in variables.items()}
+            )
+
+            if len(batch.futures) >= self._max_batch_size:
+                self.dispatch(batch_key, batch)
+
+        _, future = batch.futures[lookup_key]
+        # Future is shared by all lookups of same key, so cancelling one of
+        # them can't cancel others
+        return await shield(future)
+
+    def dispatch(self, batch_key: Hashable, batch: ForeignKeyBatch):
+        if self._batches.get(batch_key) is batch:
+            del self._batches[batch_key]
+        if not batch.dispatched:
+            batch.dispatched = True
+            # Reference to the task is kept until it's done so it's not
+            # garbage collected while lookups are waiting for its result.
+            task = get_running_loop().create_task(self.fetch_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def fetch_batch(self, batch: ForeignKeyBatch):
+        try:
+            payload = self.get_batch_payload(batch)
+            response_json = await self.fetch_response(batch.info, payload)
+            self.set_batch_results(batch, response_json)
+        except BaseException as error:
+            if isinstance(error, Exception):
+                fail_batch(batch, error)
+            else:
+                fail_batch(batch, UpstreamGraphQLError("Upstream request cancelled."))
+                raise
+        finally:
+            fail_batch(batch, UpstreamGraphQLError("Upstream service error"))
+
+    def get_batch_payload(self, batch: ForeignKeyBatch) -> dict:
+        variable_definitions: List[VariableDefinitionNode] = []
+        for alias, _ in batch.futures.values():
+            variable_definitions += get_aliased_variable_definitions(
+                self._template, alias
+            )
+
+        operation_node = OperationDefinitionNode(
+            name=self._template.name,
+            directives=self._template.directives,
+            variable_definitions=tuple(variable_definitions),
+            operation=self._template.operation,
+            selection_set=SelectionSetNode(selections=tuple(batch.fields)),
+        )
+        return {
+            "operationName": self._operation_name,
+            "query": print_ast(operation_node),
+            "variables": batch.variables,
+        }
+
+    def set_batch_results(self, batch: ForeignKeyBatch, response_json: dict):
+        data = response_json.get("data")
+        errors = response_json.get("errors")
+        if not isinstance(errors, list):
+            errors = []
+
+        for alias, future in batch.futures.values():
+            if future.done():
+                continue
+
+            # Errors without path apply to all lookups in the batch
+            alias_errors = [
+                error
+                for error in errors
+                if not isinstance(error, dict)
+                or not error.get("path")
+                or error["path"][0] == alias
+            ]
+            if alias_errors or not isinstance(data, dict):
+                future.set_exception(
+                    UpstreamGraphQLError(
+                        "Upstream service error",
+                        extensions={
+                            "upstream_response": {
+                                "json": {"data": None, "errors": alias_errors}
+                            }
+                        },
+                    )
+                )
+            else:
+                future.set_result(get_data_from_path(data.get(alias), self._path[1:]))
+
+    def validate_response(self, r: Response, response_json: Any) -> dict:
+        if not self._batch:
+            return super().validate_response(r, response_json)
+
+        # Errors in response to batched query are set for lookups they belong to
+        if r.status_code != 200 or not isinstance(response_json, dict):
+            raise_upstream_error(r)
+
+        return response_json
+
+    def get_field_data(self, info: GraphQLResolveInfo, data: dict) -> Any | None:
+        return get_data_from_path(data, self._path)
+
+
+def fail_batch(batch: ForeignKeyBatch, error: Exception):
+    for _, future in batch.futures.values():
+        if not future.done():
+            future.set_exception(error)
+
+
+def get_data_from_path(data: Any, path: Sequence[str]) -> Any | None:
+    for field_name in path:
+        if isinstance(data, dict) and field_name in data:
+            data = data[field_name]
+        else:
+            return None
+
+    return data
 
 
 def validate_template(template: DocumentNode) -> OperationDefinitionNode:
@@ -111,6 +367,24 @@ def validate_template(template: DocumentNode) -> OperationDefinitionNode:
     return template.definitions[0]
 
 
+def split_printed_template(
+    template: OperationDefinitionNode,
+) -> Tuple[str, str, str] | None:
+    # Printed template is split around the placeholder's selection set, which
+    # is replaced by printed fields indented to the placeholder's depth.
+    printed_template = print_ast(template)
+    placeholders = list(FIELDS_PLACEHOLDER_BLOCK.finditer(printed_template))
+    if len(placeholders) != 1:
+        return None
+
+    placeholder = placeholders[0]
+    return (
+        printed_template[: placeholder.start()],
+        placeholder.group(1),
+        printed_template[placeholder.end() :],
+    )
+
+
 def count_template_fields_placeholders(selection_set: SelectionSetNode) -> int:
     results = 0
 
@@ -187,6 +461,92 @@ def copy_selection_set(
     return SelectionSetNode(selections=tuple(selections))
 
 
+def get_field_selections(info: GraphQLResolveInfo) -> Tuple[SelectionNode, ...]:
+    for field in info.field_nodes:
+        if field.name.value == info.field_name and field.selection_set:
+            return copy_selection_set(field.selection_set, info).selections
+    return ()
+
+
+def get_selection_key(info: GraphQLResolveInfo) -> Tuple[str, ...]:
+    for field in info.field_nodes:
+        if field.name.value == info.field_name and field.selection_set:
+            selection_source = get_node_source(field.selection_set)
+            if "..." not in selection_source:
+                return (selection_source,)
+
+            return (
+                selection_source,
+                *(get_node_source(fragment) for fragment in info.fragments.values()),
+            )
+
+    return ()
+
+
+def get_node_source(node: Node) -> str:
+    if node.loc:
+        return node.loc.source.body[node.loc.start : node.loc.end]
+
+    return print_ast(node)
+
+
+def get_aliased_template_field(
+    field: FieldNode, alias: str, selections: Sequence[SelectionNode]
+) -> FieldNode:
+    return visit(field, AliasedTemplateFieldBuilder(alias, selections))
+
+
+def get_aliased_variable_definitions(
+    template: OperationDefinitionNode, alias: str
+) -> List[VariableDefinitionNode]:
+    return [
+        VariableDefinitionNode(
+            variable=VariableNode(
+                name=NameNode(
+                    value=f"{alias}_{variable_definition.variable.name.value}"
+                )
+            ),
+            type=variable_definition.type,
+            default_value=variable_definition.default_value,
+        )
+        for variable_definition in template.variable_definitions
+    ]
+
+
+class AliasedTemplateFieldBuilder(Visitor):
+    def __init__(self, alias: str, selections: Sequence[SelectionNode]):
+        super().__init__()
+        self.alias = alias
+        self.selections = tuple(selections)
+        self.is_root = True
+
+    def enter_field(self, node: FieldNode, *_):
+        if not self.is_root:
+            return None
+
+        self.is_root = False
+        return FieldNode(
+            alias=NameNode(value=self.alias),
+            name=node.name,
+            arguments=node.arguments,
+            directives=node.directives,
+            selection_set=node.selection_set,
+        )
+
+    def enter_variable(self, node: VariableNode, *_):
+        return VariableNode(name=NameNode(value=f"{self.alias}_{node.name.value}"))
+
+    def leave_selection_set(self, node: SelectionSetNode, *_):
+        for selection in node.selections:
+            if (
+                isinstance(selection, FieldNode)
+                and selection.name.value == FIELDS_PLACEHOLDER
+            ):
+                return SelectionSetNode(selections=self.selections)
+
+        return None
+
+
 def copy_template_field(field: FieldNode, info: GraphQLResolveInfo) -> FieldNode:
     if field.selection_set:
         selection_set = copy_selection_set(field.selection_set, info)
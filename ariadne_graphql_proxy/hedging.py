@@ -0,0 +1,86 @@
+from asyncio import FIRST_COMPLETED, Task, ensure_future, wait
+from collections import deque
+from time import monotonic
+from typing import Any, Awaitable, Callable, Deque, Set
+
+
+class HedgingPolicy:
+    delay: float | None
+    percentile: float | None
+    budget: float
+    max_tokens: float
+    min_samples: int
+
+    requests: int
+    hedges: int
+
+    def __init__(
+        self,
+        delay: float | None = None,
+        *,
+        percentile: float | None = None,
+        budget: float = 0.1,
+        max_tokens: float = 10.0,
+        min_samples: int = 20,
+        max_samples: int = 1000,
+    ):
+        if delay is None and percentile is None:
+            raise ValueError("Hedging policy requires either 'delay' or 'percentile'.")
+        if percentile is not None and not 0 < percentile < 100:
+            raise ValueError("Hedging 'percentile' must be between 0 and 100.")
+
+        self.delay = delay
+        self.percentile = percentile
+        self.budget = budget
+        self.max_tokens = max_tokens
+        self.min_samples = min_samples
+
+        self._latencies: Deque[float] = deque(maxlen=max_samples)
+        self._tokens = max_tokens
+
+        self.requests = 0
+        self.hedges = 0
+
+    def get_delay(self) -> float | None:
+        if self.percentile is not None and len(self._latencies) >= self.min_samples:
+            latencies = sorted(self._latencies)
+            index = int(len(latencies) * self.percentile / 100)
+            return latencies[min(index, len(latencies) - 1)]
+
+        return self.delay
+
+    def record_latency(self, latency: float):
+        self._latencies.append(latency)
+
+    def can_hedge(self) -> bool:
+        return self._tokens >= 1
+
+    async def run(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        self.requests += 1
+        self._tokens = min(self._tokens + self.budget, self.max_tokens)
+
+        started_at = monotonic()
+        tasks: Set[Task] = {ensure_future(func())}
+        error: BaseException | None = None
+
+        try:
+            delay = self.get_delay()
+            if delay is not None:
+                done, _ = await wait(tasks, timeout=delay)
+                if not done and self.can_hedge():
+                    self._tokens -= 1
+                    self.hedges += 1
+                    tasks.add(ensure_future(func()))
+
+            while tasks:
+                done, tasks = await wait(tasks, return_when=FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        self.record_latency(monotonic() - started_at)
+                        return task.result()
+
+            raise error  # type: ignore
+        finally:
+            for task in tasks:
+                task.cancel()
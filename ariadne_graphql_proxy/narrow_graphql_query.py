@@ -1,4 +1,5 @@
-from typing import Dict, List, Set, Tuple
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Set, Tuple
 
 from graphql import (
     FieldNode,
@@ -10,40 +11,125 @@ from graphql import (
     SelectionNode,
     SelectionSetNode,
     VariableNode,
+    print_ast,
 )
 
+NARROWED_QUERIES_CACHE_SIZE = 1024
+
+
+class NarrowedQuery:
+    operation: OperationDefinitionNode
+    variables: FrozenSet[str]
+
+    def __init__(self, operation: OperationDefinitionNode, variables: FrozenSet[str]):
+        self.operation = operation
+        self.variables = variables
+        self._query: str | None = None
+
+    @property
+    def query(self) -> str:
+        if self._query is None:
+            self._query = print_ast(self.operation)
+        return self._query
+
+
+NarrowedQueryKey = Tuple[str, str | None, Tuple[str, ...]]
+
+
+class NarrowedQueryCache:
+    max_size: int
+
+    def __init__(self, max_size: int = NARROWED_QUERIES_CACHE_SIZE):
+        if max_size < 1:
+            raise ValueError("Narrowed query cache 'max_size' must be greater than 0.")
+
+        self.max_size = max_size
+        self._queries: OrderedDict[NarrowedQueryKey, NarrowedQuery] = OrderedDict()
+
+    def get(self, key: NarrowedQueryKey) -> NarrowedQuery | None:
+        narrowed_query = self._queries.get(key)
+        if narrowed_query:
+            self._queries.move_to_end(key)
+        return narrowed_query
+
+    def set(self, key: NarrowedQueryKey, narrowed_query: NarrowedQuery):
+        self._queries[key] = narrowed_query
+        self._queries.move_to_end(key)
+        while len(self._queries) > self.max_size:
+            self._queries.popitem(last=False)
+
+    def clear(self):
+        self._queries.clear()
+
 
 def narrow_graphql_query(
     info: GraphQLResolveInfo,
 ) -> Tuple[OperationDefinitionNode, Set[str]]:
-    variables: List[str] = []
+    narrowed_query = get_narrowed_query(info)
+    return narrowed_query.operation, set(narrowed_query.variables)
+
 
+def get_narrowed_query(
+    info: GraphQLResolveInfo, cache: NarrowedQueryCache | None = None
+) -> NarrowedQuery:
     # Remove ints from path
-    clean_path = [
+    clean_path = tuple(
         path_item for path_item in info.path.as_list() if not isinstance(path_item, int)
-    ]
+    )
+
+    cache_key = get_narrowed_query_key(info.operation, clean_path)
+    if not cache or not cache_key:
+        return narrow_operation(info.operation, info.fragments, clean_path)
+
+    # Narrowed query is same for every item of the list and every request
+    # sending the same query, so it's cached by query text and path without
+    # list indexes.
+    narrowed_query = cache.get(cache_key)
+    if not narrowed_query:
+        narrowed_query = narrow_operation(info.operation, info.fragments, clean_path)
+        cache.set(cache_key, narrowed_query)
+
+    return narrowed_query
+
+
+def get_narrowed_query_key(
+    operation: OperationDefinitionNode, path: Tuple[str, ...]
+) -> NarrowedQueryKey | None:
+    if not operation.loc:
+        return None
+
+    operation_name = operation.name.value if operation.name else None
+    return operation.loc.source.body, operation_name, path
+
+
+def narrow_operation(
+    operation: OperationDefinitionNode,
+    fragments: Dict[str, FragmentDefinitionNode],
+    path: Tuple[str, ...],
+) -> NarrowedQuery:
+    variables: List[str] = []
 
     narrowed_selection_set = narrow_graphql_query_by_path(
-        clean_path,
-        info.operation.selection_set,
-        info.fragments,
+        list(path),
+        operation.selection_set,
+        fragments,
         variables,
     )
 
     variable_definitions = []
-    for variable_node in info.operation.variable_definitions:
+    for variable_node in operation.variable_definitions:
         if variable_node.variable.name.value in variables:
             variable_definitions.append(variable_node)
 
-    operation = OperationDefinitionNode(
-        name=info.operation.name,
-        directives=info.operation.directives,
+    narrowed_operation = OperationDefinitionNode(
+        name=operation.name,
+        directives=operation.directives,
         variable_definitions=tuple(variable_definitions),
         selection_set=narrowed_selection_set,
-        operation=info.operation.operation,
+        operation=operation.operation,
     )
 
-    return operation, set(variables)
+    return NarrowedQuery(narrowed_operation, frozenset(variables))
 
 
 def narrow_graphql_query_by_path(  # noqa: C901
@@ -0,0 +1,180 @@
+import json
+from typing import Any, Callable, Collection, Dict, List, Tuple, Type
+
+from graphql import (
+    DocumentNode,
+    GraphQLError,
+    GraphQLSchema,
+    parse,
+    specified_rules,
+    validate,
+)
+from graphql.validation import ASTValidationRule
+
+from .query_plan import QueryPlan, get_operations_names
+
+CreateQueryPlan = Callable[[DocumentNode, str | None], QueryPlan]
+ValidationRules = Tuple[Type[ASTValidationRule], ...]
+
+VALIDATION_RESULTS_CACHE_SIZE = 8
+
+
+class RegisteredOperation:
+    id: str
+    query: str
+    document: DocumentNode
+    plan: QueryPlan | None
+    plans: Dict[str | None, QueryPlan]
+    validation_results: Dict[ValidationRules, List[GraphQLError]]
+
+    def __init__(self, operation_id: str, query: str):
+        self.id = operation_id
+        self.query = query
+        self.document = parse(query)
+        self.plan = None
+        self.plans = {}
+        self.validation_results = {}
+
+
+class OperationRegistry:
+    allow_unregistered: bool
+
+    def __init__(
+        self,
+        operations: Dict[str, str] | None = None,
+        *,
+        allow_unregistered: bool = False,
+    ):
+        self.allow_unregistered = allow_unregistered
+
+        self._operations: Dict[str, RegisteredOperation] = {}
+        self._queries: Dict[str, RegisteredOperation] = {}
+        self._documents: Dict[int, RegisteredOperation] = {}
+        self._schema: GraphQLSchema | None = None
+        self._create_query_plan: CreateQueryPlan | None = None
+
+        if operations:
+            for operation_id, query in operations.items():
+                self.register(operation_id, query)
+
+    def register(self, operation_id: str, query: str) -> RegisteredOperation:
+        if operation_id in self._operations:
+            raise ValueError(f"Operation '{operation_id}' is already registered.")
+
+        operation = RegisteredOperation(operation_id, query)
+        self._operations[operation_id] = operation
+        self._queries[query] = operation
+        self._documents[id(operation.document)] = operation
+
+        if self._schema:
+            self.prepare_operation(operation)
+
+        return operation
+
+    def load_json(self, path: str):
+        with open(path, encoding="utf-8") as fp:
+            manifest = json.load(fp)
+
+        if isinstance(manifest, dict) and isinstance(manifest.get("operations"), list):
+            for operation in manifest["operations"]:
+                self.register(operation["id"], operation["body"])
+        elif isinstance(manifest, dict):
+            for operation_id, query in manifest.items():
+                self.register(operation_id, query)
+        else:
+            raise ValueError(f"'{path}' is not a valid operations manifest.")
+
+    def get_operation(self, operation_id: str) -> RegisteredOperation | None:
+        return self._operations.get(operation_id)
+
+    def get_document_operation(
+        self, document: DocumentNode
+    ) -> RegisteredOperation | None:
+        operation = self._documents.get(id(document))
+        if operation and operation.document is document:
+            return operation
+        return None
+
+    def prepare(
+        self,
+        schema: GraphQLSchema,
+        create_query_plan: CreateQueryPlan,
+    ):
+        self._schema = schema
+        self._create_query_plan = create_query_plan
+        for operation in self._operations.values():
+            self.prepare_operation(operation)
+
+    def prepare_operation(self, operation: RegisteredOperation):
+        if not self._schema or not self._create_query_plan:
+            return
+
+        rules = tuple(specified_rules)
+        errors = validate(self._schema, operation.document, rules)
+        operation.validation_results = {rules: errors}
+
+        if errors:
+            return
+
+        operations_names = get_operations_names(operation.document)
+        if len(operations_names) < 2:
+            operations_names = [None]
+
+        operation.plans = {
+            operation_name: self._create_query_plan(operation.document, operation_name)
+            for operation_name in operations_names
+        }
+        operation.plan = operation.plans.get(None)
+
+    def get_query_plan(
+        self, document: DocumentNode, operation_name: str | None = None
+    ) -> QueryPlan | None:
+        operation = self.get_document_operation(document)
+        if not operation:
+            return None
+        if len(operation.plans) < 2:
+            return operation.plan
+        return operation.plans.get(operation_name)
+
+    def query_parser(self, _context_value: Any, data: dict) -> DocumentNode:
+        query = data["query"]
+        operation = self._operations.get(query) or self._queries.get(query)
+        if operation:
+            return operation.document
+
+        if not self.allow_unregistered:
+            raise GraphQLError("Operation is not registered.")
+
+        return parse(query)
+
+    def query_validator(
+        self,
+        schema: GraphQLSchema,
+        document_ast: DocumentNode,
+        rules: Collection[Type[ASTValidationRule]] | None = None,
+        max_errors: int | None = None,
+        **kwargs,
+    ) -> List[GraphQLError]:
+        operation = self.get_document_operation(document_ast)
+        if not operation or max_errors is not None or schema is not self._schema:
+            return validate(schema, document_ast, rules, max_errors, **kwargs)
+
+        rules_key = tuple(rules or specified_rules)
+        if rules_key in operation.validation_results:
+            return operation.validation_results[rules_key]
+
+        errors = validate(schema, document_ast, rules_key, **kwargs)
+
+        # Rules created for every request (like Ariadne's cost validator)
+        # would never be reused, so their results are not cached.
+        if not any(is_dynamic_rule(rule) for rule in rules_key):
+            validation_results = operation.validation_results
+            validation_results[rules_key] = errors
+            while len(validation_results) > VALIDATION_RESULTS_CACHE_SIZE:
+                del validation_results[next(iter(validation_results))]
+
+        return errors
+
+
+def is_dynamic_rule(rule: Type[ASTValidationRule]) -> bool:
+    return "<locals>" in rule.__qualname__
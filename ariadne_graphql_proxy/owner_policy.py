@@ -0,0 +1,88 @@
+from random import choices
+from typing import Dict, List, Sequence, Tuple
+
+
+class OwnerPolicy:
+    def get_ranking(self, schema_ids: Sequence[int]) -> Tuple[int, ...]:
+        raise NotImplementedError(
+            "Owner policies need to define custom 'get_ranking' method."
+        )
+
+    def record_latency(self, schema_id: int, latency: float):
+        pass
+
+    def record_failure(self, schema_id: int):
+        pass
+
+
+class PrimaryOwnerPolicy(OwnerPolicy):
+    order: List[int]
+
+    def __init__(self, order: List[int] | None = None):
+        self.order = order or []
+
+    def get_ranking(self, schema_ids: Sequence[int]) -> Tuple[int, ...]:
+        ranking = [schema_id for schema_id in self.order if schema_id in schema_ids]
+        ranking += [schema_id for schema_id in schema_ids if schema_id not in ranking]
+        return tuple(ranking)
+
+
+class LatencyOwnerPolicy(OwnerPolicy):
+    decay: float
+    failure_penalty: float
+    latencies: Dict[int, float]
+
+    def __init__(self, *, decay: float = 0.2, failure_penalty: float = 10.0):
+        if not 0 < decay <= 1:
+            raise ValueError("Owner policy 'decay' must be between 0 and 1.")
+        if failure_penalty < 0:
+            raise ValueError("Owner policy 'failure_penalty' can't be negative.")
+
+        self.decay = decay
+        self.failure_penalty = failure_penalty
+        self.latencies = {}
+
+    def get_ranking(self, schema_ids: Sequence[int]) -> Tuple[int, ...]:
+        # Schemas without recorded latency are tried first
+        return tuple(
+            sorted(
+                schema_ids,
+                key=lambda schema_id: (self.latencies.get(schema_id, 0.0), schema_id),
+            )
+        )
+
+    def record_latency(self, schema_id: int, latency: float):
+        if schema_id in self.latencies:
+            self.latencies[schema_id] += self.decay * (
+                latency - self.latencies[schema_id]
+            )
+        else:
+            self.latencies[schema_id] = latency
+
+    def record_failure(self, schema_id: int):
+        self.record_latency(schema_id, self.failure_penalty)
+
+
+class WeightedOwnerPolicy(OwnerPolicy):
+    weights: Dict[int, float]
+
+    def __init__(self, weights: Dict[int, float]):
+        if any(weight < 0 for weight in weights.values()):
+            raise ValueError("Owner policy weights can't be negative.")
+
+        self.weights = weights
+
+    def get_ranking(self, schema_ids: Sequence[int]) -> Tuple[int, ...]:
+        ranking = sorted(
+            schema_ids,
+            key=lambda schema_id: (-self.weights.get(schema_id, 0.0), schema_id),
+        )
+        weights = [self.weights.get(schema_id, 0.0) for schema_id in ranking]
+        if not any(weights):
+            return tuple(ranking)
+
+        (selected,) = choices(ranking, weights)
+        return (
+            selected,
+            *(schema_id for schema_id in ranking if schema_id != selected),
+        )
@@ -0,0 +1,49 @@
+from functools import lru_cache
+from hashlib import sha256
+from typing import Any
+
+PERSISTED_QUERY_ERRORS = ("PersistedQueryNotFound", "PersistedQueryNotSupported")
+PERSISTED_QUERY_ERRORS_CODES = (
+    "PERSISTED_QUERY_NOT_FOUND",
+    "PERSISTED_QUERY_NOT_SUPPORTED",
+)
+
+
+@lru_cache(maxsize=1024)
+def get_query_hash(query: str) -> str:
+    return sha256(query.encode("utf-8")).hexdigest()
+
+
+def get_persisted_query_payload(payload: dict) -> dict:
+    persisted_payload = {key: value for key, value in payload.items() if key != "query"}
+    persisted_payload["extensions"] = {
+        **(payload.get("extensions") or {}),
+        "persistedQuery": {
+            "version": 1,
+            "sha256Hash": get_query_hash(payload["query"]),
+        },
+    }
+    return persisted_payload
+
+
+def is_persisted_query_not_found(response_json: Any) -> bool:
+    if not isinstance(response_json, dict):
+        return False
+
+    errors = response_json.get("errors")
+    if not isinstance(errors, list):
+        return False
+
+    for error in errors:
+        if not isinstance(error, dict):
+            continue
+        if error.get("message") in PERSISTED_QUERY_ERRORS:
+            return True
+        extensions = error.get("extensions")
+        if (
+            isinstance(extensions, dict)
+            and extensions.get("code") in PERSISTED_QUERY_ERRORS_CODES
+        ):
+            return True
+
+    return False
@@ -1,11 +1,31 @@
-from typing import Any, Callable, List
+from functools import partial
+from typing import Any, Awaitable, Callable, List
 
-from graphql import GraphQLResolveInfo, OperationDefinitionNode, print_ast
-from httpx import AsyncClient
+from graphql import (
+    GraphQLResolveInfo,
+    OperationDefinitionNode,
+    OperationType,
+)
+from httpx import Response
 
 from .cache import CacheBackend, get_operation_cache_key
-from .errors import raise_upstream_error
-from .narrow_graphql_query import narrow_graphql_query
+from .deadline import UpstreamTimeoutError, get_remaining_time, run_with_timeout
+from .errors import UpstreamGraphQLError, raise_upstream_error
+from .hedging import HedgingPolicy
+from .narrow_graphql_query import (
+    NARROWED_QUERIES_CACHE_SIZE,
+    NarrowedQueryCache,
+    get_narrowed_query,
+)
+from .persisted_queries import (
+    get_persisted_query_payload,
+    is_persisted_query_not_found,
+)
+from .request_memo import run_memoized
+from .singleflight import SingleFlight, get_request_key
+from .transport import ProxyTransport, get_default_transport
+
+FOLDED_FIELDS_CONTEXT_KEY = "folded_fields"
 
 
 class NoCache:
@@ -15,6 +35,13 @@ class NoCache:
 class ProxyResolver:
     _url: str
     _proxy_headers: bool | Callable | List[str] | None
+    _transport: ProxyTransport
+    _singleflight: SingleFlight | None
+    _timeout: float | None
+    _hedging: HedgingPolicy | None
+    _persisted_queries: bool
+    _memoize_requests: bool
+    _narrowed_queries: NarrowedQueryCache | None
 
     _cache: CacheBackend | None
     _cache_key: str | Callable[[GraphQLResolveInfo], str] | None
@@ -27,16 +54,41 @@ class ProxyResolver:
         cache: CacheBackend | None = None,
         cache_key: str | Callable[[GraphQLResolveInfo], str] | None = None,
         cache_ttl: int | None = None,
+        transport: ProxyTransport | None = None,
+        coalesce_requests: bool = False,
+        timeout: float | None = None,
+        hedging: HedgingPolicy | None = None,
+        persisted_queries: bool = False,
+        memoize_requests: bool = True,
+        fold_into_root: bool = False,
+        narrowed_queries_cache_size: int | None = NARROWED_QUERIES_CACHE_SIZE,
     ):
         self._url = url
         self._proxy_headers = proxy_headers
+        self._transport = transport or get_default_transport()
+        self._singleflight = SingleFlight() if coalesce_requests else None
+        self._timeout = timeout
+        self._hedging = hedging
+        self._persisted_queries = persisted_queries
+        self._memoize_requests = memoize_requests
+        self._fold_into_root = fold_into_root
+        self._narrowed_queries = (
+            NarrowedQueryCache(narrowed_queries_cache_size)
+            if narrowed_queries_cache_size
+            else None
+        )
 
         self._cache = cache
         self._cache_key = cache_key
         self._cache_ttl = cache_ttl
 
     async def __call__(self, obj: Any, info: GraphQLResolveInfo, **arguments) -> Any:
-        operation_node, variables_used = narrow_graphql_query(info)
+        if is_folded_field(info):
+            # Field was already queried by the root resolver
+            return obj.get(info.path.key) if isinstance(obj, dict) else None
+
+        narrowed_query = get_narrowed_query(info, self._narrowed_queries)
+        operation_node = narrowed_query.operation
 
         if operation_node.name:
             operation_name = operation_node.name.value
@@ -45,11 +97,11 @@ class ProxyResolver:
 
         payload = {
             "operationName": operation_name,
-            "query": print_ast(operation_node),
+            "query": narrowed_query.query,
             "variables": {
                 argument: arguments[argument]
                 for argument in arguments
-                if argument in variables_used
+                if argument in narrowed_query.variables
             },
         }
 
@@ -58,6 +110,20 @@ class ProxyResolver:
 
         return await self.proxy_query(obj, info, payload)
 
+    def can_fold_into(self, url: str | None, headers: dict | Callable | None) -> bool:
+        # Results cached by resolver can't be read from root query
+        if self._cache or url != self._url:
+            return False
+        if self._fold_into_root:
+            return True
+
+        # Folded field is queried with schema's headers and options
+        if self._timeout is not None or self._hedging or self._persisted_queries:
+            return False
+        if callable(self._proxy_headers):
+            return self._proxy_headers is headers
+        return not self._proxy_headers and not headers
+
     async def proxy_query_with_cache(
         self,
         obj: Any,
@@ -97,6 +163,36 @@ class ProxyResolver:
     async def proxy_query(
         self, obj: Any, info: GraphQLResolveInfo, payload: dict
     ) -> Any:
+        response_json = await self.fetch_response(info, payload)
+        return self.get_field_data(info, response_json["data"])
+
+    async def fetch_response(self, info: GraphQLResolveInfo, payload: dict) -> dict:
+        proxy_headers = self.get_proxy_headers(info)
+        is_query = info.operation.operation == OperationType.QUERY
+
+        fetch_data: Callable[[], Awaitable[dict]] = partial(
+            self.fetch_hedged_data, proxy_headers, payload, is_query
+        )
+        if is_query and (self._singleflight or self._memoize_requests):
+            request_key = get_request_key(self._url, payload, proxy_headers)
+            if self._singleflight:
+                fetch_data = partial(self._singleflight.run, request_key, fetch_data)
+            if self._memoize_requests:
+                # Identical queries made for single GraphQL request share result
+                fetch_data = partial(
+                    run_memoized, info.context, request_key, fetch_data
+                )
+
+        try:
+            return await run_with_timeout(
+                fetch_data(), get_remaining_time(info.context, self._timeout)
+            )
+        except UpstreamTimeoutError as error:
+            raise UpstreamGraphQLError(
+                error.message, extensions={"code": error.code}
+            ) from error
+
+    def get_proxy_headers(self, info: GraphQLResolveInfo) -> dict | None:
         proxy_headers = None
         if self._proxy_headers is True:
             if "headers" in info.context:
@@ -112,23 +208,49 @@ class ProxyResolver:
                 if header in self._proxy_headers
             }
 
-        async with AsyncClient() as client:
-            r = await client.post(
-                self._url,
-                headers=proxy_headers or None,
-                json=payload,
+        return proxy_headers or None
+
+    async def fetch_hedged_data(
+        self, proxy_headers: dict | None, payload: dict, is_query: bool = False
+    ) -> dict:
+        if is_query and self._hedging:
+            return await self._hedging.run(
+                lambda: self.fetch_data(proxy_headers, payload)
             )
 
-            content_type = str(r.headers.get("content-type") or "")
-            if r.status_code != 200 or not content_type.startswith("application/json"):
-                raise_upstream_error(r)
+        return await self.fetch_data(proxy_headers, payload)
+
+    async def fetch_data(self, proxy_headers: dict | None, payload: dict) -> dict:
+        if self._persisted_queries:
+            persisted_payload = get_persisted_query_payload(payload)
+            r = await self._transport.post_json(
+                self._url, persisted_payload, proxy_headers
+            )
+
+            response_json = self.decode_response(r)
+            if not is_persisted_query_not_found(response_json):
+                return self.validate_response(r, response_json)
+
+            payload = {**persisted_payload, "query": payload["query"]}
 
-            response_json = r.json()
+        r = await self._transport.post_json(self._url, payload, proxy_headers)
+        return self.validate_response(r, self.decode_response(r))
 
-            if not response_json.get("data") or response_json.get("errors"):
-                raise_upstream_error(r)
+    def decode_response(self, r: Response) -> Any:
+        content_type = str(r.headers.get("content-type") or "")
+        if not content_type.startswith("application/json"):
+            return None
 
-            return self.get_field_data(info, response_json["data"])
+        return self._transport.decode_json(r)
+
+    def validate_response(self, r: Response, response_json: Any) -> dict:
+        if r.status_code != 200 or not isinstance(response_json, dict):
+            raise_upstream_error(r)
+
+        if not response_json.get("data") or response_json.get("errors"):
+            raise_upstream_error(r)
+
+        return response_json
 
     def get_field_data(self, info: GraphQLResolveInfo, data: dict) -> Any | None:
         for field_name in info.path.as_list():
@@ -138,3 +260,11 @@ class ProxyResolver:
                 return None
 
         return data
+
+
+def is_folded_field(info: GraphQLResolveInfo) -> bool:
+    return (
+        info.path.prev is None
+        and isinstance(info.context, dict)
+        and info.field_name in info.context.get(FOLDED_FIELDS_CONTEXT_KEY, ())
+    )
@@ -1,7 +1,18 @@
 from asyncio import gather
 from functools import reduce
 from inspect import isawaitable
-from typing import Any, Callable, Dict, List, Set, Type
+from time import monotonic
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
 
 from ariadne.types import BaseProxyRootValue, RootValue
 from graphql import (
@@ -17,19 +28,57 @@ from graphql import (
     parse,
     print_ast,
 )
-from httpx import AsyncClient
+from httpx import RequestError, Response
 
+from .bulkhead import Bulkhead
+from .circuit_breaker import OPEN, CircuitBreaker, CircuitOpenError
 from .copy import copy_schema
+from .deadline import get_remaining_time, run_with_timeout, set_deadline
+from .entities import (
+    EntitiesQuery,
+    EntityKey,
+    copy_data,
+    find_entities,
+    merge_entity_data,
+    strip_entity_fields,
+)
+from .errors import (
+    UpstreamConnectionError,
+    UpstreamInvalidResponseError,
+    UpstreamServerError,
+    UpstreamUnavailableError,
+)
+from .fields_ownership import FieldsOwnership, get_schema_ids
+from .get_operation import get_operation
+from .hedging import HedgingPolicy
 from .merge import merge_schemas
+from .operation_registry import OperationRegistry
+from .owner_policy import OwnerPolicy
+from .persisted_queries import (
+    get_persisted_query_payload,
+    is_persisted_query_not_found,
+)
+from .proxy_resolver import FOLDED_FIELDS_CONTEXT_KEY, ProxyResolver
 from .proxy_root_value import ProxyRootValue
 from .query_filter import QueryFilter
+from .query_plan import (
+    EntityFetch,
+    QueryPlan,
+    QueryPlanCache,
+    SubQuery,
+    get_operations_names,
+    get_query_plan_key,
+)
 from .remote_schema import get_remote_schema
 from .selections import merge_selection_sets
+from .singleflight import SingleFlight, get_request_key
+from .skip_include import get_directives_values, get_directives_variables
 from .standard_types import STANDARD_TYPES, add_missing_scalar_types
 from .str_to_field import (
     get_field_definition_from_str,
     get_graphql_field_from_field_definition,
 )
+from .transport import ProxyTransport, get_default_transport
 
 ProxyHeaders = dict | Callable[[Any], dict]
 
@@ -50,6 +99,14 @@ class ProxySchema:
         self,
         root_value: RootValue | None = None,
         proxy_root_value: Type[ProxyRootValue] = ProxyRootValue,
+        transport: ProxyTransport | None = None,
+        deadline: float | None = None,
+        operation_registry: OperationRegistry | None = None,
+        query_plan_cache_size: int | None = 1000,
+        proxy_introspection: bool = False,
+        owner_policy: OwnerPolicy | None = None,
+        preserve_fragments: bool = False,
+        fold_proxy_resolvers: bool = False,
     ):
         self.schemas: List[GraphQLSchema] = []
         self.urls: List[str | None] = []
@@ -57,15 +114,35 @@ class ProxySchema:
         self.proxy_errors: List[bool] = []
         self.proxy_extensions: List[bool] = []
         self.labels: List[str] = []
-        self.fields_map: Dict[str, Dict[str, Set[int]]] = {}
+        self.bulkheads: List[Bulkhead | None] = []
+        self.coalesce_requests: List[bool] = []
+        self.timeouts: List[float | None] = []
+        self.hedging: List[HedgingPolicy | None] = []
+        self.circuit_breakers: List[CircuitBreaker | None] = []
+        self.persisted_queries: List[bool] = []
+        self.fields_masks: Dict[str, Dict[str, int]] = {}
         self.fields_types: Dict[str, Dict[str, str]] = {}
         self.unions: Dict[str, List[str]] = {}
         self.foreign_keys: Dict[str, Dict[str, List[str]]] = {}
         self.dependencies: Dict[int, Dict[str, Dict[str, SelectionSetNode]]] = {}
+        self.entity_keys: Dict[str, Dict[int, EntityKey]] = {}
+        self.folded_fields: Dict[str, int] = {}
 
         self.proxy_root_value = proxy_root_value
+        self.transport = transport or get_default_transport()
+        self.singleflight = SingleFlight()
+        self.deadline = deadline
+        self.proxy_introspection = proxy_introspection
+        self.owner_policy = owner_policy
+        self.preserve_fragments = preserve_fragments
+        self.fold_proxy_resolvers = fold_proxy_resolvers
+        self.operation_registry = operation_registry
+        self.query_plan_cache = (
+            QueryPlanCache(query_plan_cache_size) if query_plan_cache_size else None
+        )
 
         self.schema: GraphQLSchema | None = None
+        self.fields_ownership: FieldsOwnership | None = None
         self.query_filter: QueryFilter | None = None
         self.root_value: RootValue | None = root_value
 
@@ -85,6 +162,14 @@ class ProxySchema:
         label: str | None = None,
         proxy_errors: bool = True,
         proxy_extensions: bool = True,
+        max_concurrency: int | None = None,
+        max_queue: int | None = None,
+        max_queue_wait: float | None = None,
+        coalesce_requests: bool = False,
+        timeout: float | None = None,
+        hedging: HedgingPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        persisted_queries: bool = False,
     ) -> int:
         if callable(headers):
             remote_schema = get_remote_schema(url, headers(None))
@@ -108,6 +193,14 @@ class ProxySchema:
             label=label or f"remote_{schema_id}",
             proxy_errors=proxy_errors,
             proxy_extensions=proxy_extensions,
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            max_queue_wait=max_queue_wait,
+            coalesce_requests=coalesce_requests,
+            timeout=timeout,
+            hedging=hedging,
+            circuit_breaker=circuit_breaker,
+            persisted_queries=persisted_queries,
         )
 
     def add_schema(  # noqa: C901
@@ -127,6 +220,14 @@ class ProxySchema:
         label: str | None = None,
         proxy_errors: bool = True,
         proxy_extensions: bool = True,
+        max_concurrency: int | None = None,
+        max_queue: int | None = None,
+        max_queue_wait: float | None = None,
+        coalesce_requests: bool = False,
+        timeout: float | None = None,
+        hedging: HedgingPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        persisted_queries: bool = False,
     ) -> int:
         if (
             queries
@@ -158,7 +259,18 @@ class ProxySchema:
         self.labels.append(label or f"schema_{schema_id}")
         self.proxy_errors.append(proxy_errors)
         self.proxy_extensions.append(proxy_extensions)
+        self.bulkheads.append(
+            Bulkhead(max_concurrency, max_queue, max_queue_wait)
+            if max_concurrency
+            else None
+        )
+        self.coalesce_requests.append(coalesce_requests)
+        self.timeouts.append(timeout)
+        self.hedging.append(hedging)
+        self.circuit_breakers.append(circuit_breaker)
+        self.persisted_queries.append(persisted_queries)
 
+        schema_mask = 1 << schema_id
         for type_name, type_def in schema.type_map.items():
             if type_name in STANDARD_TYPES:
                 continue
@@ -171,25 +283,17 @@ class ProxySchema:
             if not isinstance(type_def, GraphQLInterfaceType | GraphQLObjectType):
                 continue
 
-            if type_name not in self.fields_map:
-                self.fields_map[type_name] = {}
-
+            type_fields = self.fields_masks.setdefault(type_name, {})
             for field_name in type_def.fields:
-                if field_name not in self.fields_map[type_name]:
-                    self.fields_map[type_name][field_name] = set()
-
-                self.fields_map[type_name][field_name].add(schema_id)
+                type_fields[field_name] = type_fields.get(field_name, 0) | schema_mask
 
         if extra_fields:
-            for type_name, type_fields in extra_fields.items():
-                if type_name not in self.fields_map:
-                    self.fields_map[type_name] = {}
-
-                for field_name in type_fields:
-                    if field_name not in self.fields_map[type_name]:
-                        self.fields_map[type_name][field_name] = set()
-
-                    self.fields_map[type_name][field_name].add(schema_id)
+            for type_name, extra_type_fields in extra_fields.items():
+                type_fields = self.fields_masks.setdefault(type_name, {})
+                for field_name in extra_type_fields:
+                    type_fields[field_name] = (
+                        type_fields.get(field_name, 0) | schema_mask
+                    )
 
         return schema_id
 
@@ -264,6 +368,44 @@ class ProxySchema:
                 type_dependencies[field_name], selection_set
             )
 
+    def add_entity_key(
+        self, schema_id: int, type_name: str, on: str | List[str], query: str
+    ):
+        if type_name in ("Query", "Mutation", "Subscription"):
+            raise ValueError(f"Defining entity key for {type_name} is not allowed.")
+
+        if schema_id < 0 or schema_id + 1 > len(self.urls):
+            raise ValueError(f"Schema with ID '{schema_id}' doesn't exist.")
+        if not self.urls[schema_id]:
+            raise ValueError(f"Schema with ID '{schema_id}' is not a remote schema.")
+
+        schema_type = self.schemas[schema_id].type_map.get(type_name)
+        if not isinstance(schema_type, GraphQLObjectType):
+            raise ValueError(
+                f"Type '{type_name}' in schema with ID '{schema_id}' "
+                "is not an object type."
+            )
+
+        key_fields = [on] if isinstance(on, str) else on
+        for key_field in key_fields:
+            if key_field not in schema_type.fields:
+                raise ValueError(
+                    f"Type '{type_name}' in schema with ID '{schema_id}' "
+                    f"doesn't define the '{key_field}' field."
+                )
+
+        if type_name not in self.entity_keys:
+            self.entity_keys[type_name] = {}
+        if schema_id in self.entity_keys[type_name]:
+            raise ValueError(
+                f"Entity key already exists on {type_name} "
+                f"in schema with ID '{schema_id}'."
+            )
+
+        self.entity_keys[type_name][schema_id] = EntityKey(
+            schema_id, type_name, key_fields, query
+        )
+
     def parse_field_dependencies(self, field_name: str, query: str) -> SelectionSetNode:
         clean_query = query.strip()
         if not clean_query.startswith("{") or not clean_query.endswith("}"):
@@ -300,13 +442,23 @@ class ProxySchema:
             "field in any of schemas."
         )
 
+    @property
+    def fields_map(self) -> Dict[str, Dict[str, Set[int]]]:
+        return {
+            type_name: {
+                field_name: set(get_schema_ids(mask))
+                for field_name, mask in type_fields.items()
+            }
+            for type_name, type_fields in self.fields_masks.items()
+        }
+
     def add_delayed_fields(self, delayed_fields: Dict[str, List[str]]):
         for type_name, type_fields in delayed_fields.items():
-            if type_name not in self.fields_map:
+            if type_name not in self.fields_masks:
                 continue
 
             for field_name in type_fields:
-                self.fields_map[type_name].pop(field_name, None)
+                self.fields_masks[type_name].pop(field_name, None)
 
     def insert_field(self, type_name: str, field_str: str):
         field_definition = get_field_definition_from_str(field_str=field_str)
@@ -351,18 +503,38 @@ class ProxySchema:
                     field_name, original_resolver
                 )
 
+        self.fields_ownership = FieldsOwnership(
+            self.fields_masks,
+            self.fields_types,
+            self.unions,
+            self.foreign_keys,
+            self.dependencies,
+        )
         self.query_filter = QueryFilter(
             self.schema,
             self.schemas,
-            self.fields_map,
+            self.fields_masks,
             self.fields_types,
             self.unions,
             self.foreign_keys,
             self.dependencies,
+            self.fields_ownership,
+            proxy_introspection=self.proxy_introspection,
+            entity_keys=self.entity_keys,
+            preserve_fragments=self.preserve_fragments,
         )
 
+        self.folded_fields = self.get_folded_fields()
+        self.reset_query_plans()
+
         return self.schema
 
+    def reset_query_plans(self):
+        if self.query_plan_cache:
+            self.query_plan_cache.clear()
+        if self.operation_registry and self.schema:
+            self.operation_registry.prepare(self.schema, self.create_query_plan)
+
     def _create_alias_aware_resolver(self, field_name: str, original_resolver=None):
         def get_from_obj(obj, key):
             try:
@@ -389,7 +561,7 @@ class ProxySchema:
 
         return resolver
 
-    async def root_resolver(
+    async def root_resolver(  # noqa: C901
         self,
         context_value: dict,
         operation_name: str | None,
@@ -402,29 +574,24 @@ class ProxySchema:
                 "before `root_resolver` will be available to use."
             )
 
+        if self.deadline is not None:
+            set_deadline(context_value, self.deadline)
+
         context_value["root_query"] = {
             "operationName": operation_name,
             "document": document,
             "variables": variables,
         }
 
-        queries = self.query_filter.split_query(document)
+        query_plan = self.get_query_plan(document, operation_name, variables)
+        if query_plan.folded_fields:
+            context_value[FOLDED_FIELDS_CONTEXT_KEY] = query_plan.folded_fields
 
-        if callable(self.root_value):
-            root_value = self.root_value(
-                context_value,
-                operation_name,  # type: ignore
-                variables,  # type: ignore
-                document,
-            )
-            if isawaitable(root_value):
-                root_value = await root_value
-        elif self.root_value:
-            root_value = self.root_value.copy()
-        else:
-            root_value = {}
+        root_value = await self.get_root_value(
+            context_value, operation_name, variables, document
+        )
 
-        if not queries:
+        if not query_plan.subqueries:
             return root_value
 
         root_errors: List[dict] = []
@@ -432,34 +599,28 @@ class ProxySchema:
 
         subqueries_data = await gather(
             *[
-                self.fetch_data(
-                    schema_id,
+                self.fetch_schema_data(
+                    subquery.schema_id,
                     context_value,
-                    self.urls[schema_id],
-                    self.headers[schema_id],
-                    {
-                        "operationName": operation_name,
-                        "query": print_ast(query_document),
-                        "variables": (
-                            {
-                                key: variables[key]
-                                for key in query_variables
-                                if key in variables
-                            }
-                            if variables
-                            else None
-                        ),
-                    },
+                    subquery.get_payload(operation_name, variables),
+                    is_query=query_plan.is_query,
                 )
-                for schema_id, query_document, query_variables in queries
-                if self.urls[schema_id]
+                for subquery in query_plan.subqueries
+                if self.urls[subquery.schema_id]
             ]
         )
 
         for schema_id, subquery_data in subqueries_data:
             label = self.labels[schema_id]
+            if isinstance(subquery_data, UpstreamUnavailableError):
+                root_errors.append(self.get_upstream_error(label, subquery_data))
+                continue
             if isinstance(subquery_data.get("data"), dict):
-                root_value.update(subquery_data["data"])
+                if query_plan.entity_fetches:
+                    # Entities are merged into request's own copy of the data
+                    root_value.update(copy_data(subquery_data["data"]))
+                else:
+                    root_value.update(subquery_data["data"])
             if (
                 isinstance(subquery_data.get("errors"), list)
                 and self.proxy_errors[schema_id]
@@ -471,6 +632,17 @@ class ProxySchema:
             ):
                 root_extensions[label] = subquery_data["extensions"]
 
+        if query_plan.entity_fetches:
+            root_errors += await self.fetch_entities(
+                context_value,
+                query_plan.operation,
+                variables,
+                [
+                    (entity_fetch, root_value)
+                    for entity_fetch in query_plan.entity_fetches
+                ],
+            )
+
         if root_errors or root_extensions:
             return self.proxy_root_value(
                 root_value,
@@ -480,24 +652,463 @@ class ProxySchema:
 
         return root_value or None
 
+    async def fetch_entities(
+        self,
+        context_value: dict,
+        operation: OperationDefinitionNode | None,
+        variables: dict | None,
+        entity_fetches: List[Tuple[EntityFetch, dict]],
+    ) -> List[dict]:
+        operation_name = operation.name.value if operation and operation.name else None
+        errors: List[dict] = []
+
+        # Entities found in results of every wave are fetched together in the
+        # next one, with single query sent to every schema.
+        while entity_fetches:
+            queries: Dict[int, EntitiesQuery] = {}
+            for entity_fetch, data in entity_fetches:
+                schema_id = entity_fetch.schema_id
+                entity_key = self.entity_keys[entity_fetch.type_name][schema_id]
+                entities: List[Tuple[dict, List[str | int]]] = []
+                find_entities(
+                    data, entity_fetch.path, entity_fetch.type_name, [], entities
+                )
+                for entity, entity_path in entities:
+                    if schema_id not in queries:
+                        queries[schema_id] = EntitiesQuery(operation_name)
+                    queries[schema_id].add_entity(
+                        entity_key, entity_fetch, entity, entity_path
+                    )
+
+            # Fields identifying entities are removed from results once
+            # all entities of the wave were found
+            for entity_fetch, data in entity_fetches:
+                strip_entity_fields(data, entity_fetch.path)
+
+            entities_data = await gather(
+                *[
+                    self.fetch_schema_data(
+                        schema_id,
+                        context_value,
+                        {
+                            "operationName": query.operation_name,
+                            "query": print_ast(query.get_document()),
+                            "variables": query.get_variables(variables),
+                        },
+                        is_query=True,
+                    )
+                    for schema_id, query in queries.items()
+                ]
+            )
+
+            entity_fetches = []
+            for schema_id, entity_data in entities_data:
+                query = queries[schema_id]
+                label = self.labels[schema_id]
+                if isinstance(entity_data, UpstreamUnavailableError):
+                    errors.append(self.get_upstream_error(label, entity_data))
+                    continue
+                if isinstance(entity_data.get("data"), dict):
+                    entity_fetches += merge_entities_data(query, entity_data["data"])
+                if (
+                    isinstance(entity_data.get("errors"), list)
+                    and self.proxy_errors[schema_id]
+                ):
+                    errors += self.clean_entities_errors(
+                        label, query, entity_data["errors"]
+                    )
+
+        return errors
+
+    def get_query_plan(
+        self,
+        document: DocumentNode,
+        operation_name: str | None = None,
+        variables: dict | None = None,
+    ) -> QueryPlan:
+        if self.fold_proxy_resolvers:
+            self.update_folded_fields()
+
+        if self.operation_registry:
+            query_plan = self.operation_registry.get_query_plan(
+                document, operation_name
+            )
+            if (
+                query_plan
+                and not query_plan.directives_variables
+                and not (self.owner_policy and query_plan.shared_fields_owners)
+            ):
+                return query_plan
+
+        directives_values = get_directives_values(
+            get_operation(document, operation_name), variables
+        )
+        owners_ranking = (
+            self.get_owners_ranking(self.owner_policy) if self.owner_policy else None
+        )
+
+        if not self.query_plan_cache:
+            return self.create_query_plan(
+                document, operation_name, directives_values, owners_ranking
+            )
+
+        key = get_query_plan_key(document, operation_name)
+        query_plan = self.query_plan_cache.get(key, directives_values, owners_ranking)
+        if query_plan is None:
+            query_plan = self.create_query_plan(
+                document, operation_name, directives_values, owners_ranking
+            )
+            self.query_plan_cache.set(
+                key, query_plan, directives_values, owners_ranking
+            )
+
+        return query_plan
+
+    def warm_query_plan_cache(
+        self,
+        queries: Iterable[str | DocumentNode],
+        variables: Iterable[dict | None] | None = None,
+    ):
+        if not self.query_plan_cache:
+            raise RuntimeError(
+                "'warm_query_plan_cache' requires ProxySchema initialized with "
+                "'query_plan_cache_size' greater than 0."
+            )
+
+        if self.fold_proxy_resolvers:
+            self.update_folded_fields()
+
+        owners_ranking = (
+            self.get_owners_ranking(self.owner_policy) if self.owner_policy else None
+        )
+        variables_sets = list(variables or ()) or [None]
+
+        for query in queries:
+            document = parse(query) if isinstance(query, str) else query
+            operations_names = get_operations_names(document)
+            if len(operations_names) < 2:
+                operations_names = [None]
+
+            for operation_name in operations_names:
+                key = get_query_plan_key(document, operation_name)
+                operation = get_operation(document, operation_name)
+                for query_variables in variables_sets:
+                    directives_values = get_directives_values(
+                        operation, query_variables
+                    )
+                    self.query_plan_cache.set(
+                        key,
+                        self.create_query_plan(
+                            document, operation_name, directives_values, owners_ranking
+                        ),
+                        directives_values,
+                        owners_ranking,
+                    )
+
+    def create_query_plan(
+        self,
+        document: DocumentNode,
+        operation_name: str | None = None,
+        directives_values: Dict[str, bool] | None = None,
+        owners_ranking: Sequence[int] | None = None,
+    ) -> QueryPlan:
+        if not self.query_filter:
+            raise RuntimeError(
+                "'get_final_schema' needs to be called to build final schema "
+                "before query plans can be created."
+            )
+
+        if owners_ranking is None and self.entity_keys:
+            # Entity planner fetches every field from single schema
+            owners_ranking = tuple(range(len(self.schemas)))
+
+        operation = get_operation(document, operation_name)
+        folded_fields = (
+            self.get_folded_fields()
+            if operation.operation == OperationType.QUERY
+            else {}
+        )
+        subqueries, entity_fetches = self.query_filter.plan_query(
+            document, operation_name, directives_values, owners_ranking, folded_fields
+        )
+        return QueryPlan(
+            document,
+            [
+                SubQuery(
+                    schema_id, query_document, print_ast(query_document), variables
+                )
+                for schema_id, query_document, variables in subqueries
+            ],
+            operation,
+            get_directives_variables(document, operation),
+            self.query_filter.get_shared_fields_owners(document, operation_name),
+            entity_fetches,
+            folded_fields,
+        )
+
+    def update_folded_fields(self):
+        # Resolvers can be set on final schema after query plans were created,
+        # so plans are recreated when fields to fold into them change
+        folded_fields = self.get_folded_fields()
+        if folded_fields != self.folded_fields:
+            self.folded_fields = folded_fields
+            self.reset_query_plans()
+
+    def get_folded_fields(self) -> Dict[str, int]:
+        folded_fields: Dict[str, int] = {}
+        if not self.fold_proxy_resolvers or not self.schema:
+            return folded_fields
+
+        query_type = self.schema.query_type
+        for field_name, field in query_type.fields.items() if query_type else ():
+            if not isinstance(field.resolve, ProxyResolver):
+                continue
+
+            for schema_id, url in enumerate(self.urls):
+                schema_query_type = self.schemas[schema_id].query_type
+                if (
+                    schema_query_type
+                    and field_name in schema_query_type.fields
+                    and field.resolve.can_fold_into(url, self.headers[schema_id])
+                ):
+                    folded_fields[field_name] = schema_id
+                    break
+
+        return folded_fields
+
+    async def get_root_value(
+        self,
+        context_value: dict,
+        operation_name: str | None,
+        variables: dict | None,
+        document: DocumentNode,
+    ) -> dict:
+        if callable(self.root_value):
+            root_value = self.root_value(
+                context_value,
+                operation_name,  # type: ignore
+                variables,  # type: ignore
+                document,
+            )
+            if isawaitable(root_value):
+                root_value = await root_value
+            return root_value  # type: ignore
+
+        if self.root_value:
+            return self.root_value.copy()
+
+        return {}
+
+    def get_owners_ranking(self, owner_policy: OwnerPolicy) -> Tuple[int, ...]:
+        ranking = owner_policy.get_ranking(range(len(self.schemas)))
+        open_circuits = {
+            schema_id
+            for schema_id, circuit_breaker in enumerate(self.circuit_breakers)
+            if circuit_breaker and circuit_breaker.state == OPEN
+        }
+        if not open_circuits:
+            return ranking
+
+        # Schemas with open circuit are only used for fields no other schema owns
+        return (
+            *(schema_id for schema_id in ranking if schema_id not in open_circuits),
+            *(schema_id for schema_id in ranking if schema_id in open_circuits),
+        )
+
+    async def fetch_schema_data(
+        self, schema_id: int, context: Any, json: dict, *, is_query: bool = False
+    ) -> Tuple[int, dict | UpstreamUnavailableError]:
+        started_at = monotonic()
+
+        try:
+            result = await self.fetch_timed_data(schema_id, context, json, is_query)
+        except UpstreamUnavailableError as error:
+            if self.owner_policy and not isinstance(error, CircuitOpenError):
+                self.owner_policy.record_failure(schema_id)
+            return schema_id, error
+
+        if self.owner_policy:
+            self.owner_policy.record_latency(schema_id, monotonic() - started_at)
+
+        return result
+
+    async def fetch_timed_data(
+        self, schema_id: int, context: Any, json: dict, is_query: bool = False
+    ) -> Tuple[int, dict]:
+        headers = self.headers[schema_id]
+        if callable(headers):
+            headers = headers(context)
+
+        if is_query and self.coalesce_requests[schema_id]:
+            fetch_data = self.singleflight.run(
+                get_request_key(schema_id, json, headers),
+                lambda: self.fetch_guarded_data(
+                    schema_id, context, headers, json, is_query
+                ),
+            )
+        else:
+            fetch_data = self.fetch_guarded_data(
+                schema_id, context, headers, json, is_query
+            )
+
+        # Client's deadline is applied per request and is not upstream's failure,
+        # so it's kept outside of the circuit breaker and coalesced requests
+        try:
+            return await run_with_timeout(fetch_data, get_remaining_time(context))
+        except RequestError as error:
+            raise UpstreamConnectionError("Upstream request failed.") from error
+
+    async def fetch_guarded_data(
+        self,
+        schema_id: int,
+        context: Any,
+        headers: dict | None,
+        json: dict,
+        is_query: bool = False,
+    ) -> Tuple[int, dict]:
+        circuit_breaker = self.circuit_breakers[schema_id]
+        timeout = self.timeouts[schema_id]
+
+        def fetch_data():
+            return run_with_timeout(
+                self.fetch_limited_data(schema_id, context, headers, json, is_query),
+                timeout,
+            )
+
+        try:
+            if circuit_breaker:
+                return await circuit_breaker.run(fetch_data)
+            return await fetch_data()
+        except UpstreamServerError as error:
+            # Server error is a failure for circuit breaker and hedging,
+            # but its body is still returned to the client
+            return schema_id, error.data
+
+    async def fetch_limited_data(
+        self,
+        schema_id: int,
+        context: Any,
+        headers: dict | None,
+        json: dict,
+        is_query: bool = False,
+    ) -> Tuple[int, dict]:
+        bulkhead = self.bulkheads[schema_id]
+        if not bulkhead:
+            return await self.fetch_hedged_data(
+                schema_id, context, headers, json, is_query
+            )
+
+        async with bulkhead.limit():
+            return await self.fetch_hedged_data(
+                schema_id, context, headers, json, is_query
+            )
+
+    async def fetch_hedged_data(
+        self,
+        schema_id: int,
+        context: Any,
+        headers: dict | None,
+        json: dict,
+        is_query: bool = False,
+    ) -> Tuple[int, dict]:
+        url = self.urls[schema_id]
+        hedging = self.hedging[schema_id]
+        if is_query and hedging:
+            return await hedging.run(
+                lambda: self.fetch_data(schema_id, context, url, headers, json)
+            )
+
+        return await self.fetch_data(schema_id, context, url, headers, json)
+
     async def fetch_data(self, schema_id, context, url, headers, json):
-        async with AsyncClient() as client:
-            if callable(headers):
-                headers = headers(context)
-
-            r = await client.post(
-                url,
-                headers=headers,
-                json=json,
+        if callable(headers):
+            headers = headers(context)
+
+        if self.persisted_queries[schema_id]:
+            persisted_json = get_persisted_query_payload(json)
+            r = await self.transport.post_json(url, persisted_json, headers)
+
+            query_data = self.decode_query_data(r)
+            if not is_persisted_query_not_found(query_data):
+                return (schema_id, query_data)
+
+            json = {**persisted_json, "query": json["query"]}
+
+        r = await self.transport.post_json(url, json, headers)
+
+        query_data = self.decode_query_data(r)
+        return (schema_id, query_data)
+
+    def decode_query_data(self, r: Response) -> Any:
+        query_data = self.decode_response(r)
+        if r.is_server_error:
+            raise UpstreamServerError("Upstream server error.", query_data)
+
+        return query_data
+
+    def decode_response(self, r: Response) -> Any:
+        try:
+            return self.transport.decode_json(r)
+        except ValueError as error:
+            raise UpstreamInvalidResponseError(
+                "Upstream returned invalid JSON response."
+            ) from error
+
+    def get_upstream_error(self, label: str, error: UpstreamUnavailableError) -> dict:
+        return {
+            "message": error.message,
+            "path": [label],
+            "extensions": {"code": error.code},
+        }
+
+    def get_bulkheads_metrics(self) -> Dict[str, Dict[str, int | float]]:
+        return {
+            label: bulkhead.get_metrics()
+            for label, bulkhead in zip(self.labels, self.bulkheads, strict=True)
+            if bulkhead
+        }
+
+    def get_circuit_breakers_metrics(self) -> Dict[str, Dict[str, int | str]]:
+        return {
+            label: circuit_breaker.get_metrics()
+            for label, circuit_breaker in zip(
+                self.labels, self.circuit_breakers, strict=True
             )
+            if circuit_breaker
+        }
 
-            query_data = r.json()
-            return (schema_id, query_data)
+    def clean_entities_errors(
+        self, label: str, query: EntitiesQuery, errors: List[dict]
+    ) -> List[dict]:
+        clean_errors: List[dict] = []
+        for error in errors:
+            if isinstance(error, dict) and isinstance(error.get("path"), list):
+                error_path = query.get_error_path(error["path"])
+                if error_path is not None:
+                    clean_errors.append({**error, "path": [label, *error_path]})
+        return clean_errors
 
     def clean_errors(self, label: str, errors: List[dict]) -> List[dict]:
         clean_errors: List[dict] = []
         for error in errors:
             if isinstance(error, dict) and isinstance(error.get("path"), list):
-                error["path"].insert(0, label)
-                clean_errors.append(error)
+                clean_errors.append({**error, "path": [label, *error["path"]]})
         return clean_errors
+
+
+def merge_entities_data(
+    query: EntitiesQuery, data: dict
+) -> List[Tuple[EntityFetch, dict]]:
+    entity_fetches: List[Tuple[EntityFetch, dict]] = []
+    for alias, (entity_key, entity_fetch, entities) in query.entities.items():
+        entity_data = entity_key.get_entity_data(data.get(alias))
+        if not isinstance(entity_data, dict):
+            continue
+
+        for entity, _ in entities:
+            merge_entity_data(entity, entity_data)
+            entity_fetches += [
+                (nested_fetch, entity) for nested_fetch in entity_fetch.entity_fetches
+            ]
+
+    return entity_fetches
@@ -1,4 +1,4 @@
-from typing import Dict, List, Set, Tuple, cast
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
 
 from graphql import (
     DocumentNode,
@@ -11,31 +11,94 @@ from graphql import (
     NameNode,
     ObjectValueNode,
     OperationDefinitionNode,
+    OperationType,
     SelectionNode,
     SelectionSetNode,
+    VariableDefinitionNode,
     VariableNode,
 )
 
+from .entities import ENTITY_TYPENAME_ALIAS, EntityKey, get_entity_key_alias
+from .fields_ownership import (
+    FieldsOwnership,
+    get_schema_ids,
+    get_schemas_mask,
+    get_single_schema_id,
+    select_owner,
+)
+from .get_operation import get_operation
+from .query_plan import EntityFetch
 from .selections import merge_selections
+from .skip_include import is_selection_excluded, is_selection_set_excluded
 
 # Present in every GraphQL response when requested, but not listed on types in
 # introspection `fields` — without an explicit allow-list, query splitting drops
-# them and abstract types cannot be resolved at execution time.
+# them and abstract types cannot be resolved at execution time. On root types
+# it's resolved locally unless `proxy_introspection` is enabled.
 _COMPOSITE_META_FIELDS = frozenset({"__typename"})
 
 # Valid only on the root Query type; same introspection gap as __typename.
+# Resolved locally from the merged schema unless `proxy_introspection` is enabled.
 _ROOT_QUERY_INTROSPECTION_FIELDS = frozenset({"__schema", "__type"})
 
 
-class QueryFilterContext:
-    schema_id: int
-    fragments: Dict[str, FragmentDefinitionNode]
+EntitiesSelections = Dict[Tuple[Tuple[str, ...], str, int], List[SelectionNode]]
+
+
+class SplitFragment:
+    definition: FragmentDefinitionNode
     variables: Set[str]
+    fragments: Dict[str, FragmentDefinitionNode]
+    entities: EntitiesSelections
 
-    def __init__(self, schema_id: int):
-        self.schema_id = schema_id
+    def __init__(
+        self,
+        definition: FragmentDefinitionNode,
+        variables: Set[str],
+        fragments: Dict[str, FragmentDefinitionNode],
+        entities: EntitiesSelections,
+    ):
+        self.definition = definition
+        self.variables = variables
+        self.fragments = fragments
+        self.entities = entities
+
+
+class QuerySplitContext:
+    fragments: Dict[str, FragmentDefinitionNode]
+    variables: Dict[int, Set[str]]
+    directives_values: Dict[str, bool]
+    owners_ranking: Sequence[int] | None
+    path: List[str]
+    entities: EntitiesSelections
+    preserve_fragments: bool
+    split_fragments: Dict[Tuple[str, int], SplitFragment | None]
+    used_fragments: Dict[int, Dict[str, FragmentDefinitionNode]]
+    folded_fields: Dict[str, int]
+
+    def __init__(
+        self,
+        schema_ids: Iterable[int],
+        directives_values: Dict[str, bool] | None = None,
+        owners_ranking: Sequence[int] | None = None,
+        preserve_fragments: bool = False,
+        folded_fields: Dict[str, int] | None = None,
+    ):
         self.fragments = {}
-        self.variables = set()
+        self.variables = {schema_id: set() for schema_id in schema_ids}
+        self.directives_values = directives_values or {}
+        self.owners_ranking = owners_ranking
+        self.path = []
+        self.entities = {}
+        self.preserve_fragments = preserve_fragments
+        self.split_fragments = {}
+        self.used_fragments = {schema_id: {} for schema_id in self.variables}
+        self.folded_fields = folded_fields or {}
+
+    def add_variables(self, schemas_mask: int, variables: Set[str]):
+        if variables:
+            for schema_id in get_schema_ids(schemas_mask):
+                self.variables[schema_id].update(variables)
 
 
 class QueryFilter:
@@ -43,149 +106,256 @@ class QueryFilter:
         self,
         schema: GraphQLSchema,
         schemas: List[GraphQLSchema],
-        fields_map: Dict[str, Dict[str, Set[int]]],
+        fields_masks: Dict[str, Dict[str, int]],
         fields_types: Dict[str, Dict[str, str]],
         unions: Dict[str, List[str]],
         foreign_keys: Dict[str, Dict[str, List[str]]],
         dependencies: Dict[int, Dict[str, Dict[str, SelectionSetNode]]],
+        fields_ownership: FieldsOwnership | None = None,
+        proxy_introspection: bool = False,
+        entity_keys: Dict[str, Dict[int, EntityKey]] | None = None,
+        preserve_fragments: bool = False,
     ):
         self.schema = schema
         self.schemas = schemas
-        self.fields_map = fields_map
         self.fields_types = fields_types
         self.unions = unions
         self.foreign_keys = foreign_keys
         self.dependencies = dependencies
+        self.fields_ownership = fields_ownership or FieldsOwnership(
+            fields_masks, fields_types, unions, foreign_keys, dependencies
+        )
+        self.proxy_introspection = proxy_introspection
+        self.preserve_fragments = preserve_fragments
+        self.entity_keys = entity_keys or {}
+        self.entity_owners = self.get_entity_owners()
+        self.root_types = {
+            root_type.name
+            for root_type in (schema.query_type, schema.mutation_type)
+            if root_type
+        }
+
+    def _is_root_meta_field(
+        self, field_name: str, root_graphql_type: str | None = None
+    ) -> bool:
+        if not root_graphql_type:
+            return False
+        if field_name in _COMPOSITE_META_FIELDS:
+            return True
+        return (
+            root_graphql_type == "Query"
+            and field_name in _ROOT_QUERY_INTROSPECTION_FIELDS
+        )
 
-    def _field_passes_type_filter(
+    def _get_field_mask(
         self,
         field_name: str,
-        type_fields: Dict[str, Set[int]],
-        schema_id: int,
+        type_fields: Dict[str, int],
+        schemas_mask: int,
         *,
         root_graphql_type: str | None = None,
-    ) -> bool:
+        owners_ranking: Sequence[int] | None = None,
+    ) -> int:
+        if self._is_root_meta_field(field_name, root_graphql_type):
+            return schemas_mask if self.proxy_introspection else 0
         if field_name in _COMPOSITE_META_FIELDS:
-            return True
-        if (
-            root_graphql_type == "Query"
-            and field_name in _ROOT_QUERY_INTROSPECTION_FIELDS
-        ):
-            return True
-        return field_name in type_fields and schema_id in type_fields[field_name]
+            return schemas_mask
+
+        field_mask = type_fields.get(field_name, 0) & schemas_mask
+        if owners_ranking is not None and field_mask & (field_mask - 1):
+            return select_owner(field_mask, owners_ranking)
+        return field_mask
+
+    def get_entity_owners(self) -> Dict[Tuple[str, int], int]:
+        # Schemas able to resolve the type's fields for objects returned by
+        # other schema, which has to own all fields of the entity key.
+        entity_owners: Dict[Tuple[str, int], int] = {}
+        for type_name, type_keys in self.entity_keys.items():
+            type_fields = self.fields_ownership.get_type_fields(type_name)
+            for schema_id in range(len(self.schemas)):
+                entity_owners[(type_name, schema_id)] = get_schemas_mask(
+                    key_schema_id
+                    for key_schema_id, entity_key in type_keys.items()
+                    if key_schema_id != schema_id
+                    and all(
+                        type_fields.get(key_field, 0) >> schema_id & 1
+                        for key_field in entity_key.on
+                    )
+                )
+        return entity_owners
 
     def split_query(
-        self, document: DocumentNode
+        self,
+        document: DocumentNode,
+        operation_name: str | None = None,
+        directives_values: Dict[str, bool] | None = None,
+        owners_ranking: Sequence[int] | None = None,
     ) -> List[Tuple[int, DocumentNode, Set[str]]]:
-        queries: List[Tuple[int, DocumentNode, Set[str]]] = []
-
-        for schema_id in range(len(self.schemas)):
-            schema_query, used_variables = self.get_schema_query_with_used_variables(
-                schema_id, document
-            )
-            if schema_query:
-                queries.append((schema_id, schema_query, used_variables))
-
-        return queries
+        subqueries, _ = self.plan_query(
+            document, operation_name, directives_values, owners_ranking
+        )
+        return subqueries
 
-    def get_schema_query_with_used_variables(
+    def plan_query(
         self,
-        schema_id: int,
         document: DocumentNode,
-    ) -> Tuple[DocumentNode | None, Set[str]]:
-        context = QueryFilterContext(schema_id)
-        definitions = []
+        operation_name: str | None = None,
+        directives_values: Dict[str, bool] | None = None,
+        owners_ranking: Sequence[int] | None = None,
+        folded_fields: Dict[str, int] | None = None,
+    ) -> Tuple[List[Tuple[int, DocumentNode, Set[str]]], List[EntityFetch]]:
+        operation_node = get_operation(document, operation_name)
+        schema_ids = tuple(range(len(self.schemas)))
+        context = QuerySplitContext(
+            schema_ids,
+            directives_values,
+            owners_ranking,
+            self.preserve_fragments,
+            folded_fields,
+        )
 
         for definition_node in document.definitions:
             if isinstance(definition_node, FragmentDefinitionNode):
-                fragment_node = cast(FragmentDefinitionNode, definition_node)
-                context.fragments[fragment_node.name.value] = fragment_node
-
-        for definition_node in document.definitions:
-            if isinstance(definition_node, OperationDefinitionNode):
-                operation_node = cast(OperationDefinitionNode, definition_node)
-                new_operation = self.filter_operation_node(
-                    operation_node,
-                    context,
-                )
-                if new_operation:
-                    definitions.append(new_operation)
-
-        if not definitions:
-            return None, context.variables
-
-        return DocumentNode(definitions=tuple(definitions)), context.variables
-
-    def filter_operation_node(
-        self,
-        operation_node: OperationDefinitionNode,
-        context: QueryFilterContext,
-    ) -> OperationDefinitionNode | None:
-        type_name = operation_node.operation.value.title()
-        if type_name not in self.fields_map:
-            return None
+                context.fragments[definition_node.name.value] = definition_node
 
-        type_fields = self.fields_map[type_name]
-        self.update_context_variables(operation_node, context)
-        new_selections: List[SelectionNode] = []
-
-        for selection in operation_node.selection_set.selections:
-            if isinstance(selection, FieldNode):
-                if not self._field_passes_type_filter(
-                    selection.name.value,
-                    type_fields,
-                    context.schema_id,
-                    root_graphql_type=type_name,
-                ):
-                    continue
+        operations = self.split_operation_node(
+            operation_node, get_schemas_mask(schema_ids), context
+        )
 
-                field_selection = self.filter_field_node(selection, type_name, context)
+        subqueries = [
+            (
+                schema_id,
+                DocumentNode(
+                    definitions=(
+                        operations[schema_id],
+                        *context.used_fragments[schema_id].values(),
+                    )
+                ),
+                context.variables[schema_id],
+            )
+            for schema_id in schema_ids
+            if schema_id in operations
+        ]
 
-                if field_selection:
-                    new_selections.append(field_selection)
+        return subqueries, self.split_entities(operation_node, context)
 
-            if isinstance(selection, InlineFragmentNode):
-                inline_fragment_selection = self.filter_inline_fragment_node(
-                    selection, type_name, context
+    def split_entities(
+        self, operation_node: OperationDefinitionNode, context: QuerySplitContext
+    ) -> List[EntityFetch]:
+        entity_fetches: List[EntityFetch] = []
+        for (path, type_name, schema_id), selections in context.entities.items():
+            entity_context = QuerySplitContext(
+                (schema_id,), context.directives_values, context.owners_ranking
+            )
+            entity_context.fragments = context.fragments
+
+            new_selections = self.split_selections(
+                selections,
+                type_name,
+                self.fields_ownership.types[type_name],
+                1 << schema_id,
+                entity_context,
+            )
+            if not new_selections[schema_id]:
+                continue
+
+            entity_fetches.append(
+                EntityFetch(
+                    schema_id,
+                    type_name,
+                    path,
+                    tuple(new_selections[schema_id]),
+                    get_used_variable_definitions(
+                        operation_node, entity_context.variables[schema_id]
+                    ),
+                    self.split_entities(operation_node, entity_context),
                 )
+            )
 
-                if inline_fragment_selection:
-                    new_selections.append(inline_fragment_selection)
+        return entity_fetches
 
-            if isinstance(selection, FragmentSpreadNode):
-                new_selections += self.filter_fragment_spread_node(
-                    selection, type_name, context
-                )
+    def get_shared_fields_owners(
+        self, document: DocumentNode, operation_name: str | None = None
+    ) -> Set[int]:
+        operation_node = get_operation(document, operation_name)
+        type_name = operation_node.operation.value.title()
+        shared_fields_owners: Set[int] = set()
+        if type_name not in self.root_types:
+            return shared_fields_owners
+
+        fragments = {
+            definition_node.name.value: definition_node
+            for definition_node in document.definitions
+            if isinstance(definition_node, FragmentDefinitionNode)
+        }
+        collect_shared_fields_owners(
+            operation_node.selection_set.selections,
+            self.fields_ownership.get_type_fields(type_name),
+            fragments,
+            shared_fields_owners,
+            set(),
+        )
+        return shared_fields_owners
 
-        if not new_selections:
-            return None
+    def split_operation_node(
+        self,
+        operation_node: OperationDefinitionNode,
+        schemas_mask: int,
+        context: QuerySplitContext,
+    ) -> Dict[int, OperationDefinitionNode]:
+        type_name = operation_node.operation.value.title()
+        if type_name not in self.fields_ownership.types:
+            return {}
+
+        type_fields = self.fields_ownership.types[type_name]
+        if context.folded_fields and operation_node.operation == OperationType.QUERY:
+            # Fields resolved by proxy resolvers are queried from their schemas
+            type_fields = {
+                **type_fields,
+                **{
+                    field_name: 1 << schema_id
+                    for field_name, schema_id in context.folded_fields.items()
+                },
+            }
+
+        context.add_variables(schemas_mask, get_node_variables(operation_node))
+        new_selections = self.split_selections(
+            operation_node.selection_set.selections,
+            type_name,
+            type_fields,
+            schemas_mask,
+            context,
+            root_graphql_type=type_name,
+        )
 
-        used_variable_definitions = [
-            variable_definition
-            for variable_definition in operation_node.variable_definitions
-            if variable_definition.variable.name.value in context.variables
-        ]
+        operations: Dict[int, OperationDefinitionNode] = {}
+        for schema_id, selections in new_selections.items():
+            if not selections:
+                continue
+
+            operations[schema_id] = OperationDefinitionNode(
+                loc=operation_node.loc,
+                operation=operation_node.operation,
+                name=operation_node.name,
+                directives=operation_node.directives,
+                variable_definitions=get_used_variable_definitions(
+                    operation_node, context.variables[schema_id]
+                ),
+                selection_set=SelectionSetNode(selections=tuple(selections)),
+            )
 
-        return OperationDefinitionNode(
-            loc=operation_node.loc,
-            operation=operation_node.operation,
-            name=operation_node.name,
-            directives=operation_node.directives,
-            variable_definitions=tuple(used_variable_definitions),
-            selection_set=SelectionSetNode(
-                selections=tuple(new_selections),
-            ),
-        )
+        return operations
 
-    def filter_field_node(  # noqa: C901
+    def split_field_node(
         self,
         field_node: FieldNode,
         schema_obj: str,
-        context: QueryFilterContext,
-    ) -> FieldNode | None:
-        self.update_context_variables(field_node, context)
+        schemas_mask: int,
+        context: QuerySplitContext,
+    ) -> Dict[int, FieldNode]:
+        context.add_variables(schemas_mask, get_node_variables(field_node))
         if not field_node.selection_set:
-            return field_node
+            return dict.fromkeys(get_schema_ids(schemas_mask), field_node)
 
         field_name = field_node.name.value
 
@@ -201,214 +371,414 @@ class QueryFilter:
                 for on_name in self.foreign_keys[schema_obj][field_name]
             )
 
-            return FieldNode(
-                loc=field_node.loc,
-                directives=field_node.directives,
-                alias=field_node.alias,
-                name=field_node.name,
-                arguments=field_node.arguments,
-                selection_set=SelectionSetNode(selections=foreign_key),
+            return dict.fromkeys(
+                get_schema_ids(schemas_mask),
+                FieldNode(
+                    loc=field_node.loc,
+                    directives=field_node.directives,
+                    alias=field_node.alias,
+                    name=field_node.name,
+                    arguments=field_node.arguments,
+                    selection_set=SelectionSetNode(selections=foreign_key),
+                ),
             )
 
         if schema_obj == "Query" and field_name in _ROOT_QUERY_INTROSPECTION_FIELDS:
-            return field_node
+            return dict.fromkeys(get_schema_ids(schemas_mask), field_node)
 
         type_name = self.fields_types[schema_obj][field_name]
+        schema_id = get_single_schema_id(schemas_mask)
+        if (
+            schema_id is not None
+            and self.fields_ownership.get_wholly_owning_schema(type_name) == schema_id
+        ):
+            # Whole subtree belongs to single schema and can be reused as it is
+            variables = get_selection_set_variables(
+                field_node.selection_set, context.directives_values
+            )
+            if variables is not None:
+                context.add_variables(schemas_mask, variables)
+                return {schema_id: field_node}
+
         type_is_union = type_name in self.unions
 
         if type_is_union:
             type_fields = {}
         else:
-            type_fields = self.fields_map[type_name]
-
-        fields_dependencies = self.get_type_fields_dependencies(
-            context.schema_id, type_name
+            type_fields = self.fields_ownership.types[type_name]
+
+        context.path.append(get_response_key(field_node))
+        new_selections = self.split_selections(
+            field_node.selection_set.selections,
+            type_name,
+            type_fields,
+            schemas_mask,
+            context,
+            inline_fragments_spreads=type_is_union,
         )
+        context.path.pop()
 
-        new_selections: List[SelectionNode] = []
-        for selection in field_node.selection_set.selections:
-            if isinstance(selection, FieldNode):
-                field_name = selection.name.value
-                if fields_dependencies and field_name in fields_dependencies:
-                    new_selections = merge_selections(
-                        new_selections, fields_dependencies[field_name].selections
-                    )
-
-                if not self._field_passes_type_filter(
-                    field_name, type_fields, context.schema_id
-                ):
-                    continue
-
-                field_selection = self.filter_field_node(selection, type_name, context)
-
-                if field_selection:
-                    new_selections.append(field_selection)
+        if not any(new_selections.values()) and is_selection_set_excluded(
+            field_node.selection_set, context.directives_values, context.fragments
+        ):
+            # Field stays in the query so its value isn't null, like it would
+            # be if upstream evaluated the directives itself.
+            return dict.fromkeys(
+                get_schema_ids(schemas_mask),
+                FieldNode(
+                    loc=field_node.loc,
+                    directives=field_node.directives,
+                    alias=field_node.alias,
+                    name=field_node.name,
+                    arguments=field_node.arguments,
+                    selection_set=SelectionSetNode(
+                        selections=(FieldNode(name=NameNode(value="__typename")),)
+                    ),
+                ),
+            )
 
-            if isinstance(selection, InlineFragmentNode):
-                inline_fragment_selection = self.filter_inline_fragment_node(
-                    selection, type_name, context
+        return {
+            schema_id: (
+                field_node
+                if is_selection_set_unchanged(selections, field_node.selection_set)
+                else FieldNode(
+                    loc=field_node.loc,
+                    directives=field_node.directives,
+                    alias=field_node.alias,
+                    name=field_node.name,
+                    arguments=field_node.arguments,
+                    selection_set=SelectionSetNode(selections=tuple(selections)),
                 )
+            )
+            for schema_id, selections in new_selections.items()
+            if selections
+        }
 
-                if inline_fragment_selection:
-                    new_selections.append(inline_fragment_selection)
-
-            if isinstance(selection, FragmentSpreadNode):
-                if type_is_union:
-                    inline_fragment = self.inline_fragment_spread_node(
-                        selection, schema_obj, context
-                    )
-                    if inline_fragment:
-                        new_selections.append(inline_fragment)
-                else:
-                    new_selections += self.filter_fragment_spread_node(
-                        selection, schema_obj, context
-                    )
-
-        if not new_selections:
-            return None
-
-        return FieldNode(
-            loc=field_node.loc,
-            directives=field_node.directives,
-            alias=field_node.alias,
-            name=field_node.name,
-            arguments=field_node.arguments,
-            selection_set=SelectionSetNode(selections=tuple(new_selections)),
-        )
-
-    def filter_inline_fragment_node(
+    def split_inline_fragment_node(
         self,
         fragment_node: InlineFragmentNode,
         schema_obj: str,
-        context: QueryFilterContext,
-    ) -> InlineFragmentNode | None:
-        self.update_context_variables(fragment_node, context)
+        schemas_mask: int,
+        context: QuerySplitContext,
+    ) -> Dict[int, InlineFragmentNode]:
+        context.add_variables(schemas_mask, get_node_variables(fragment_node))
         type_name = fragment_node.type_condition.name.value
-        type_fields = self.fields_map[type_name]
-
-        fields_dependencies = self.get_type_fields_dependencies(
-            context.schema_id, type_name
+        type_fields = self.fields_ownership.types[type_name]
+
+        new_selections = self.split_selections(
+            fragment_node.selection_set.selections,
+            type_name,
+            type_fields,
+            schemas_mask,
+            context,
         )
 
-        new_selections: List[SelectionNode] = []
-        for selection in fragment_node.selection_set.selections:
-            if isinstance(selection, FieldNode):
-                field_name = selection.name.value
-                if fields_dependencies and field_name in fields_dependencies:
-                    new_selections = merge_selections(
-                        new_selections, fields_dependencies[field_name].selections
-                    )
-
-                if not self._field_passes_type_filter(
-                    field_name, type_fields, context.schema_id
-                ):
-                    continue
-
-                field_selection = self.filter_field_node(selection, type_name, context)
-
-                if field_selection:
-                    new_selections.append(field_selection)
-
-            if isinstance(selection, InlineFragmentNode):
-                inline_fragment_selection = self.filter_inline_fragment_node(
-                    selection, type_name, context
+        return {
+            schema_id: (
+                fragment_node
+                if is_selection_set_unchanged(selections, fragment_node.selection_set)
+                else InlineFragmentNode(
+                    type_condition=fragment_node.type_condition,
+                    selection_set=SelectionSetNode(selections=tuple(selections)),
                 )
+            )
+            for schema_id, selections in new_selections.items()
+            if selections
+        }
 
-                if inline_fragment_selection:
-                    new_selections.append(inline_fragment_selection)
-
-            if isinstance(selection, FragmentSpreadNode):
-                new_selections += self.filter_fragment_spread_node(
-                    selection, schema_obj, context
-                )
+    def split_fragment_spread_node(
+        self,
+        fragment_node: FragmentSpreadNode,
+        schema_obj: str,
+        schemas_mask: int,
+        context: QuerySplitContext,
+    ) -> Dict[int, List[SelectionNode]]:
+        context.add_variables(schemas_mask, get_node_variables(fragment_node))
+        fragment = context.fragments.get(fragment_node.name.value)
 
-        if not new_selections:
-            return None
+        if not fragment:
+            return {}
 
-        return InlineFragmentNode(
-            type_condition=fragment_node.type_condition,
-            selection_set=SelectionSetNode(selections=tuple(new_selections)),
+        type_name = fragment.type_condition.name.value
+        type_fields = self.fields_ownership.types[type_name]
+
+        return self.split_selections(
+            fragment.selection_set.selections,
+            type_name,
+            type_fields,
+            schemas_mask,
+            context,
         )
 
-    def filter_fragment_spread_node(
+    def split_inline_fragment_spread_node(
         self,
         fragment_node: FragmentSpreadNode,
         schema_obj: str,
-        context: QueryFilterContext,
-    ) -> List[SelectionNode]:
-        self.update_context_variables(fragment_node, context)
-        fragment_name = fragment_node.name.value
-        fragment = context.fragments.get(fragment_name)
-
+        schemas_mask: int,
+        context: QuerySplitContext,
+    ) -> Dict[int, InlineFragmentNode]:
+        fragment = context.fragments.get(fragment_node.name.value)
         if not fragment:
-            return []
+            return {}
 
-        type_name = fragment.type_condition.name.value
-        type_fields = self.fields_map[type_name]
+        new_selections = self.split_fragment_spread_node(
+            fragment_node, schema_obj, schemas_mask, context
+        )
+
+        return {
+            schema_id: InlineFragmentNode(
+                type_condition=fragment.type_condition,
+                selection_set=SelectionSetNode(selections=tuple(selections)),
+            )
+            for schema_id, selections in new_selections.items()
+            if selections
+        }
 
-        fields_dependencies = self.get_type_fields_dependencies(
-            context.schema_id, type_name
+    def split_selections(
+        self,
+        selections: Iterable[SelectionNode],
+        type_name: str,
+        type_fields: Dict[str, int],
+        schemas_mask: int,
+        context: QuerySplitContext,
+        *,
+        inline_fragments_spreads: bool = False,
+        root_graphql_type: str | None = None,
+    ) -> Dict[int, List[SelectionNode]]:
+        schema_ids = get_schema_ids(schemas_mask)
+        new_selections: Dict[int, List[SelectionNode]] = {
+            schema_id: [] for schema_id in schema_ids
+        }
+        owners_ranking = (
+            context.owners_ranking if type_name in self.root_types else None
         )
+        schemas_dependencies = {
+            schema_id: fields_dependencies
+            for schema_id in schema_ids
+            if (
+                fields_dependencies := self.get_type_fields_dependencies(
+                    schema_id, type_name
+                )
+            )
+        }
+
+        for selection in selections:
+            if selection.directives and is_selection_excluded(
+                selection, context.directives_values
+            ):
+                continue
 
-        new_selections: List[SelectionNode] = []
-        for selection in fragment.selection_set.selections:
             if isinstance(selection, FieldNode):
                 field_name = selection.name.value
-                if fields_dependencies and field_name in fields_dependencies:
-                    new_selections = merge_selections(
-                        new_selections, fields_dependencies[field_name].selections
+                if schemas_dependencies:
+                    merge_fields_dependencies(
+                        new_selections, schemas_dependencies, field_name
                     )
 
-                if not self._field_passes_type_filter(
-                    field_name, type_fields, context.schema_id
-                ):
-                    continue
-
-                field_selection = self.filter_field_node(selection, type_name, context)
-
-                if field_selection:
-                    new_selections.append(field_selection)
+                field_mask = self._get_field_mask(
+                    field_name,
+                    type_fields,
+                    schemas_mask,
+                    root_graphql_type=root_graphql_type,
+                    owners_ranking=owners_ranking,
+                )
+                if field_mask and selection.selection_set:
+                    append_selections(
+                        new_selections,
+                        self.split_field_node(
+                            selection, type_name, field_mask, context
+                        ),
+                    )
+                elif field_mask:
+                    append_leaf_selection(
+                        new_selections, selection, field_mask, context
+                    )
+                elif self.entity_owners:
+                    self.defer_entity_field(
+                        new_selections,
+                        selection,
+                        type_name,
+                        type_fields,
+                        schemas_mask,
+                        context,
+                    )
 
             if isinstance(selection, InlineFragmentNode):
-                inline_fragment_selection = self.filter_inline_fragment_node(
-                    selection, type_name, context
+                append_selections(
+                    new_selections,
+                    self.split_inline_fragment_node(
+                        selection, type_name, schemas_mask, context
+                    ),
                 )
 
-                if inline_fragment_selection:
-                    new_selections.append(inline_fragment_selection)
-
             if isinstance(selection, FragmentSpreadNode):
-                new_selections += self.filter_fragment_spread_node(
-                    selection, schema_obj, context
+                self.split_fragment_spread(
+                    new_selections,
+                    selection,
+                    type_name,
+                    schemas_mask,
+                    context,
+                    inline_fragments_spreads,
                 )
 
         return new_selections
 
-    def inline_fragment_spread_node(
+    def split_fragment_spread(
         self,
+        new_selections: Dict[int, List[SelectionNode]],
         fragment_node: FragmentSpreadNode,
-        schema_obj: str,
-        context: QueryFilterContext,
-    ) -> InlineFragmentNode | None:
+        type_name: str,
+        schemas_mask: int,
+        context: QuerySplitContext,
+        inline_fragments_spreads: bool,
+    ):
+        if context.preserve_fragments and type_name not in self.root_types:
+            self.append_fragment_spread(
+                new_selections, fragment_node, schemas_mask, context
+            )
+        elif inline_fragments_spreads:
+            append_selections(
+                new_selections,
+                self.split_inline_fragment_spread_node(
+                    fragment_node, type_name, schemas_mask, context
+                ),
+            )
+        else:
+            extend_selections(
+                new_selections,
+                self.split_fragment_spread_node(
+                    fragment_node, type_name, schemas_mask, context
+                ),
+            )
+
+    def append_fragment_spread(
+        self,
+        new_selections: Dict[int, List[SelectionNode]],
+        fragment_node: FragmentSpreadNode,
+        schemas_mask: int,
+        context: QuerySplitContext,
+    ):
         fragment_name = fragment_node.name.value
-        fragment = context.fragments.get(fragment_name)
-        if not fragment:
-            return None
+        if fragment_name not in context.fragments:
+            return
+
+        context.add_variables(schemas_mask, get_node_variables(fragment_node))
+        for schema_id in get_schema_ids(schemas_mask):
+            split_fragment = self.get_split_fragment(fragment_name, schema_id, context)
+            if not split_fragment:
+                continue
+
+            new_selections[schema_id].append(fragment_node)
+            context.variables[schema_id].update(split_fragment.variables)
+            context.used_fragments[schema_id].update(split_fragment.fragments)
+            context.used_fragments[schema_id][fragment_name] = split_fragment.definition
+
+            # Entities deferred in fragment are fetched for every spread of it
+            path = tuple(context.path)
+            for entity, selections in split_fragment.entities.items():
+                entity_path, entity_type, entity_schema_id = entity
+                context.entities.setdefault(
+                    (path + entity_path, entity_type, entity_schema_id), []
+                ).extend(selections)
+
+    def get_split_fragment(
+        self, fragment_name: str, schema_id: int, context: QuerySplitContext
+    ) -> SplitFragment | None:
+        # Fragments are split once for every schema and reused by all spreads
+        key = (fragment_name, schema_id)
+        if key not in context.split_fragments:
+            context.split_fragments[key] = self.split_fragment(
+                context.fragments[fragment_name], schema_id, context
+            )
+        return context.split_fragments[key]
 
-        selections = self.filter_fragment_spread_node(
-            fragment_node, schema_obj, context
+    def split_fragment(
+        self,
+        fragment: FragmentDefinitionNode,
+        schema_id: int,
+        context: QuerySplitContext,
+    ) -> SplitFragment | None:
+        fragment_context = QuerySplitContext(
+            (schema_id,),
+            context.directives_values,
+            context.owners_ranking,
+            preserve_fragments=True,
         )
+        fragment_context.fragments = context.fragments
+        fragment_context.split_fragments = context.split_fragments
 
+        type_name = fragment.type_condition.name.value
+        type_is_union = type_name in self.unions
+        selections = self.split_selections(
+            fragment.selection_set.selections,
+            type_name,
+            {} if type_is_union else self.fields_ownership.get_type_fields(type_name),
+            1 << schema_id,
+            fragment_context,
+            inline_fragments_spreads=type_is_union,
+        )[schema_id]
         if not selections:
             return None
 
-        return InlineFragmentNode(
-            type_condition=fragment.type_condition,
-            selection_set=SelectionSetNode(
-                selections=tuple(selections),
-            ),
+        if is_selection_set_unchanged(selections, fragment.selection_set):
+            definition = fragment
+        else:
+            definition = FragmentDefinitionNode(
+                name=fragment.name,
+                type_condition=fragment.type_condition,
+                directives=fragment.directives,
+                selection_set=SelectionSetNode(selections=tuple(selections)),
+            )
+
+        return SplitFragment(
+            definition,
+            fragment_context.variables[schema_id],
+            fragment_context.used_fragments[schema_id],
+            fragment_context.entities,
         )
 
+    def defer_entity_field(
+        self,
+        new_selections: Dict[int, List[SelectionNode]],
+        field_node: FieldNode,
+        type_name: str,
+        type_fields: Dict[str, int],
+        schemas_mask: int,
+        context: QuerySplitContext,
+    ):
+        schema_id = get_single_schema_id(schemas_mask)
+        if schema_id is None:
+            return
+
+        entity_owners = type_fields.get(field_node.name.value, 0) & (
+            self.entity_owners.get((type_name, schema_id), 0)
+        )
+        if not entity_owners:
+            return
+
+        entity_schema_id = get_single_schema_id(
+            select_owner(entity_owners, context.owners_ranking or ())
+        )
+        entity = (tuple(context.path), type_name, entity_schema_id)
+        if entity not in context.entities:
+            context.entities[entity] = []
+            # Entity is identified in results by its type name and key fields
+            new_selections[schema_id].append(
+                FieldNode(
+                    alias=NameNode(value=ENTITY_TYPENAME_ALIAS),
+                    name=NameNode(value="__typename"),
+                )
+            )
+            for key_field in self.entity_keys[type_name][entity_schema_id].on:
+                new_selections[schema_id].append(
+                    FieldNode(
+                        alias=NameNode(value=get_entity_key_alias(key_field)),
+                        name=NameNode(value=key_field),
+                    )
+                )
+
+        context.entities[entity].append(field_node)
+
     def get_type_fields_dependencies(
         self,
         schema_id: int,
@@ -419,23 +789,148 @@ class QueryFilter:
 
         return None
 
-    def update_context_variables(self, node, context: QueryFilterContext):
-        for argument in getattr(node, "arguments", ()) or ():
-            self.extract_variables(argument.value, context)  # type: ignore
-        for directive in getattr(node, "directives", ()) or ():
-            for argument in directive.arguments:
-                self.extract_variables(argument.value, context)  # type: ignore
 
-    def extract_variables(
-        self,
-        value: VariableNode | ListValueNode | ObjectValueNode,
-        context: QueryFilterContext,
-    ):
-        if isinstance(value, VariableNode):
-            context.variables.add(value.name.value)
-        elif isinstance(value, ObjectValueNode):
-            for field in value.fields:
-                self.extract_variables(field.value, context)  # type: ignore
-        elif isinstance(value, ListValueNode):
-            for item in value.values:
-                self.extract_variables(item, context)  # type: ignore
+def collect_shared_fields_owners(
+    selections: Iterable[SelectionNode],
+    type_fields: Dict[str, int],
+    fragments: Dict[str, FragmentDefinitionNode],
+    shared_fields_owners: Set[int],
+    visited_fragments: Set[str],
+):
+    for selection in selections:
+        if isinstance(selection, FieldNode):
+            field_mask = type_fields.get(selection.name.value, 0)
+            if field_mask & (field_mask - 1):
+                shared_fields_owners.add(field_mask)
+        elif isinstance(selection, InlineFragmentNode):
+            collect_shared_fields_owners(
+                selection.selection_set.selections,
+                type_fields,
+                fragments,
+                shared_fields_owners,
+                visited_fragments,
+            )
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment_name = selection.name.value
+            if fragment_name in fragments and fragment_name not in visited_fragments:
+                visited_fragments.add(fragment_name)
+                collect_shared_fields_owners(
+                    fragments[fragment_name].selection_set.selections,
+                    type_fields,
+                    fragments,
+                    shared_fields_owners,
+                    visited_fragments,
+                )
+
+
+def append_selections(
+    new_selections: Dict[int, List[SelectionNode]],
+    selections: Dict[int, FieldNode] | Dict[int, InlineFragmentNode],
+):
+    for schema_id, selection in selections.items():
+        new_selections[schema_id].append(selection)
+
+
+def append_leaf_selection(
+    new_selections: Dict[int, List[SelectionNode]],
+    field_node: FieldNode,
+    schemas_mask: int,
+    context: QuerySplitContext,
+):
+    if field_node.arguments or field_node.directives:
+        context.add_variables(schemas_mask, get_node_variables(field_node))
+    for schema_id in get_schema_ids(schemas_mask):
+        new_selections[schema_id].append(field_node)
+
+
+def extend_selections(
+    new_selections: Dict[int, List[SelectionNode]],
+    selections: Dict[int, List[SelectionNode]],
+):
+    for schema_id, schema_selections in selections.items():
+        new_selections[schema_id] += schema_selections
+
+
+def merge_fields_dependencies(
+    new_selections: Dict[int, List[SelectionNode]],
+    schemas_dependencies: Dict[int, Dict[str, SelectionSetNode]],
+    field_name: str,
+):
+    for schema_id, fields_dependencies in schemas_dependencies.items():
+        if field_name in fields_dependencies:
+            new_selections[schema_id] = merge_selections(
+                new_selections[schema_id],
+                fields_dependencies[field_name].selections,
+            )
+
+
+def is_selection_set_unchanged(
+    selections: List[SelectionNode], selection_set: SelectionSetNode
+) -> bool:
+    # Node is reused when none of its selections were filtered out or replaced
+    return len(selections) == len(selection_set.selections) and all(
+        selection is original_selection
+        for selection, original_selection in zip(
+            selections, selection_set.selections, strict=True
+        )
+    )
+
+
+def get_response_key(field_node: FieldNode) -> str:
+    if field_node.alias:
+        return field_node.alias.value
+    return field_node.name.value
+
+
+def get_used_variable_definitions(
+    operation_node: OperationDefinitionNode, variables: Set[str]
+) -> Tuple[VariableDefinitionNode, ...]:
+    return tuple(
+        variable_definition
+        for variable_definition in operation_node.variable_definitions
+        if variable_definition.variable.name.value in variables
+    )
+
+
+def get_node_variables(node) -> Set[str]:
+    variables: Set[str] = set()
+    for argument in getattr(node, "arguments", ()) or ():
+        extract_value_variables(argument.value, variables)
+    for directive in getattr(node, "directives", ()) or ():
+        for argument in directive.arguments:
+            extract_value_variables(argument.value, variables)
+    return variables
+
+
+def get_selection_set_variables(
+    selection_set: SelectionSetNode, directives_values: Dict[str, bool]
+) -> Set[str] | None:
+    variables: Set[str] = set()
+    for selection in selection_set.selections:
+        if not isinstance(selection, FieldNode):
+            return None
+        if selection.directives and is_selection_excluded(selection, directives_values):
+            return None
+
+        if selection.arguments or selection.directives:
+            variables.update(get_node_variables(selection))
+        if selection.selection_set:
+            selection_variables = get_selection_set_variables(
+                selection.selection_set, directives_values
+            )
+            if selection_variables is None:
+                return None
+            variables.update(selection_variables)
+
+    return variables
+
+
+def extract_value_variables(value, variables: Set[str]):
+    if isinstance(value, VariableNode):
+        variables.add(value.name.value)
+    elif isinstance(value, ObjectValueNode):
+        for field in value.fields:
+            extract_value_variables(field.value, variables)
+    elif isinstance(value, ListValueNode):
+        for item in value.values:
+            extract_value_variables(item, variables)
@@ -0,0 +1,243 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from graphql import (
+    DocumentNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionNode,
+    VariableDefinitionNode,
+    print_ast,
+)
+
+from .fields_ownership import select_owner
+
+QueryPlanKey = Tuple[str, str | None]
+QueryPlanVariantKey = Tuple[Tuple[bool | None, ...], Tuple[int, ...]]
+
+
+class SubQuery:
+    schema_id: int
+    document: DocumentNode
+    query: str
+    variables: Set[str]
+
+    def __init__(
+        self, schema_id: int, document: DocumentNode, query: str, variables: Set[str]
+    ):
+        self.schema_id = schema_id
+        self.document = document
+        self.query = query
+        self.variables = variables
+
+    def get_payload(self, operation_name: str | None, variables: dict | None) -> dict:
+        return {
+            "operationName": operation_name,
+            "query": self.query,
+            "variables": (
+                {key: variables[key] for key in self.variables if key in variables}
+                if variables
+                else None
+            ),
+        }
+
+
+class EntityFetch:
+    schema_id: int
+    type_name: str
+    path: Tuple[str, ...]
+    selections: Tuple[SelectionNode, ...]
+    variable_definitions: Tuple[VariableDefinitionNode, ...]
+    entity_fetches: List["EntityFetch"]
+
+    def __init__(
+        self,
+        schema_id: int,
+        type_name: str,
+        path: Tuple[str, ...],
+        selections: Tuple[SelectionNode, ...],
+        variable_definitions: Tuple[VariableDefinitionNode, ...] = (),
+        entity_fetches: List["EntityFetch"] | None = None,
+    ):
+        self.schema_id = schema_id
+        self.type_name = type_name
+        self.path = path
+        self.selections = selections
+        self.variable_definitions = variable_definitions
+        self.entity_fetches = entity_fetches or []
+
+
+class QueryPlan:
+    document: DocumentNode
+    subqueries: List[SubQuery]
+    operation: OperationDefinitionNode | None
+    directives_variables: Tuple[str, ...]
+    shared_fields_owners: Tuple[int, ...]
+    entity_fetches: List[EntityFetch]
+    folded_fields: Tuple[str, ...]
+    is_query: bool
+
+    def __init__(
+        self,
+        document: DocumentNode,
+        subqueries: List[SubQuery],
+        operation: OperationDefinitionNode | None = None,
+        directives_variables: Iterable[str] = (),
+        shared_fields_owners: Iterable[int] = (),
+        entity_fetches: List[EntityFetch] | None = None,
+        folded_fields: Iterable[str] = (),
+    ):
+        self.document = document
+        self.subqueries = subqueries
+        self.operation = operation
+        self.directives_variables = tuple(sorted(directives_variables))
+        self.shared_fields_owners = tuple(sorted(shared_fields_owners))
+        self.entity_fetches = entity_fetches or []
+        self.folded_fields = tuple(folded_fields)
+
+        if operation:
+            self.is_query = operation.operation == OperationType.QUERY
+        else:
+            self.is_query = all(
+                definition.operation == OperationType.QUERY
+                for definition in document.definitions
+                if isinstance(definition, OperationDefinitionNode)
+            )
+
+    def get_variant_key(
+        self,
+        directives_values: Dict[str, bool] | None = None,
+        owners_ranking: Sequence[int] | None = None,
+    ) -> QueryPlanVariantKey:
+        if owners_ranking is None:
+            owners: Tuple[int, ...] = ()
+        else:
+            owners = tuple(
+                select_owner(fields_owners, owners_ranking)
+                for fields_owners in self.shared_fields_owners
+            )
+
+        return (
+            get_directives_values_key(self.directives_variables, directives_values),
+            owners,
+        )
+
+
+def get_query_plan_key(
+    document: DocumentNode, operation_name: str | None = None
+) -> QueryPlanKey:
+    if len(get_operations_names(document)) < 2:
+        operation_name = None
+
+    # Query text sent by the client is used as the key, so documents don't have
+    # to be printed again to look up their plans.
+    if document.loc:
+        return document.loc.source.body, operation_name
+
+    return print_ast(document), operation_name
+
+
+def get_directives_values_key(
+    directives_variables: Tuple[str, ...],
+    directives_values: Dict[str, bool] | None,
+) -> Tuple[bool | None, ...]:
+    if not directives_variables:
+        return ()
+    if not directives_values:
+        return (None,) * len(directives_variables)
+    return tuple(
+        directives_values.get(variable_name) for variable_name in directives_variables
+    )
+
+
+def get_operations_names(document: DocumentNode) -> List[str | None]:
+    return [
+        definition.name.value if definition.name else None
+        for definition in document.definitions
+        if isinstance(definition, OperationDefinitionNode)
+    ]
+
+
+class QueryPlanCache:
+    max_size: int
+
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self, max_size: int = 1000):
+        if max_size < 1:
+            raise ValueError("Query plan cache 'max_size' must be greater than 0.")
+
+        self.max_size = max_size
+        self._plans: OrderedDict[
+            Tuple[QueryPlanKey, QueryPlanVariantKey], QueryPlan
+        ] = OrderedDict()
+        # Plan of every cached document with number of its cached variants,
+        # used to find which variables and owners plans of document depend on
+        self._variants: Dict[QueryPlanKey, Tuple[QueryPlan, int]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(
+        self,
+        key: QueryPlanKey,
+        directives_values: Dict[str, bool] | None = None,
+        owners_ranking: Sequence[int] | None = None,
+    ) -> QueryPlan | None:
+        variant = self._variants.get(key)
+        query_plan = None
+        if variant:
+            plan_key = (
+                key,
+                variant[0].get_variant_key(directives_values, owners_ranking),
+            )
+            query_plan = self._plans.get(plan_key)
+
+        if query_plan is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._plans.move_to_end(plan_key)
+        return query_plan
+
+    def set(
+        self,
+        key: QueryPlanKey,
+        query_plan: QueryPlan,
+        directives_values: Dict[str, bool] | None = None,
+        owners_ranking: Sequence[int] | None = None,
+    ):
+        plan_key = (key, query_plan.get_variant_key(directives_values, owners_ranking))
+        if plan_key not in self._plans:
+            _, plans_count = self._variants.get(key, (query_plan, 0))
+            self._variants[key] = (query_plan, plans_count + 1)
+
+        self._plans[plan_key] = query_plan
+        self._plans.move_to_end(plan_key)
+
+        while len(self._plans) > self.max_size:
+            (evicted_key, _), _ = self._plans.popitem(last=False)
+            self.evictions += 1
+
+            variant_plan, plans_count = self._variants[evicted_key]
+            if plans_count > 1:
+                self._variants[evicted_key] = (variant_plan, plans_count - 1)
+            else:
+                del self._variants[evicted_key]
+
+    def clear(self):
+        self._plans.clear()
+        self._variants.clear()
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "size": len(self._plans),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
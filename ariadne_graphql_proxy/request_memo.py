@@ -0,0 +1,28 @@
+from asyncio import Future, ensure_future, shield
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+REQUEST_MEMO_CONTEXT_KEY = "request_memo"
+
+
+def get_request_memo(context: Any) -> Dict[Hashable, Future] | None:
+    if isinstance(context, dict):
+        return context.setdefault(REQUEST_MEMO_CONTEXT_KEY, {})
+
+    return None
+
+
+async def run_memoized(
+    context: Any, key: Hashable, func: Callable[[], Awaitable[Any]]
+) -> Any:
+    memo = get_request_memo(context)
+    if memo is None:
+        return await func()
+
+    call = memo.get(key)
+    if call is None:
+        call = ensure_future(func())
+        memo[key] = call
+
+    # Shield memoized call so timeout of one resolver doesn't cancel
+    # the upstream request for other resolvers sharing it.
+    return await shield(call)
@@ -0,0 +1,36 @@
+from asyncio import Future, ensure_future, shield
+from json import dumps
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    _calls: Dict[Hashable, Future]
+
+    def __init__(self):
+        self._calls = {}
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = ensure_future(func())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._forget(key, call))
+
+        # Shield shared call so cancelling one of waiting requests
+        # doesn't cancel the upstream request for the others.
+        return await shield(call)
+
+    def _forget(self, key: Hashable, call: Future):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+def get_request_key(
+    target: Hashable, payload: dict, headers: dict | None
+) -> Tuple[Hashable, str, str, Tuple[Tuple[str, str], ...]]:
+    return (
+        target,
+        payload.get("query") or "",
+        dumps(payload.get("variables"), sort_keys=True, default=str),
+        tuple(sorted((headers or {}).items())),
+    )
@@ -0,0 +1,136 @@
+from typing import Dict, Set
+
+from graphql import (
+    BooleanValueNode,
+    DirectiveNode,
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    SelectionNode,
+    SelectionSetNode,
+    VariableNode,
+)
+
+SKIP_INCLUDE_DIRECTIVES = ("skip", "include")
+
+
+def is_selection_excluded(
+    selection: SelectionNode, directives_values: Dict[str, bool]
+) -> bool:
+    for directive in selection.directives or ():
+        directive_name = directive.name.value
+        if directive_name not in SKIP_INCLUDE_DIRECTIVES:
+            continue
+
+        condition = get_directive_condition(directive, directives_values)
+        if condition is not None and condition == (directive_name == "skip"):
+            return True
+
+    return False
+
+
+def is_selection_set_excluded(
+    selection_set: SelectionSetNode,
+    directives_values: Dict[str, bool],
+    fragments: Dict[str, FragmentDefinitionNode],
+) -> bool:
+    for selection in selection_set.selections:
+        if is_selection_excluded(selection, directives_values):
+            continue
+        if isinstance(selection, InlineFragmentNode) and is_selection_set_excluded(
+            selection.selection_set, directives_values, fragments
+        ):
+            continue
+        if (
+            isinstance(selection, FragmentSpreadNode)
+            and selection.name.value in fragments
+            and is_selection_set_excluded(
+                fragments[selection.name.value].selection_set,
+                directives_values,
+                fragments,
+            )
+        ):
+            continue
+        return False
+
+    return True
+
+
+def get_directive_condition(
+    directive: DirectiveNode, directives_values: Dict[str, bool]
+) -> bool | None:
+    for argument in directive.arguments:
+        if argument.name.value != "if":
+            continue
+        if isinstance(argument.value, BooleanValueNode):
+            return argument.value.value
+        if isinstance(argument.value, VariableNode):
+            return directives_values.get(argument.value.name.value)
+
+    return None
+
+
+def get_directives_values(
+    operation: OperationDefinitionNode, variables: dict | None
+) -> Dict[str, bool]:
+    directives_values: Dict[str, bool] = {}
+    for variable_definition in operation.variable_definitions:
+        variable_name = variable_definition.variable.name.value
+        if variables and variable_name in variables:
+            value = variables[variable_name]
+        elif isinstance(variable_definition.default_value, BooleanValueNode):
+            value = variable_definition.default_value.value
+        else:
+            continue
+
+        if isinstance(value, bool):
+            directives_values[variable_name] = value
+
+    return directives_values
+
+
+def get_directives_variables(
+    document: DocumentNode, operation: OperationDefinitionNode
+) -> Set[str]:
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+
+    variables: Set[str] = set()
+    visit_selection_set(operation.selection_set, fragments, variables, set())
+    return variables
+
+
+def visit_selection_set(
+    selection_set: SelectionSetNode,
+    fragments: Dict[str, FragmentDefinitionNode],
+    variables: Set[str],
+    visited_fragments: Set[str],
+):
+    for selection in selection_set.selections:
+        for directive in selection.directives or ():
+            if directive.name.value in SKIP_INCLUDE_DIRECTIVES:
+                for argument in directive.arguments:
+                    if isinstance(argument.value, VariableNode):
+                        variables.add(argument.value.name.value)
+
+        if isinstance(selection, FieldNode | InlineFragmentNode):
+            if selection.selection_set:
+                visit_selection_set(
+                    selection.selection_set, fragments, variables, visited_fragments
+                )
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment_name = selection.name.value
+            if fragment_name in fragments and fragment_name not in visited_fragments:
+                visited_fragments.add(fragment_name)
+                visit_selection_set(
+                    fragments[fragment_name].selection_set,
+                    fragments,
+                    variables,
+                    visited_fragments,
+                )
@@ -0,0 +1,277 @@
+from asyncio import AbstractEventLoop, get_running_loop
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Tuple
+
+from httpx import AsyncClient, Limits, Response
+
+from .codec import JSONCodec, get_default_codec
+from .compression import Compressor, get_compressor
+
+ASGIApp = Callable[[dict, Callable, Callable], Awaitable[None]]
+
+
+class UpstreamSettings:
+    max_connections: int | None
+    max_keepalive_connections: int | None
+    keepalive_expiry: float | None
+    http2: bool
+    accept_encoding: str | None
+    request_compression: str | None
+    request_compression_threshold: int
+
+    def __init__(
+        self,
+        *,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry: float | None = 5.0,
+        http2: bool = False,
+        accept_encoding: str | None = None,
+        request_compression: str | None = None,
+        request_compression_threshold: int = 1024,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.accept_encoding = accept_encoding
+        self.request_compression = request_compression
+        self.request_compression_threshold = request_compression_threshold
+
+        self._compressor: Compressor | None = (
+            get_compressor(request_compression) if request_compression else None
+        )
+
+    def get_limits(self) -> Limits:
+        return Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def get_headers(self) -> dict:
+        if self.accept_encoding:
+            return {"accept-encoding": self.accept_encoding}
+        return {}
+
+    def compress(self, content: bytes) -> Tuple[bytes, str | None]:
+        if self._compressor and len(content) >= self.request_compression_threshold:
+            return self._compressor(content), self.request_compression
+        return content, None
+
+
+class ProxyTransport:
+    codec: JSONCodec
+    _default_settings: UpstreamSettings
+    _upstreams: Dict[str, UpstreamSettings]
+    _clients: Dict[str, AsyncClient]
+    _clients_loops: Dict[str, AbstractEventLoop | None]
+
+    def __init__(
+        self,
+        *,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry: float | None = 5.0,
+        http2: bool = False,
+        accept_encoding: str | None = None,
+        request_compression: str | None = None,
+        request_compression_threshold: int = 1024,
+        upstreams: Dict[str, UpstreamSettings] | None = None,
+        codec: JSONCodec | None = None,
+    ):
+        self.codec = codec or get_default_codec()
+        self._default_settings = UpstreamSettings(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            http2=http2,
+            accept_encoding=accept_encoding,
+            request_compression=request_compression,
+            request_compression_threshold=request_compression_threshold,
+        )
+        self._upstreams = dict(upstreams or {})
+        self._clients = {}
+        self._clients_loops = {}
+
+    def configure_upstream(
+        self,
+        url: str,
+        *,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry: float | None = 5.0,
+        http2: bool = False,
+        accept_encoding: str | None = None,
+        request_compression: str | None = None,
+        request_compression_threshold: int = 1024,
+    ):
+        if url in self._clients:
+            raise ValueError(
+                f"Upstream '{url}' can't be configured because its connection pool "
+                "is already open."
+            )
+
+        self._upstreams[url] = UpstreamSettings(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            http2=http2,
+            accept_encoding=accept_encoding,
+            request_compression=request_compression,
+            request_compression_threshold=request_compression_threshold,
+        )
+
+    def get_upstream_settings(self, url: str) -> UpstreamSettings:
+        return self._upstreams.get(url, self._default_settings)
+
+    def get_client(self, url: str) -> AsyncClient:
+        loop = get_current_loop()
+        client = self._clients.get(url)
+        client_loop = self._clients_loops.get(url)
+        if client_loop is None:
+            # Client isn't bound to event loop until it's used in one
+            client_loop = self._clients_loops[url] = loop
+
+        # Connections of client are bound to event loop it was used in
+        if client is None or client.is_closed or client_loop is not loop:
+            client = self.create_client(url)
+            self._clients[url] = client
+            self._clients_loops[url] = loop
+        return client
+
+    def create_client(self, url: str) -> AsyncClient:
+        settings = self.get_upstream_settings(url)
+        return AsyncClient(
+            limits=settings.get_limits(),
+            http2=settings.http2,
+            headers=settings.get_headers(),
+        )
+
+    async def post_json(
+        self, url: str, payload: Any, headers: dict | None = None
+    ) -> Response:
+        client = self.get_client(url)
+        content, content_encoding = self.get_upstream_settings(url).compress(
+            self.codec.encode(payload)
+        )
+
+        request_headers = {"content-type": self.codec.content_type}
+        if content_encoding:
+            request_headers["content-encoding"] = content_encoding
+
+        return await client.post(
+            url,
+            headers={**request_headers, **(headers or {})},
+            content=content,
+        )
+
+    def decode_json(self, response: Response) -> Any:
+        return self.codec.decode(response.content)
+
+    async def startup(self):
+        for url in self._upstreams:
+            self.get_client(url)
+
+    async def shutdown(self):
+        loop = get_current_loop()
+        clients = [
+            client
+            for url, client in self._clients.items()
+            if self._clients_loops.get(url) in (loop, None)
+        ]
+        self._clients = {}
+        self._clients_loops = {}
+
+        # Clients used in other event loops can't be closed in this one
+        for client in clients:
+            await client.aclose()
+
+    @asynccontextmanager
+    async def lifespan(self, _app: Any = None) -> AsyncIterator[None]:
+        await self.startup()
+        try:
+            yield
+        finally:
+            await self.shutdown()
+
+    def wrap_asgi_app(self, app: ASGIApp) -> ASGIApp:
+        async def lifespan_app(scope: dict, receive: Callable, send: Callable):
+            if scope["type"] != "lifespan":
+                return await app(scope, receive, send)
+
+            await self.run_asgi_lifespan(app, scope, receive, send)
+
+        return lifespan_app
+
+    async def run_asgi_lifespan(
+        self, app: ASGIApp, scope: dict, receive: Callable, send: Callable
+    ):
+        app_received = False
+        startup_failed = False
+
+        async def app_receive():
+            nonlocal app_received, startup_failed
+            app_received = True
+
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as exc:
+                    startup_failed = True
+                    await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                    raise
+            return message
+
+        async def app_send(message: dict):
+            if message["type"] in (
+                "lifespan.shutdown.complete",
+                "lifespan.shutdown.failed",
+            ):
+                await self.shutdown()
+            await send(message)
+
+        try:
+            await app(scope, app_receive, app_send)
+        except Exception:
+            if startup_failed:
+                return
+            if app_received:
+                raise
+
+            # Wrapped app doesn't support the lifespan protocol
+            await self.handle_asgi_lifespan(receive, send)
+
+    async def handle_asgi_lifespan(self, receive: Callable, send: Callable):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as exc:
+                    await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def get_current_loop() -> AbstractEventLoop | None:
+    try:
+        return get_running_loop()
+    except RuntimeError:
+        return None
+
+
+_default_transport: ProxyTransport | None = None
+
+
+def get_default_transport() -> ProxyTransport:
+    global _default_transport
+
+    if _default_transport is None:
+        _default_transport = ProxyTransport()
+    return _default_transport
@@ -0,0 +1,72 @@
+"""Compares JSON codecs on encoding payloads and decoding large upstream responses.
+
+Run with: python benchmarks/benchmark_codecs.py
+"""
+
+from timeit import repeat
+
+from ariadne_graphql_proxy.codec import JSONCodec, ORJSONCodec, StandardJSONCodec
+
+ITEMS_COUNTS = (100, 1_000, 10_000)
+REPEATS = 5
+NUMBER = 10
+
+
+def get_response(items_count: int) -> dict:
+    return {
+        "data": {
+            "products": {
+                "edges": [
+                    {
+                        "node": {
+                            "id": f"UHJvZHVjdDo{i}",
+                            "name": f"Product {i}",
+                            "description": "Lorem ipsum dolor sit amet. " * 4,
+                            "price": {"amount": i * 1.25, "currency": "USD"},
+                            "available": i % 3 != 0,
+                            "tags": ["new", "sale", f"category-{i % 10}"],
+                            "variants": [
+                                {"id": f"VmFyaWFudDo{i}{j}", "sku": f"SKU-{i}-{j}"}
+                                for j in range(3)
+                            ],
+                        }
+                    }
+                    for i in range(items_count)
+                ]
+            }
+        }
+    }
+
+
+def get_codecs() -> dict[str, JSONCodec]:
+    codecs: dict[str, JSONCodec] = {"json": StandardJSONCodec()}
+    try:
+        codecs["orjson"] = ORJSONCodec()
+    except ImportError:
+        print("orjson is not installed, skipping ORJSONCodec.")
+    return codecs
+
+
+def measure(func) -> float:
+    return min(repeat(func, repeat=REPEATS, number=NUMBER)) / NUMBER * 1000
+
+
+def main():
+    codecs = get_codecs()
+
+    print(f"{'items':>8} {'size':>10} {'codec':>8} {'encode ms':>10} {'decode ms':>10}")
+    for items_count in ITEMS_COUNTS:
+        response = get_response(items_count)
+        body = StandardJSONCodec().encode(response)
+
+        for name, codec in codecs.items():
+            encode_time = measure(lambda codec=codec: codec.encode(response))
+            decode_time = measure(lambda codec=codec: codec.decode(body))
+            print(
+                f"{items_count:>8} {len(body):>10} {name:>8} "
+                f"{encode_time:>10.3f} {decode_time:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
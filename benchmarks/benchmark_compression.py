@@ -0,0 +1,77 @@
+"""Compares bytes saved and CPU time spent on compressing upstream transfers.
+
+Run with: python benchmarks/benchmark_compression.py
+"""
+
+import gzip
+import zlib
+from timeit import repeat
+
+from benchmark_codecs import get_response
+
+from ariadne_graphql_proxy.codec import StandardJSONCodec
+from ariadne_graphql_proxy.compression import COMPRESSORS, get_compressor
+
+ITEMS_COUNTS = (100, 1_000, 10_000)
+REPEATS = 5
+NUMBER = 10
+
+DECOMPRESSORS = {
+    "gzip": gzip.decompress,
+    "deflate": zlib.decompress,
+}
+
+
+def get_compressors() -> dict:
+    compressors = {}
+    for encoding in COMPRESSORS:
+        try:
+            compressors[encoding] = get_compressor(encoding)
+        except ImportError as exc:
+            print(f"{exc} Skipping.")
+    return compressors
+
+
+def get_decompressor(encoding: str):
+    if encoding in DECOMPRESSORS:
+        return DECOMPRESSORS[encoding]
+    if encoding == "br":
+        from ariadne_graphql_proxy.compression import brotli
+
+        return brotli.decompress
+    if encoding == "zstd":
+        from ariadne_graphql_proxy.compression import zstandard
+
+        return zstandard.ZstdDecompressor().decompress
+    raise ValueError(encoding)
+
+
+def measure(func) -> float:
+    return min(repeat(func, repeat=REPEATS, number=NUMBER)) / NUMBER * 1000
+
+
+def main():
+    compressors = get_compressors()
+
+    print(
+        f"{'items':>8} {'size':>10} {'encoding':>8} {'compressed':>10} "
+        f"{'saved':>7} {'compress ms':>12} {'decompress ms':>14}"
+    )
+    for items_count in ITEMS_COUNTS:
+        body = StandardJSONCodec().encode(get_response(items_count))
+
+        for encoding, compressor in compressors.items():
+            compressed = compressor(body)
+            decompressor = get_decompressor(encoding)
+            compress_time = measure(lambda c=compressor: c(body))
+            decompress_time = measure(lambda d=decompressor, c=compressed: d(c))
+            saved = 1 - len(compressed) / len(body)
+            print(
+                f"{items_count:>8} {len(body):>10} {encoding:>8} "
+                f"{len(compressed):>10} {saved:>7.1%} "
+                f"{compress_time:>12.3f} {decompress_time:>14.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compares inlining fragments in queries sent to upstream schemas with
+preserving them as filtered fragment definitions.
+
+Run with: python benchmarks/benchmark_fragments.py
+"""
+
+from timeit import repeat
+
+from ariadne import make_executable_schema
+from graphql import parse
+
+from ariadne_graphql_proxy import ProxySchema
+
+SCHEMAS_COUNTS = (2, 10)
+SPREADS_COUNTS = (10, 40)
+FIELDS_COUNT = 10
+REPEATS = 5
+NUMBER = 10
+
+
+def get_schema(schema_id: int):
+    fields = "\n".join(f"value{schema_id}_{i}: String!" for i in range(FIELDS_COUNT))
+    return make_executable_schema(
+        f"""
+        type Query {{
+            item(id: ID!): Item
+        }}
+
+        type Item {{
+            id: ID!
+            {fields}
+            related: [Item!]!
+        }}
+        """
+    )
+
+
+def get_proxy_schema(schemas_count: int, preserve_fragments: bool) -> ProxySchema:
+    proxy_schema = ProxySchema(
+        query_plan_cache_size=None, preserve_fragments=preserve_fragments
+    )
+    for schema_id in range(schemas_count):
+        proxy_schema.add_schema(
+            get_schema(schema_id), f"http://graphql.example.com/{schema_id}/"
+        )
+    proxy_schema.get_final_schema()
+    return proxy_schema
+
+
+def get_query(schemas_count: int, spreads_count: int) -> str:
+    fields = " ".join(
+        f"value{schema_id}_{i}"
+        for schema_id in range(schemas_count)
+        for i in range(FIELDS_COUNT)
+    )
+    items = " ".join(
+        f"item{i}: item(id: {i}) {{ ...ItemFields related {{ ...ItemFields }} }}"
+        for i in range(spreads_count // 2)
+    )
+    return f"query GetItems {{ {items} }} fragment ItemFields on Item {{ id {fields} }}"
+
+
+def get_payload_size(proxy_schema: ProxySchema, document) -> int:
+    query_plan = proxy_schema.create_query_plan(document)
+    return sum(
+        len(subquery.query.encode("utf-8")) for subquery in query_plan.subqueries
+    )
+
+
+def measure(func) -> float:
+    return min(repeat(func, repeat=REPEATS, number=NUMBER)) / NUMBER * 1000
+
+
+def main():
+    print(
+        f"{'schemas':>8} {'spreads':>8} {'inlined KB':>11} {'preserved KB':>13} "
+        f"{'inlined ms':>11} {'preserved ms':>13}"
+    )
+    for schemas_count in SCHEMAS_COUNTS:
+        inlining_schema = get_proxy_schema(schemas_count, False)
+        preserving_schema = get_proxy_schema(schemas_count, True)
+        for spreads_count in SPREADS_COUNTS:
+            document = parse(get_query(schemas_count, spreads_count))
+
+            inlined_size = get_payload_size(inlining_schema, document) / 1024
+            preserved_size = get_payload_size(preserving_schema, document) / 1024
+            inlined_time = measure(lambda: inlining_schema.create_query_plan(document))
+            preserved_time = measure(
+                lambda: preserving_schema.create_query_plan(document)
+            )
+            print(
+                f"{schemas_count:>8} {spreads_count:>8} {inlined_size:>11.1f} "
+                f"{preserved_size:>13.1f} {inlined_time:>11.3f} "
+                f"{preserved_time:>13.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Measures memory allocated by splitting query between schemas.
+
+Run with: python benchmarks/benchmark_query_allocations.py
+"""
+
+import gc
+import tracemalloc
+from typing import Callable, Tuple
+
+from ariadne import make_executable_schema
+from graphql import parse
+
+from ariadne_graphql_proxy import ProxySchema
+
+SCHEMAS_COUNTS = (2, 10, 25)
+DEPTHS = (2, 4)
+
+
+def get_schema(schema_id: int):
+    return make_executable_schema(
+        f"""
+        type Query {{
+            items{schema_id}: [Item{schema_id}!]!
+            node: Node
+        }}
+
+        type Item{schema_id} {{
+            id: ID!
+            name: String!
+            description: String
+            children: [Item{schema_id}!]!
+        }}
+
+        type Node {{
+            id: ID!
+            value{schema_id}: String
+            children: [Node!]!
+        }}
+        """
+    )
+
+
+def get_proxy_schema(schemas_count: int) -> ProxySchema:
+    proxy_schema = ProxySchema()
+    for schema_id in range(schemas_count):
+        proxy_schema.add_schema(
+            get_schema(schema_id), f"http://graphql.example.com/{schema_id}/"
+        )
+    proxy_schema.get_final_schema()
+    return proxy_schema
+
+
+def get_selection(fields: str, depth: int) -> str:
+    if not depth:
+        return fields
+    return f"{fields} children {{ {get_selection(fields, depth - 1)} }}"
+
+
+def get_query(schemas_count: int, depth: int) -> str:
+    items = " ".join(
+        f"items{schema_id} {{ {get_selection('id name description', depth)} }}"
+        for schema_id in range(schemas_count)
+    )
+    return f"query GetItems {{ {items} node {{ {get_selection('id', depth)} }} }}"
+
+
+def measure(func: Callable) -> Tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    allocated, _ = tracemalloc.get_traced_memory()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return (current - allocated) / 1024, (peak - allocated) / 1024
+
+
+def main():
+    print(f"{'schemas':>8} {'depth':>6} {'split KB':>9} {'peak KB':>8}")
+    for schemas_count in SCHEMAS_COUNTS:
+        proxy_schema = get_proxy_schema(schemas_count)
+        for depth in DEPTHS:
+            document = parse(get_query(schemas_count, depth))
+
+            # Warm up caches before measuring allocations
+            proxy_schema.query_filter.split_query(document)
+
+            allocated, peak = measure(
+                lambda: proxy_schema.query_filter.split_query(document)
+            )
+            print(f"{schemas_count:>8} {depth:>6} {allocated:>9.1f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Measures time of splitting query between schemas for growing numbers of
+schemas and selected fields.
+
+Run with: python benchmarks/benchmark_query_split.py
+"""
+
+from timeit import repeat
+
+from ariadne import make_executable_schema
+from graphql import parse
+
+from ariadne_graphql_proxy import ProxySchema
+
+SCHEMAS_COUNTS = (2, 10, 25)
+FIELDS_COUNTS = (10, 100)
+REPEATS = 5
+NUMBER = 10
+
+
+def get_schema(schema_id: int, fields_count: int):
+    fields = "\n".join(f"value{schema_id}_{i}: String!" for i in range(fields_count))
+    return make_executable_schema(
+        f"""
+        type Query {{
+            items{schema_id}: [Item!]!
+            node: Item
+        }}
+
+        type Item {{
+            id: ID!
+            {fields}
+            children: [Item!]!
+        }}
+        """
+    )
+
+
+def get_proxy_schema(schemas_count: int, fields_count: int) -> ProxySchema:
+    proxy_schema = ProxySchema()
+    for schema_id in range(schemas_count):
+        proxy_schema.add_schema(
+            get_schema(schema_id, fields_count),
+            f"http://graphql.example.com/{schema_id}/",
+        )
+    proxy_schema.get_final_schema()
+    return proxy_schema
+
+
+def get_query(schemas_count: int, fields_count: int) -> str:
+    fields = " ".join(
+        f"value{schema_id}_{i}"
+        for schema_id in range(schemas_count)
+        for i in range(fields_count)
+    )
+    items = " ".join(
+        f"items{schema_id} {{ id value{schema_id}_0 }}"
+        for schema_id in range(schemas_count)
+    )
+    return (
+        f"query GetItems {{ {items} node {{ ...ItemFields children {{ id }} }} }} "
+        f"fragment ItemFields on Item {{ id {fields} }}"
+    )
+
+
+def measure(func) -> float:
+    return min(repeat(func, repeat=REPEATS, number=NUMBER)) / NUMBER * 1000
+
+
+def main():
+    print(f"{'schemas':>8} {'fields':>8} {'split ms':>9}")
+    for schemas_count in SCHEMAS_COUNTS:
+        for fields_count in FIELDS_COUNTS:
+            proxy_schema = get_proxy_schema(schemas_count, fields_count)
+            document = parse(get_query(schemas_count, fields_count))
+
+            split_time = measure(
+                lambda: proxy_schema.query_filter.split_query(document)
+            )
+            print(
+                f"{schemas_count:>8} {schemas_count * fields_count:>8} "
+                f"{split_time:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ from ariadne_graphql_proxy.contrib.cloudflare import (
     CloudflareCacheBackend,
     CloudflareCacheError,
 )
+from ariadne_graphql_proxy.transport import ProxyTransport
 
 
 @pytest.fixture
@@ -267,3 +268,23 @@ async def test_get_returns_default_value_for_404_response(httpx_mock, list_keys_
     value = await cache.get("key", "default")
 
     assert value == "default"
+
+
+@pytest.mark.asyncio
+async def test_get_and_set_reuse_transport_client(httpx_mock, mocker, list_keys_json):
+    httpx_mock.add_response(method="GET", status_code=200, json=list_keys_json)
+    httpx_mock.add_response(method="PUT", status_code=200)
+    httpx_mock.add_response(method="GET", status_code=200, content=b'"test_value"')
+
+    transport = ProxyTransport()
+    create_client = mocker.spy(transport, "create_client")
+
+    cache = CloudflareCacheBackend(
+        account_id="acc_id", namespace_id="kv_id", transport=transport
+    )
+
+    await cache.set("key", "test_value")
+    assert await cache.get("key") == "test_value"
+
+    create_client.assert_called_once()
+    await transport.shutdown()
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+from graphql import parse
+
+from ariadne_graphql_proxy import ProxySchema
+from ariadne_graphql_proxy.bulkhead import Bulkhead, BulkheadFullError
+
+
+def test_bulkhead_requires_positive_concurrency():
+    with pytest.raises(ValueError):
+        Bulkhead(0)
+
+
+def test_bulkhead_requires_non_negative_queue():
+    with pytest.raises(ValueError):
+        Bulkhead(1, max_queue=-1)
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_limits_concurrency():
+    bulkhead = Bulkhead(2)
+    running = 0
+    max_running = 0
+
+    async def task():
+        nonlocal running, max_running
+        async with bulkhead.limit():
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*[task() for _ in range(6)])
+
+    assert max_running == 2
+    assert bulkhead.in_flight == 0
+    assert bulkhead.acquired == 6
+    assert bulkhead.max_queue_depth == 4
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_rejects_requests_when_queue_is_full():
+    bulkhead = Bulkhead(1, max_queue=1)
+    release = asyncio.Event()
+
+    async def task():
+        async with bulkhead.limit():
+            await release.wait()
+
+    running = asyncio.create_task(task())
+    queued = asyncio.create_task(task())
+    await asyncio.sleep(0)
+
+    with pytest.raises(BulkheadFullError):
+        await bulkhead.acquire()
+
+    assert bulkhead.queue_depth == 1
+    assert bulkhead.rejected == 1
+
+    release.set()
+    await asyncio.gather(running, queued)
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_rejects_requests_waiting_too_long():
+    bulkhead = Bulkhead(1, max_wait=0.01)
+    release = asyncio.Event()
+
+    async def task():
+        async with bulkhead.limit():
+            await release.wait()
+
+    running = asyncio.create_task(task())
+    await asyncio.sleep(0)
+
+    with pytest.raises(BulkheadFullError):
+        await bulkhead.acquire()
+
+    assert bulkhead.queue_depth == 0
+    assert bulkhead.rejected == 1
+
+    release.set()
+    await running
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_records_wait_time_metrics():
+    bulkhead = Bulkhead(1)
+
+    async def task():
+        async with bulkhead.limit():
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(task(), task())
+
+    metrics = bulkhead.get_metrics()
+    assert metrics["acquired"] == 2
+    assert metrics["rejected"] == 0
+    assert metrics["wait_time_max"] > 0
+    assert metrics["wait_time_total"] == metrics["wait_time_max"]
+    assert metrics["wait_time_avg"] == metrics["wait_time_max"] / 2
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_returns_error_for_upstream_with_full_bulkhead(
+    httpx_mock, schema_json, other_schema_json
+):
+    httpx_mock.add_response(url="http://graphql.example.com/1/", json=schema_json)
+    httpx_mock.add_response(url="http://graphql.example.com/2/", json=other_schema_json)
+    httpx_mock.add_response(
+        url="http://graphql.example.com/2/", json={"data": {"other": "Dolor Met"}}
+    )
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_remote_schema(
+        "http://graphql.example.com/1/",
+        label="busy",
+        max_concurrency=1,
+        max_queue=0,
+    )
+    proxy_schema.add_remote_schema("http://graphql.example.com/2/", label="other")
+    proxy_schema.get_final_schema()
+
+    # Occupy the only available slot
+    await proxy_schema.bulkheads[0].acquire()
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("query { basic other }")
+    )
+
+    assert root_value.root_value == {"other": "Dolor Met"}
+    assert root_value.errors == [
+        {
+            "message": "Upstream concurrency limit exceeded.",
+            "path": ["busy"],
+            "extensions": {"code": "UPSTREAM_OVERLOADED"},
+        }
+    ]
+    assert proxy_schema.get_bulkheads_metrics()["busy"]["rejected"] == 1
+
+
+def test_bulkheads_metrics_skip_schemas_without_bulkhead(schema, other_schema):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(schema, label="limited", max_concurrency=5)
+    proxy_schema.add_schema(other_schema, label="unlimited")
+
+    assert list(proxy_schema.get_bulkheads_metrics()) == ["limited"]
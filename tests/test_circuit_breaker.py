@@ -0,0 +1,407 @@
+import asyncio
+
+import pytest
+from freezegun import freeze_time
+from graphql import parse
+from httpx import ConnectError
+
+from ariadne_graphql_proxy import CircuitBreaker, ProxySchema
+from ariadne_graphql_proxy.bulkhead import BulkheadFullError
+from ariadne_graphql_proxy.circuit_breaker import CircuitOpenError
+
+
+def test_circuit_breaker_validates_options():
+    with pytest.raises(ValueError):
+        CircuitBreaker(failure_rate_threshold=0)
+    with pytest.raises(ValueError):
+        CircuitBreaker(slow_call_rate_threshold=2)
+    with pytest.raises(ValueError):
+        CircuitBreaker(window_size=5, min_calls=10)
+    with pytest.raises(ValueError):
+        CircuitBreaker(probe_calls=0)
+
+
+def test_circuit_breaker_stays_closed_until_min_calls_are_recorded():
+    circuit_breaker = CircuitBreaker(min_calls=5)
+    for _ in range(4):
+        circuit_breaker.record(False, 0.1)
+
+    assert circuit_breaker.state == "closed"
+
+
+def test_circuit_breaker_opens_when_failure_rate_is_exceeded():
+    circuit_breaker = CircuitBreaker(failure_rate_threshold=0.5, min_calls=4)
+    circuit_breaker.record(True, 0.1)
+    circuit_breaker.record(True, 0.1)
+    circuit_breaker.record(False, 0.1)
+    assert circuit_breaker.state == "closed"
+
+    circuit_breaker.record(False, 0.1)
+    assert circuit_breaker.state == "open"
+    assert circuit_breaker.opened == 1
+
+
+def test_circuit_breaker_opens_when_slow_call_rate_is_exceeded():
+    circuit_breaker = CircuitBreaker(
+        slow_call_duration=1.0, slow_call_rate_threshold=0.5, min_calls=2
+    )
+    circuit_breaker.record(True, 0.1)
+    circuit_breaker.record(True, 2.0)
+
+    assert circuit_breaker.state == "open"
+    assert circuit_breaker.slow_calls == 1
+
+
+def test_circuit_breaker_ignores_slow_calls_if_duration_is_not_set():
+    circuit_breaker = CircuitBreaker(min_calls=2)
+    circuit_breaker.record(True, 100)
+    circuit_breaker.record(True, 100)
+
+    assert circuit_breaker.state == "closed"
+
+
+def test_open_circuit_breaker_rejects_requests():
+    circuit_breaker = CircuitBreaker(min_calls=1)
+    circuit_breaker.record(False, 0.1)
+
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.acquire()
+
+    assert circuit_breaker.rejected == 1
+
+
+def test_circuit_breaker_becomes_half_open_after_open_duration():
+    with freeze_time("2026-01-01 12:00:00") as frozen_time:
+        circuit_breaker = CircuitBreaker(min_calls=1, open_duration=30)
+        circuit_breaker.record(False, 0.1)
+
+        frozen_time.tick(29)
+        assert circuit_breaker.state == "open"
+
+        frozen_time.tick(1)
+        assert circuit_breaker.state == "half_open"
+
+
+def test_half_open_circuit_breaker_limits_probe_requests():
+    circuit_breaker = CircuitBreaker(min_calls=1, open_duration=0, probe_calls=2)
+    circuit_breaker.record(False, 0.1)
+
+    circuit_breaker.acquire()
+    circuit_breaker.acquire()
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.acquire()
+
+    circuit_breaker.release()
+    circuit_breaker.acquire()
+
+
+def test_half_open_circuit_breaker_closes_after_successful_probes():
+    circuit_breaker = CircuitBreaker(min_calls=1, open_duration=0, probe_calls=2)
+    circuit_breaker.record(False, 0.1)
+
+    circuit_breaker.acquire()
+    circuit_breaker.record(True, 0.1)
+    assert circuit_breaker.state == "half_open"
+
+    circuit_breaker.acquire()
+    circuit_breaker.record(True, 0.1)
+    assert circuit_breaker.state == "closed"
+
+
+def test_half_open_circuit_breaker_opens_after_failed_probe():
+    with freeze_time("2026-01-01 12:00:00") as frozen_time:
+        circuit_breaker = CircuitBreaker(min_calls=1, open_duration=30)
+        circuit_breaker.record(False, 0.1)
+        frozen_time.tick(30)
+
+        circuit_breaker.acquire()
+        circuit_breaker.record(False, 0.1)
+
+        assert circuit_breaker.state == "open"
+        assert circuit_breaker.opened == 2
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_run_records_success():
+    circuit_breaker = CircuitBreaker()
+
+    async def fetch():
+        return "result"
+
+    assert await circuit_breaker.run(fetch) == "result"
+    assert circuit_breaker.get_metrics() == {
+        "state": "closed",
+        "calls": 1,
+        "failures": 0,
+        "slow_calls": 0,
+        "rejected": 0,
+        "opened": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_run_records_failure():
+    circuit_breaker = CircuitBreaker(min_calls=1)
+
+    async def fetch():
+        raise ConnectError("Connection refused")
+
+    with pytest.raises(ConnectError):
+        await circuit_breaker.run(fetch)
+
+    assert circuit_breaker.failures == 1
+    assert circuit_breaker.state == "open"
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_run_doesnt_record_local_overload():
+    circuit_breaker = CircuitBreaker(min_calls=1)
+
+    async def fetch():
+        raise BulkheadFullError("Upstream concurrency limit exceeded.")
+
+    with pytest.raises(BulkheadFullError):
+        await circuit_breaker.run(fetch)
+
+    assert circuit_breaker.calls == 0
+    assert circuit_breaker.state == "closed"
+
+
+@pytest.fixture
+def failing_fetch_data(mocker):
+    async def fetch_data(schema_id, context, url, headers, json):
+        if url == "http://graphql.example.com/failing/":
+            raise ConnectError("Connection refused")
+        return schema_id, {"data": {"other": "Dolor Met"}}
+
+    return mocker.patch.object(ProxySchema, "fetch_data", side_effect=fetch_data)
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_skips_schema_with_open_circuit_breaker(
+    schema, other_schema, failing_fetch_data
+):
+    circuit_breaker = CircuitBreaker(min_calls=1)
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(
+        schema,
+        "http://graphql.example.com/failing/",
+        label="failing",
+        circuit_breaker=circuit_breaker,
+    )
+    proxy_schema.add_schema(other_schema, "http://graphql.example.com/other/")
+    proxy_schema.get_final_schema()
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("query { basic other }")
+    )
+
+    assert root_value.root_value == {"other": "Dolor Met"}
+    assert root_value.errors == [
+        {
+            "message": "Upstream request failed.",
+            "path": ["failing"],
+            "extensions": {"code": "UPSTREAM_CONNECTION_ERROR"},
+        }
+    ]
+    assert circuit_breaker.failures == 1
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("query { basic other }")
+    )
+
+    assert root_value.root_value == {"other": "Dolor Met"}
+    assert root_value.errors == [
+        {
+            "message": "Upstream circuit breaker is open.",
+            "path": ["failing"],
+            "extensions": {"code": "UPSTREAM_CIRCUIT_OPEN"},
+        }
+    ]
+    assert failing_fetch_data.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_records_timeouts_in_circuit_breaker(schema, mocker):
+    async def fetch_data(schema_id, context, url, headers, json):
+        await asyncio.sleep(1)
+
+    mocker.patch.object(ProxySchema, "fetch_data", side_effect=fetch_data)
+
+    circuit_breaker = CircuitBreaker(min_calls=1)
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(
+        schema,
+        "http://graphql.example.com/slow/",
+        label="slow",
+        timeout=0.01,
+        circuit_breaker=circuit_breaker,
+    )
+    proxy_schema.get_final_schema()
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("query { basic }")
+    )
+
+    assert root_value.errors[0]["extensions"] == {"code": "UPSTREAM_TIMEOUT"}
+    assert circuit_breaker.state == "open"
+
+
+def test_proxy_schema_returns_circuit_breakers_metrics(schema, other_schema):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(
+        schema,
+        "http://graphql.example.com/",
+        label="breaker",
+        circuit_breaker=CircuitBreaker(),
+    )
+    proxy_schema.add_schema(other_schema, "http://graphql.example.com/other/")
+
+    assert proxy_schema.get_circuit_breakers_metrics() == {
+        "breaker": {
+            "state": "closed",
+            "calls": 0,
+            "failures": 0,
+            "slow_calls": 0,
+            "rejected": 0,
+            "opened": 0,
+        }
+    }
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_records_invalid_responses_in_circuit_breaker(
+    schema, other_schema, httpx_mock
+):
+    httpx_mock.add_response(
+        url="http://graphql.example.com/failing/", content=b"<html>Bad Gateway"
+    )
+    httpx_mock.add_response(
+        url="http://graphql.example.com/other/", json={"data": {"other": "Dolor"}}
+    )
+
+    circuit_breaker = CircuitBreaker(min_calls=1)
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(
+        schema,
+        "http://graphql.example.com/failing/",
+        label="failing",
+        circuit_breaker=circuit_breaker,
+    )
+    proxy_schema.add_schema(other_schema, "http://graphql.example.com/other/")
+    proxy_schema.get_final_schema()
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("query { basic other }")
+    )
+
+    assert root_value.root_value == {"other": "Dolor"}
+    assert root_value.errors == [
+        {
+            "message": "Upstream returned invalid JSON response.",
+            "path": ["failing"],
+            "extensions": {"code": "UPSTREAM_INVALID_RESPONSE"},
+        }
+    ]
+    assert circuit_breaker.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_records_server_errors_in_circuit_breaker(
+    schema, httpx_mock
+):
+    httpx_mock.add_response(
+        url="http://graphql.example.com/failing/",
+        status_code=503,
+        json={"data": {"basic": "Lorem Ipsum"}},
+    )
+
+    circuit_breaker = CircuitBreaker(min_calls=1)
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(
+        schema,
+        "http://graphql.example.com/failing/",
+        label="failing",
+        circuit_breaker=circuit_breaker,
+    )
+    proxy_schema.get_final_schema()
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("query { basic }")
+    )
+
+    assert root_value == {"basic": "Lorem Ipsum"}
+    assert circuit_breaker.failures == 1
+    assert circuit_breaker.state == "open"
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_records_coalesced_failure_in_circuit_breaker_once(
+    schema, mocker
+):
+    async def fetch_data(schema_id, context, url, headers, json):
+        await asyncio.sleep(0.01)
+        raise ConnectError("Connection refused")
+
+    fetch_data_mock = mocker.patch.object(
+        ProxySchema, "fetch_data", side_effect=fetch_data
+    )
+
+    circuit_breaker = CircuitBreaker()
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(
+        schema,
+        "http://graphql.example.com/failing/",
+        label="failing",
+        coalesce_requests=True,
+        circuit_breaker=circuit_breaker,
+    )
+    proxy_schema.get_final_schema()
+
+    results = await asyncio.gather(
+        *[
+            proxy_schema.root_resolver({}, None, None, parse("query { basic }"))
+            for _ in range(3)
+        ]
+    )
+
+    assert [result.errors[0]["extensions"] for result in results] == [
+        {"code": "UPSTREAM_CONNECTION_ERROR"}
+    ] * 3
+    assert fetch_data_mock.call_count == 1
+    assert circuit_breaker.calls == 1
+    assert circuit_breaker.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_doesnt_record_request_deadline_in_circuit_breaker(
+    schema, mocker
+):
+    async def fetch_data(schema_id, context, url, headers, json):
+        await asyncio.sleep(1)
+
+    mocker.patch.object(ProxySchema, "fetch_data", side_effect=fetch_data)
+
+    circuit_breaker = CircuitBreaker(min_calls=1)
+
+    proxy_schema = ProxySchema(deadline=0.01)
+    proxy_schema.add_schema(
+        schema,
+        "http://graphql.example.com/slow/",
+        label="slow",
+        circuit_breaker=circuit_breaker,
+    )
+    proxy_schema.get_final_schema()
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("query { basic }")
+    )
+
+    assert root_value.errors[0]["extensions"] == {"code": "UPSTREAM_TIMEOUT"}
+    assert circuit_breaker.calls == 0
+    assert circuit_breaker.state == "closed"
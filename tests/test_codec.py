@@ -0,0 +1,92 @@
+import json
+
+import pytest
+from graphql import parse
+
+from ariadne_graphql_proxy import (
+    JSONCodec,
+    ORJSONCodec,
+    ProxySchema,
+    ProxyTransport,
+    StandardJSONCodec,
+)
+from ariadne_graphql_proxy.codec import get_default_codec
+
+VALUE = {"data": {"items": [{"id": 1, "name": "Zażółć", "price": 1.5}, None]}}
+
+
+@pytest.mark.parametrize("codec", (StandardJSONCodec(), ORJSONCodec()))
+def test_codec_encodes_value_to_json_bytes(codec):
+    encoded = codec.encode(VALUE)
+
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == VALUE
+
+
+@pytest.mark.parametrize("codec", (StandardJSONCodec(), ORJSONCodec()))
+def test_codec_decodes_json_bytes(codec):
+    assert codec.decode(json.dumps(VALUE).encode()) == VALUE
+
+
+def test_base_codec_requires_custom_methods():
+    with pytest.raises(NotImplementedError):
+        JSONCodec().encode(VALUE)
+    with pytest.raises(NotImplementedError):
+        JSONCodec().decode(b"{}")
+
+
+def test_default_codec_uses_orjson_if_available():
+    assert isinstance(get_default_codec(), ORJSONCodec)
+
+
+def test_default_codec_uses_stdlib_json_if_orjson_is_not_available(mocker):
+    mocker.patch("ariadne_graphql_proxy.codec.orjson", None)
+
+    assert isinstance(get_default_codec(), StandardJSONCodec)
+
+
+def test_orjson_codec_raises_import_error_if_orjson_is_not_available(mocker):
+    mocker.patch("ariadne_graphql_proxy.codec.orjson", None)
+
+    with pytest.raises(ImportError):
+        ORJSONCodec()
+
+
+@pytest.mark.asyncio
+async def test_proxy_schema_uses_transport_codec_for_upstream_requests(
+    httpx_mock, schema_json
+):
+    httpx_mock.add_response(json=schema_json)
+    httpx_mock.add_response(json={"data": {"basic": "Lorem Ipsum"}})
+
+    class TracingCodec(StandardJSONCodec):
+        def __init__(self):
+            self.calls = []
+
+        def encode(self, value):
+            self.calls.append("encode")
+            return super().encode(value)
+
+        def decode(self, value):
+            self.calls.append("decode")
+            return super().decode(value)
+
+    codec = TracingCodec()
+    proxy_schema = ProxySchema(transport=ProxyTransport(codec=codec))
+    proxy_schema.add_remote_schema("http://graphql.example.com/")
+    proxy_schema.get_final_schema()
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("query { basic }")
+    )
+
+    assert root_value == {"basic": "Lorem Ipsum"}
+    assert codec.calls == ["encode", "decode"]
+
+    request = httpx_mock.get_requests(url="http://graphql.example.com/")[-1]
+    assert request.headers["content-type"] == "application/json"
+    assert json.loads(request.content) == {
+        "operationName": None,
+        "query": "{\n  basic\n}",
+        "variables": None,
+    }
@@ -0,0 +1,143 @@
+import gzip
+import json
+import zlib
+
+import pytest
+from pytest_httpx import IteratorStream
+
+from ariadne_graphql_proxy import ProxyTransport, UpstreamSettings
+from ariadne_graphql_proxy.compression import get_compressor
+
+GRAPHQL_URL = "http://upstream.example.com/graphql/"
+PAYLOAD = {"query": "{ products { id name description } }", "variables": None}
+
+
+def test_get_compressor_returns_gzip_compressor():
+    compressor = get_compressor("gzip")
+
+    assert gzip.decompress(compressor(b"Lorem ipsum")) == b"Lorem ipsum"
+
+
+def test_get_compressor_returns_deflate_compressor():
+    compressor = get_compressor("deflate")
+
+    assert zlib.decompress(compressor(b"Lorem ipsum")) == b"Lorem ipsum"
+
+
+def test_get_compressor_raises_value_error_for_unsupported_compression():
+    with pytest.raises(ValueError):
+        get_compressor("lzma")
+
+
+def test_get_compressor_raises_import_error_for_missing_package(mocker):
+    mocker.patch("ariadne_graphql_proxy.compression.brotli", None)
+
+    with pytest.raises(ImportError):
+        get_compressor("br")
+
+
+def test_upstream_settings_validate_request_compression():
+    with pytest.raises(ValueError):
+        UpstreamSettings(request_compression="lzma")
+
+
+def test_upstream_settings_compress_content_above_threshold():
+    settings = UpstreamSettings(
+        request_compression="gzip", request_compression_threshold=10
+    )
+
+    content, content_encoding = settings.compress(b"Lorem ipsum dolor met")
+
+    assert content_encoding == "gzip"
+    assert gzip.decompress(content) == b"Lorem ipsum dolor met"
+
+
+def test_upstream_settings_dont_compress_content_below_threshold():
+    settings = UpstreamSettings(
+        request_compression="gzip", request_compression_threshold=100
+    )
+
+    assert settings.compress(b"Lorem ipsum") == (b"Lorem ipsum", None)
+
+
+def test_upstream_settings_dont_compress_content_by_default():
+    assert UpstreamSettings().compress(b"Lorem ipsum" * 1000) == (
+        b"Lorem ipsum" * 1000,
+        None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_transport_sends_compressed_request_body(httpx_mock):
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"products": []}})
+
+    transport = ProxyTransport(
+        request_compression="gzip", request_compression_threshold=10
+    )
+    await transport.post_json(GRAPHQL_URL, PAYLOAD, {"authorization": "Bearer"})
+
+    request = httpx_mock.get_request()
+    assert request.headers["content-encoding"] == "gzip"
+    assert request.headers["content-type"] == "application/json"
+    assert request.headers["authorization"] == "Bearer"
+    assert json.loads(gzip.decompress(request.content)) == PAYLOAD
+
+
+@pytest.mark.asyncio
+async def test_transport_sends_uncompressed_request_body_below_threshold(
+    httpx_mock,
+):
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"products": []}})
+
+    transport = ProxyTransport(request_compression="gzip")
+    await transport.post_json(GRAPHQL_URL, PAYLOAD)
+
+    request = httpx_mock.get_request()
+    assert "content-encoding" not in request.headers
+    assert json.loads(request.content) == PAYLOAD
+
+
+@pytest.mark.asyncio
+async def test_transport_uses_per_upstream_compression_settings(httpx_mock):
+    other_url = "http://other.example.com/graphql/"
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"products": []}})
+    httpx_mock.add_response(url=other_url, json={"data": {"products": []}})
+
+    transport = ProxyTransport()
+    transport.configure_upstream(
+        GRAPHQL_URL, request_compression="deflate", request_compression_threshold=0
+    )
+    await transport.post_json(GRAPHQL_URL, PAYLOAD)
+    await transport.post_json(other_url, PAYLOAD)
+
+    request = httpx_mock.get_request(url=GRAPHQL_URL)
+    assert request.headers["content-encoding"] == "deflate"
+    assert json.loads(zlib.decompress(request.content)) == PAYLOAD
+
+    other_request = httpx_mock.get_request(url=other_url)
+    assert "content-encoding" not in other_request.headers
+
+
+@pytest.mark.asyncio
+async def test_transport_sends_configured_accept_encoding(httpx_mock):
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"products": []}})
+
+    transport = ProxyTransport(accept_encoding="gzip")
+    await transport.post_json(GRAPHQL_URL, PAYLOAD)
+
+    assert httpx_mock.get_request().headers["accept-encoding"] == "gzip"
+
+
+@pytest.mark.asyncio
+async def test_transport_decodes_compressed_response(httpx_mock):
+    data = {"data": {"products": [{"id": "1", "name": "Lorem ipsum"}]}}
+    httpx_mock.add_response(
+        url=GRAPHQL_URL,
+        stream=IteratorStream([gzip.compress(json.dumps(data).encode())]),
+        headers={"content-type": "application/json", "content-encoding": "gzip"},
+    )
+
+    transport = ProxyTransport(accept_encoding="gzip")
+    response = await transport.post_json(GRAPHQL_URL, PAYLOAD)
+
+    assert transport.decode_json(response) == data
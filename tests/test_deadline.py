@@ -0,0 +1,186 @@
+import asyncio
+
+import pytest
+from freezegun import freeze_time
+from graphql import graphql, parse
+from httpx import ReadTimeout, Response
+
+from ariadne_graphql_proxy import ProxyResolver, ProxySchema, set_resolver
+from ariadne_graphql_proxy.deadline import (
+    UpstreamTimeoutError,
+    get_deadline,
+    get_remaining_time,
+    run_with_timeout,
+    set_deadline,
+)
+
+GRAPHQL_URL = "http://upstream.example.com/graphql/"
+
+
+@freeze_time("2026-01-01")
+def test_set_deadline_sets_deadline_in_context():
+    context = {}
+    deadline = set_deadline(context, 5)
+
+    assert get_deadline(context) == deadline
+    assert get_remaining_time(context) == 5
+
+
+@freeze_time("2026-01-01")
+def test_set_deadline_keeps_earlier_deadline():
+    context = {}
+    deadline = set_deadline(context, 1)
+
+    assert set_deadline(context, 5) == deadline
+    assert get_remaining_time(context) == 1
+
+
+@freeze_time("2026-01-01")
+def test_remaining_time_is_limited_by_timeout():
+    context = {}
+    set_deadline(context, 5)
+
+    assert get_remaining_time(context, 2) == 2
+    assert get_remaining_time(context, 10) == 5
+
+
+def test_remaining_time_is_timeout_if_context_has_no_deadline():
+    assert get_remaining_time({}, 2) == 2
+    assert get_remaining_time({}) is None
+    assert get_remaining_time(None, 2) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_with_timeout_returns_result():
+    async def fetch():
+        return "result"
+
+    assert await run_with_timeout(fetch(), 1) == "result"
+    assert await run_with_timeout(fetch(), None) == "result"
+
+
+@pytest.mark.asyncio
+async def test_run_with_timeout_raises_timeout_error():
+    async def fetch():
+        await asyncio.sleep(1)
+
+    with pytest.raises(UpstreamTimeoutError):
+        await run_with_timeout(fetch(), 0.01)
+
+
+@pytest.mark.asyncio
+async def test_run_with_timeout_raises_timeout_error_for_passed_deadline():
+    async def fetch():
+        raise AssertionError("Request should not be started after deadline")
+
+    with pytest.raises(UpstreamTimeoutError):
+        await run_with_timeout(fetch(), -1)
+
+
+@pytest.mark.asyncio
+async def test_run_with_timeout_converts_httpx_timeout():
+    async def fetch():
+        raise ReadTimeout("Read timed out")
+
+    with pytest.raises(UpstreamTimeoutError):
+        await run_with_timeout(fetch(), None)
+
+
+@pytest.fixture
+def slow_fetch_data(mocker):
+    async def fetch_data(schema_id, context, url, headers, json):
+        if url == "http://graphql.example.com/slow/":
+            await asyncio.sleep(1)
+            return schema_id, {"data": {"basic": "Lorem Ipsum"}}
+        return schema_id, {"data": {"other": "Dolor Met"}}
+
+    return mocker.patch.object(ProxySchema, "fetch_data", side_effect=fetch_data)
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_returns_partial_result_for_schema_timeout(
+    schema, other_schema, slow_fetch_data
+):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(
+        schema, "http://graphql.example.com/slow/", label="slow", timeout=0.01
+    )
+    proxy_schema.add_schema(other_schema, "http://graphql.example.com/other/")
+    proxy_schema.get_final_schema()
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("query { basic other }")
+    )
+
+    assert root_value.root_value == {"other": "Dolor Met"}
+    assert root_value.errors == [
+        {
+            "message": "Upstream request timed out.",
+            "path": ["slow"],
+            "extensions": {"code": "UPSTREAM_TIMEOUT"},
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_returns_partial_result_for_request_deadline(
+    schema, other_schema, slow_fetch_data
+):
+    proxy_schema = ProxySchema(deadline=0.01)
+    proxy_schema.add_schema(schema, "http://graphql.example.com/slow/", label="slow")
+    proxy_schema.add_schema(other_schema, "http://graphql.example.com/other/")
+    proxy_schema.get_final_schema()
+
+    context = {}
+    root_value = await proxy_schema.root_resolver(
+        context, None, None, parse("query { basic other }")
+    )
+
+    assert get_deadline(context)
+    assert root_value.root_value == {"other": "Dolor Met"}
+    assert root_value.errors[0]["path"] == ["slow"]
+    assert root_value.errors[0]["extensions"] == {"code": "UPSTREAM_TIMEOUT"}
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_uses_deadline_set_in_context(
+    schema, other_schema, slow_fetch_data
+):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(schema, "http://graphql.example.com/slow/", label="slow")
+    proxy_schema.add_schema(other_schema, "http://graphql.example.com/other/")
+    proxy_schema.get_final_schema()
+
+    context = {}
+    set_deadline(context, 0.01)
+
+    root_value = await proxy_schema.root_resolver(
+        context, None, None, parse("query { basic other }")
+    )
+
+    assert root_value.root_value == {"other": "Dolor Met"}
+    assert root_value.errors[0]["extensions"] == {"code": "UPSTREAM_TIMEOUT"}
+
+
+@pytest.mark.asyncio
+async def test_proxy_resolver_returns_error_for_timeout(mocker, schema, root_value):
+    async def post(*args, **kwargs):
+        await asyncio.sleep(1)
+        return Response(status_code=200, json={"data": {"basic": "Success"}})
+
+    mocker.patch("ariadne_graphql_proxy.transport.AsyncClient.post", side_effect=post)
+
+    resolver = ProxyResolver(url=GRAPHQL_URL, timeout=0.01)
+    set_resolver(schema, "Query", "basic", resolver)
+    root_value.pop("basic")
+
+    result = await graphql(
+        schema,
+        "{ basic complex { id } }",
+        root_value=root_value,
+        context_value={"headers": {}},
+    )
+
+    assert result.data == {"basic": None, "complex": {"id": "123"}}
+    assert result.errors[0].message == "Upstream request timed out."
+    assert result.errors[0].extensions == {"code": "UPSTREAM_TIMEOUT"}
@@ -0,0 +1,378 @@
+import asyncio
+
+import pytest
+from ariadne import graphql, make_executable_schema
+from graphql import parse, print_ast
+
+from ariadne_graphql_proxy import ProxySchema
+
+PRODUCT_QUERY = "query GetProduct($id: ID!) { product(id: $id) { __FIELDS } }"
+OFFER_QUERY = "query GetOffer($id: ID!) { offer(id: $id) { __FIELDS } }"
+
+
+@pytest.fixture
+def catalog_schema():
+    return make_executable_schema(
+        """
+        type Query {
+            product(id: ID!): Product
+            products: [Product!]!
+        }
+
+        type Product {
+            id: ID!
+            name: String!
+        }
+        """
+    )
+
+
+@pytest.fixture
+def pricing_schema():
+    return make_executable_schema(
+        """
+        type Query {
+            product(id: ID!): Product
+        }
+
+        type Product {
+            id: ID!
+            name: String!
+            price(currency: String): Int!
+            offer: Offer
+        }
+
+        type Offer {
+            id: ID!
+            amount: Int!
+        }
+        """
+    )
+
+
+@pytest.fixture
+def shipping_schema():
+    return make_executable_schema(
+        """
+        type Query {
+            offer(id: ID!): Offer
+        }
+
+        type Offer {
+            id: ID!
+            shipping: Int!
+        }
+        """
+    )
+
+
+@pytest.fixture
+def proxy_schema(catalog_schema, pricing_schema, shipping_schema):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(catalog_schema, "http://graphql.example.com/catalog/")
+    proxy_schema.add_schema(pricing_schema, "http://graphql.example.com/pricing/")
+    proxy_schema.add_schema(shipping_schema, "http://graphql.example.com/shipping/")
+    proxy_schema.add_entity_key(0, "Product", "id", PRODUCT_QUERY)
+    proxy_schema.add_entity_key(1, "Product", "id", PRODUCT_QUERY)
+    proxy_schema.add_entity_key(2, "Offer", "id", OFFER_QUERY)
+    proxy_schema.get_final_schema()
+    return proxy_schema
+
+
+def get_entity_fetches(entity_fetches):
+    return [
+        (
+            entity_fetch.schema_id,
+            entity_fetch.type_name,
+            entity_fetch.path,
+            [print_ast(selection) for selection in entity_fetch.selections],
+            get_entity_fetches(entity_fetch.entity_fetches),
+        )
+        for entity_fetch in entity_fetches
+    ]
+
+
+def test_add_entity_key_validates_type(proxy_schema):
+    with pytest.raises(ValueError):
+        proxy_schema.add_entity_key(0, "Query", "id", PRODUCT_QUERY)
+    with pytest.raises(ValueError):
+        proxy_schema.add_entity_key(0, "Offer", "id", OFFER_QUERY)
+
+
+def test_add_entity_key_validates_key_fields(proxy_schema):
+    with pytest.raises(ValueError):
+        proxy_schema.add_entity_key(2, "Offer", "amount", OFFER_QUERY)
+
+
+def test_add_entity_key_validates_duplicates(proxy_schema):
+    with pytest.raises(ValueError):
+        proxy_schema.add_entity_key(1, "Product", "id", PRODUCT_QUERY)
+
+
+def test_add_entity_key_validates_template_variables(proxy_schema):
+    with pytest.raises(ValueError):
+        proxy_schema.add_entity_key(
+            2,
+            "Offer",
+            "id",
+            "query GetOffer($offerId: ID!) { offer(id: $offerId) { __FIELDS } }",
+        )
+
+
+def test_query_plan_fetches_shared_fields_from_single_schema(proxy_schema):
+    query_plan = proxy_schema.get_query_plan(parse("{ product(id: 1) { id name } }"))
+
+    assert [subquery.query for subquery in query_plan.subqueries] == [
+        "{\n  product(id: 1) {\n    id\n    name\n  }\n}"
+    ]
+    assert query_plan.entity_fetches == []
+
+
+def test_query_plan_fetches_other_schemas_fields_by_entity_key(proxy_schema):
+    query_plan = proxy_schema.get_query_plan(
+        parse(
+            """
+            query GetProducts($currency: String) {
+                products {
+                    name
+                    price(currency: $currency)
+                    offer { amount shipping }
+                }
+            }
+            """
+        )
+    )
+
+    assert [subquery.query for subquery in query_plan.subqueries] == [
+        "query GetProducts {\n  products {\n    name\n"
+        "    _entity_typename: __typename\n    _entity_key_id: id\n  }\n}"
+    ]
+    assert get_entity_fetches(query_plan.entity_fetches) == [
+        (
+            1,
+            "Product",
+            ("products",),
+            [
+                "price(currency: $currency)",
+                (
+                    "offer {\n  amount\n"
+                    "  _entity_typename: __typename\n  _entity_key_id: id\n}"
+                ),
+            ],
+            [(2, "Offer", ("offer",), ["shipping"], [])],
+        )
+    ]
+    assert [
+        print_ast(variable_definition)
+        for variable_definition in query_plan.entity_fetches[0].variable_definitions
+    ] == ["$currency: String"]
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_fetches_entities_in_waves(proxy_schema, mocker):
+    async def fetch_data(schema_id, context, url, headers, json):
+        if schema_id == 0:
+            return schema_id, {
+                "data": {
+                    "products": [
+                        {
+                            "name": "Ball",
+                            "_entity_typename": "Product",
+                            "_entity_key_id": "1",
+                        },
+                        {
+                            "name": "Bat",
+                            "_entity_typename": "Product",
+                            "_entity_key_id": "2",
+                        },
+                        {
+                            "name": "Ball",
+                            "_entity_typename": "Product",
+                            "_entity_key_id": "1",
+                        },
+                    ]
+                }
+            }
+        if schema_id == 1:
+            return schema_id, {
+                "data": {
+                    "_0": {
+                        "price": 10,
+                        "offer": {
+                            "amount": 1,
+                            "_entity_typename": "Offer",
+                            "_entity_key_id": "A",
+                        },
+                    },
+                    "_1": {
+                        "price": 20,
+                        "offer": {
+                            "amount": 2,
+                            "_entity_typename": "Offer",
+                            "_entity_key_id": "B",
+                        },
+                    },
+                }
+            }
+        return schema_id, {"data": {"_0": {"shipping": 5}, "_1": {"shipping": 7}}}
+
+    fetch_data_mock = mocker.patch.object(
+        ProxySchema, "fetch_data", side_effect=fetch_data
+    )
+
+    success, result = await graphql(
+        proxy_schema.schema,
+        {
+            "query": (
+                "query GetProducts($currency: String) { "
+                "products { name price(currency: $currency) offer { shipping } } }"
+            ),
+            "variables": {"currency": "EUR"},
+        },
+        context_value={},
+        root_value=proxy_schema.root_resolver,
+    )
+
+    assert success
+    assert result == {
+        "data": {
+            "products": [
+                {"name": "Ball", "price": 10, "offer": {"shipping": 5}},
+                {"name": "Bat", "price": 20, "offer": {"shipping": 7}},
+                {"name": "Ball", "price": 10, "offer": {"shipping": 5}},
+            ]
+        }
+    }
+
+    assert fetch_data_mock.call_count == 3
+    pricing_payload = fetch_data_mock.call_args_list[1].args[4]
+    assert pricing_payload["operationName"] == "GetProductsEntities"
+    assert pricing_payload["query"] == (
+        "query GetProductsEntities($_0_id: ID!, $currency: String, $_1_id: ID!) {\n"
+        "  _0: product(id: $_0_id) {\n"
+        "    price(currency: $currency)\n"
+        "    offer {\n"
+        "      _entity_typename: __typename\n      _entity_key_id: id\n    }\n"
+        "  }\n"
+        "  _1: product(id: $_1_id) {\n"
+        "    price(currency: $currency)\n"
+        "    offer {\n"
+        "      _entity_typename: __typename\n      _entity_key_id: id\n    }\n"
+        "  }\n"
+        "}"
+    )
+    assert pricing_payload["variables"] == {
+        "currency": "EUR",
+        "_0_id": "1",
+        "_1_id": "2",
+    }
+
+
+@pytest.mark.asyncio
+async def test_entity_key_fields_dont_conflict_with_client_aliases(
+    proxy_schema, mocker
+):
+    async def fetch_data(schema_id, context, url, headers, json):
+        if schema_id == 0:
+            return schema_id, {
+                "data": {
+                    "products": [
+                        {
+                            "id": "Ball",
+                            "_entity_typename": "Product",
+                            "_entity_key_id": "1",
+                        }
+                    ]
+                }
+            }
+        return schema_id, {"data": {"_0": {"price": 10}}}
+
+    fetch_data_mock = mocker.patch.object(
+        ProxySchema, "fetch_data", side_effect=fetch_data
+    )
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("{ products { id: name price } }")
+    )
+
+    assert root_value == {"products": [{"id": "Ball", "price": 10}]}
+    assert fetch_data_mock.call_args_list[0].args[4]["query"] == (
+        "{\n  products {\n    id: name\n"
+        "    _entity_typename: __typename\n    _entity_key_id: id\n  }\n}"
+    )
+    assert fetch_data_mock.call_args_list[1].args[4]["variables"] == {"_0_id": "1"}
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_proxies_entities_errors_with_result_path(
+    proxy_schema, mocker
+):
+    async def fetch_data(schema_id, context, url, headers, json):
+        if schema_id == 0:
+            return schema_id, {
+                "data": {
+                    "products": [{"_entity_typename": "Product", "_entity_key_id": "1"}]
+                }
+            }
+        return schema_id, {
+            "data": {"_0": None},
+            "errors": [{"message": "Price error", "path": ["_0", "price"]}],
+        }
+
+    mocker.patch.object(ProxySchema, "fetch_data", side_effect=fetch_data)
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("{ products { price } }")
+    )
+
+    assert root_value.errors == [
+        {"message": "Price error", "path": ["schema_1", "products", 0, "price"]}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coalesced_requests_merge_entities_into_own_data(
+    catalog_schema, pricing_schema, mocker
+):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(
+        catalog_schema, "http://graphql.example.com/catalog/", coalesce_requests=True
+    )
+    proxy_schema.add_schema(pricing_schema, "http://graphql.example.com/pricing/")
+    proxy_schema.add_entity_key(0, "Product", "id", PRODUCT_QUERY)
+    proxy_schema.add_entity_key(1, "Product", "id", PRODUCT_QUERY)
+    proxy_schema.get_final_schema()
+
+    async def fetch_data(schema_id, context, url, headers, json):
+        await asyncio.sleep(0.01)
+        if schema_id == 0:
+            return schema_id, {
+                "data": {
+                    "products": [{"_entity_typename": "Product", "_entity_key_id": "1"}]
+                }
+            }
+        price = 100 if json["variables"]["currency"] == "USD" else 90
+        return schema_id, {"data": {"_0": {"price": price}}}
+
+    fetch_data_mock = mocker.patch.object(
+        ProxySchema, "fetch_data", side_effect=fetch_data
+    )
+
+    async def query_price(currency):
+        return await proxy_schema.root_resolver(
+            {},
+            "GetPrices",
+            {"currency": currency},
+            parse(
+                "query GetPrices($currency: String) { "
+                "products { price(currency: $currency) } }"
+            ),
+        )
+
+    usd_result, eur_result = await asyncio.gather(
+        query_price("USD"), query_price("EUR")
+    )
+
+    assert usd_result["products"][0]["price"] == 100
+    assert eur_result["products"][0]["price"] == 90
+    assert fetch_data_mock.call_count == 3
@@ -0,0 +1,161 @@
+import pytest
+from graphql import parse
+
+from ariadne_graphql_proxy import FieldsOwnership, ProxySchema, QueryFilter
+from ariadne_graphql_proxy.fields_ownership import (
+    get_schema_ids,
+    get_schemas_mask,
+    get_single_schema_id,
+)
+
+
+@pytest.fixture
+def proxy_schema(schema, other_schema):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(schema, "http://graphql.example.com/basic/")
+    proxy_schema.add_schema(other_schema, "http://graphql.example.com/other/")
+    return proxy_schema
+
+
+def test_schemas_mask_has_bit_set_for_every_schema():
+    assert get_schemas_mask([0, 2, 3]) == 0b1101
+
+
+def test_schema_ids_are_read_from_mask():
+    assert get_schema_ids(0b1101) == (0, 2, 3)
+    assert get_schema_ids(0) == ()
+
+
+def test_single_schema_id_is_read_from_mask_with_single_bit():
+    assert get_single_schema_id(0b100) == 2
+    assert get_single_schema_id(0b101) is None
+    assert get_single_schema_id(0) is None
+
+
+def test_fields_ownership_indexes_fields_masks():
+    fields_ownership = FieldsOwnership(
+        {"Query": {"basic": 0b01, "other": 0b10, "shared": 0b11}}
+    )
+
+    assert fields_ownership.get_type_fields("Query") == {
+        "basic": 0b01,
+        "other": 0b10,
+        "shared": 0b11,
+    }
+    assert fields_ownership.owners["Query"] == 0b11
+    assert fields_ownership.is_owner("Query", "shared", 1)
+    assert not fields_ownership.is_owner("Query", "basic", 1)
+    assert fields_ownership.get_field_mask("Query", "invalid") == 0
+
+
+def test_fields_ownership_converts_deprecated_sets_of_schema_ids():
+    fields_map = {"Query": {"basic": {0}, "shared": {0, 1}}}
+
+    with pytest.deprecated_call():
+        fields_ownership = FieldsOwnership(fields_map)
+
+    assert fields_ownership.get_type_fields("Query") == {"basic": 0b01, "shared": 0b11}
+    assert fields_map == {"Query": {"basic": {0}, "shared": {0, 1}}}
+
+
+def test_query_filter_accepts_deprecated_fields_map(proxy_schema):
+    proxy_schema.get_final_schema()
+
+    with pytest.deprecated_call():
+        query_filter = QueryFilter(
+            proxy_schema.schema,
+            proxy_schema.schemas,
+            proxy_schema.fields_map,
+            proxy_schema.fields_types,
+            proxy_schema.unions,
+            proxy_schema.foreign_keys,
+            proxy_schema.dependencies,
+        )
+
+    assert query_filter.fields_ownership.types == proxy_schema.fields_masks
+
+
+def test_fields_ownership_is_compiled_by_final_schema(proxy_schema):
+    proxy_schema.get_final_schema()
+
+    assert proxy_schema.fields_ownership.get_type_fields("Complex") == {
+        "id": 0b01,
+        "name": 0b01,
+        "class": 0b01,
+        "group": 0b01,
+    }
+    assert proxy_schema.query_filter.fields_ownership is proxy_schema.fields_ownership
+
+
+def test_final_schema_doesnt_copy_fields_masks(proxy_schema):
+    proxy_schema.get_final_schema()
+
+    assert proxy_schema.fields_ownership.types is proxy_schema.fields_masks
+
+
+def test_fields_map_is_derived_from_fields_masks(proxy_schema):
+    assert proxy_schema.fields_masks["Query"]["basic"] == 0b01
+    assert proxy_schema.fields_map["Query"]["basic"] == {0}
+
+
+def test_type_with_all_fields_owned_by_single_schema_is_wholly_owned(proxy_schema):
+    proxy_schema.get_final_schema()
+
+    assert proxy_schema.fields_ownership.get_wholly_owning_schema("Complex") == 0
+    assert proxy_schema.fields_ownership.get_wholly_owning_schema("OtherGroup") == 1
+    assert proxy_schema.fields_ownership.get_wholly_owning_schema("Query") is None
+
+
+def test_type_with_foreign_key_is_not_wholly_owned(proxy_schema):
+    proxy_schema.add_foreign_key("OtherComplex", "group", "id")
+    proxy_schema.get_final_schema()
+
+    fields_ownership = proxy_schema.fields_ownership
+    assert fields_ownership.get_wholly_owning_schema("OtherComplex") is None
+    assert fields_ownership.get_wholly_owning_schema("OtherGroup") == 1
+
+
+def test_type_with_delayed_field_is_not_wholly_owned(proxy_schema):
+    proxy_schema.add_delayed_fields({"Complex": ["class"]})
+    proxy_schema.get_final_schema()
+
+    assert proxy_schema.fields_ownership.get_wholly_owning_schema("Complex") is None
+
+
+def test_type_referencing_not_wholly_owned_type_is_not_wholly_owned(proxy_schema):
+    proxy_schema.add_delayed_fields({"Group": ["rank"]})
+    proxy_schema.get_final_schema()
+
+    assert proxy_schema.fields_ownership.get_wholly_owning_schema("Group") is None
+    assert proxy_schema.fields_ownership.get_wholly_owning_schema("Complex") is None
+
+
+def test_split_query_reuses_wholly_owned_subtree(proxy_schema):
+    proxy_schema.get_final_schema()
+    document = parse(
+        "query GetComplex($arg: Generic) { complex { id group { name(arg: $arg) } } }"
+    )
+
+    (schema_id, query_document, variables), *_ = proxy_schema.query_filter.split_query(
+        document
+    )
+
+    assert schema_id == 0
+    assert variables == {"arg"}
+    assert (
+        query_document.definitions[0].selection_set.selections[0]
+        is document.definitions[0].selection_set.selections[0]
+    )
+
+
+def test_split_query_filters_wholly_owned_subtree_with_fragments(proxy_schema):
+    proxy_schema.get_final_schema()
+    document = parse(
+        "{ complex { ...ComplexFields } } fragment ComplexFields on Complex { id }"
+    )
+
+    (_, query_document, _), *_ = proxy_schema.query_filter.split_query(document)
+
+    field_node = query_document.definitions[0].selection_set.selections[0]
+    assert field_node is not document.definitions[0].selection_set.selections[0]
+    assert field_node.selection_set.selections[0].name.value == "id"
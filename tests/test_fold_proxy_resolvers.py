@@ -0,0 +1,239 @@
+import pytest
+from ariadne import graphql
+from graphql import parse
+
+from ariadne_graphql_proxy import (
+    OperationRegistry,
+    ProxyResolver,
+    ProxySchema,
+    set_resolver,
+)
+from ariadne_graphql_proxy.cache import InMemoryCache
+
+BASIC_URL = "http://graphql.example.com/basic/"
+OTHER_URL = "http://graphql.example.com/other/"
+
+
+@pytest.fixture
+def proxy_schema(schema, other_schema):
+    proxy_schema = ProxySchema(fold_proxy_resolvers=True)
+    proxy_schema.add_schema(schema, BASIC_URL)
+    proxy_schema.add_schema(other_schema, OTHER_URL)
+    proxy_schema.add_delayed_fields({"Query": ["complex"]})
+    return proxy_schema
+
+
+def test_proxy_resolver_field_is_folded_into_schema_subquery(proxy_schema):
+    final_schema = proxy_schema.get_final_schema()
+    set_resolver(final_schema, "Query", "complex", ProxyResolver(BASIC_URL))
+
+    query_plan = proxy_schema.get_query_plan(
+        parse("{ basic other complex(arg: 1) { id name } }")
+    )
+
+    assert [(s.schema_id, s.query) for s in query_plan.subqueries] == [
+        (0, "{\n  basic\n  complex(arg: 1) {\n    id\n    name\n  }\n}"),
+        (1, "{\n  other\n}"),
+    ]
+    assert query_plan.folded_fields == ("complex",)
+
+
+def test_cached_query_plan_is_refolded_when_proxy_resolver_is_set(proxy_schema):
+    final_schema = proxy_schema.get_final_schema()
+    document = parse("{ basic complex { id } }")
+
+    query_plan = proxy_schema.get_query_plan(document)
+    assert query_plan.folded_fields == ()
+
+    set_resolver(final_schema, "Query", "complex", ProxyResolver(BASIC_URL))
+
+    query_plan = proxy_schema.get_query_plan(document)
+    assert query_plan.folded_fields == ("complex",)
+    assert [s.query for s in query_plan.subqueries] == [
+        "{\n  basic\n  complex {\n    id\n  }\n}"
+    ]
+
+
+def test_registered_query_plan_is_refolded_when_proxy_resolver_is_set(
+    schema, other_schema
+):
+    registry = OperationRegistry({"GetComplex": "{ basic complex { id } }"})
+    proxy_schema = ProxySchema(fold_proxy_resolvers=True, operation_registry=registry)
+    proxy_schema.add_schema(schema, BASIC_URL)
+    proxy_schema.add_schema(other_schema, OTHER_URL)
+    proxy_schema.add_delayed_fields({"Query": ["complex"]})
+    final_schema = proxy_schema.get_final_schema()
+    document = registry.get_operation("GetComplex").document
+
+    assert proxy_schema.get_query_plan(document).folded_fields == ()
+
+    set_resolver(final_schema, "Query", "complex", ProxyResolver(BASIC_URL))
+
+    query_plan = proxy_schema.get_query_plan(document)
+    assert query_plan is registry.get_query_plan(document)
+    assert query_plan.folded_fields == ("complex",)
+
+
+def test_proxy_resolver_field_is_not_folded_by_default(schema, other_schema):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(schema, BASIC_URL)
+    proxy_schema.add_schema(other_schema, OTHER_URL)
+    proxy_schema.add_delayed_fields({"Query": ["complex"]})
+    final_schema = proxy_schema.get_final_schema()
+    set_resolver(final_schema, "Query", "complex", ProxyResolver(BASIC_URL))
+
+    query_plan = proxy_schema.get_query_plan(parse("{ basic complex { id } }"))
+
+    assert [s.query for s in query_plan.subqueries] == ["{\n  basic\n}"]
+    assert query_plan.folded_fields == ()
+
+
+def test_proxy_resolver_field_is_not_folded_for_other_url(proxy_schema):
+    final_schema = proxy_schema.get_final_schema()
+    set_resolver(
+        final_schema,
+        "Query",
+        "complex",
+        ProxyResolver("http://graphql.example.com/complex/"),
+    )
+
+    query_plan = proxy_schema.get_query_plan(parse("{ basic complex { id } }"))
+
+    assert [s.query for s in query_plan.subqueries] == ["{\n  basic\n}"]
+    assert query_plan.folded_fields == ()
+
+
+def test_proxy_resolver_field_is_not_folded_into_schema_without_field(
+    proxy_schema,
+):
+    final_schema = proxy_schema.get_final_schema()
+    set_resolver(final_schema, "Query", "complex", ProxyResolver(OTHER_URL))
+
+    query_plan = proxy_schema.get_query_plan(parse("{ other complex { id } }"))
+
+    assert [s.query for s in query_plan.subqueries] == ["{\n  other\n}"]
+    assert query_plan.folded_fields == ()
+
+
+def test_cached_proxy_resolver_field_is_not_folded(proxy_schema):
+    final_schema = proxy_schema.get_final_schema()
+    set_resolver(
+        final_schema,
+        "Query",
+        "complex",
+        ProxyResolver(BASIC_URL, cache=InMemoryCache()),
+    )
+
+    query_plan = proxy_schema.get_query_plan(parse("{ basic complex { id } }"))
+
+    assert [s.query for s in query_plan.subqueries] == ["{\n  basic\n}"]
+    assert query_plan.folded_fields == ()
+
+
+def create_proxy_schema(schema, other_schema, headers):
+    proxy_schema = ProxySchema(fold_proxy_resolvers=True)
+    proxy_schema.add_schema(schema, BASIC_URL, headers)
+    proxy_schema.add_schema(other_schema, OTHER_URL)
+    proxy_schema.add_delayed_fields({"Query": ["complex"]})
+    return proxy_schema
+
+
+@pytest.mark.parametrize(
+    "headers, proxy_headers",
+    [
+        (None, True),
+        (None, ["x-tenant"]),
+        ({"authorization": "Bearer secret"}, False),
+        ({"authorization": "Bearer secret"}, True),
+        (lambda context: {}, lambda context: {}),
+    ],
+)
+def test_proxy_resolver_field_with_different_headers_is_not_folded(
+    schema, other_schema, headers, proxy_headers
+):
+    proxy_schema = create_proxy_schema(schema, other_schema, headers)
+    final_schema = proxy_schema.get_final_schema()
+    set_resolver(
+        final_schema,
+        "Query",
+        "complex",
+        ProxyResolver(BASIC_URL, proxy_headers=proxy_headers),
+    )
+
+    query_plan = proxy_schema.get_query_plan(parse("{ basic complex { id } }"))
+
+    assert [s.query for s in query_plan.subqueries] == ["{\n  basic\n}"]
+    assert query_plan.folded_fields == ()
+
+
+def test_proxy_resolver_field_with_same_headers_is_folded(schema, other_schema):
+    def get_headers(context):
+        return {"authorization": context["authorization"]}
+
+    proxy_schema = create_proxy_schema(schema, other_schema, get_headers)
+    final_schema = proxy_schema.get_final_schema()
+    set_resolver(
+        final_schema,
+        "Query",
+        "complex",
+        ProxyResolver(BASIC_URL, proxy_headers=get_headers),
+    )
+
+    query_plan = proxy_schema.get_query_plan(parse("{ basic complex { id } }"))
+
+    assert query_plan.folded_fields == ("complex",)
+
+
+def test_proxy_resolver_field_with_own_options_is_not_folded(proxy_schema):
+    final_schema = proxy_schema.get_final_schema()
+    set_resolver(final_schema, "Query", "complex", ProxyResolver(BASIC_URL, timeout=1))
+
+    query_plan = proxy_schema.get_query_plan(parse("{ basic complex { id } }"))
+
+    assert query_plan.folded_fields == ()
+
+
+def test_proxy_resolver_field_is_folded_if_resolver_opts_in(schema, other_schema):
+    proxy_schema = create_proxy_schema(
+        schema, other_schema, {"authorization": "Bearer secret"}
+    )
+    final_schema = proxy_schema.get_final_schema()
+    set_resolver(
+        final_schema,
+        "Query",
+        "complex",
+        ProxyResolver(BASIC_URL, proxy_headers=True, timeout=1, fold_into_root=True),
+    )
+
+    query_plan = proxy_schema.get_query_plan(parse("{ basic complex { id } }"))
+
+    assert query_plan.folded_fields == ("complex",)
+
+
+@pytest.mark.asyncio
+async def test_folded_proxy_resolver_reads_data_from_root_value(proxy_schema, mocker):
+    final_schema = proxy_schema.get_final_schema()
+    proxy_resolver = ProxyResolver(BASIC_URL)
+    set_resolver(final_schema, "Query", "complex", proxy_resolver)
+    proxy_resolver_fetch_data = mocker.patch.object(proxy_resolver, "fetch_data")
+
+    async def fetch_data(schema_id, context, url, headers, json):
+        return schema_id, {
+            "data": {"basic": "Lorem", "item": {"id": "1", "name": "Ipsum"}}
+        }
+
+    fetch_data_mock = mocker.patch.object(
+        ProxySchema, "fetch_data", side_effect=fetch_data
+    )
+
+    success, result = await graphql(
+        final_schema,
+        {"query": "{ basic item: complex { id name } }"},
+        context_value={},
+        root_value=proxy_schema.root_resolver,
+    )
+
+    assert success
+    assert result == {"data": {"basic": "Lorem", "item": {"id": "1", "name": "Ipsum"}}}
+    assert fetch_data_mock.call_count == 1
+    assert not proxy_resolver_fetch_data.called
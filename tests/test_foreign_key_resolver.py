@@ -1,10 +1,19 @@
+import asyncio
 import json
 from textwrap import dedent
 
 import pytest
+from ariadne import make_executable_schema
 from ariadne.graphql import graphql
+from graphql import parse
 
 from ariadne_graphql_proxy import ForeignKeyResolver, ProxySchema, set_resolver
+from ariadne_graphql_proxy import foreign_key_resolver as foreign_key_resolver_module
+from ariadne_graphql_proxy.cache import InMemoryCache
+from ariadne_graphql_proxy.foreign_key_resolver import (
+    get_selection_key,
+    split_printed_template,
+)
 
 GRAPHQL_URL = "http://upstream.example.com/graphql/"
 
@@ -381,3 +390,398 @@ def test_foreign_key_resolver_raises_error_if_template_has_multiple_placeholders
 
     assert "Query template operation should specify one" in str(excinfo.value)
     assert "It specifies 2." in str(excinfo.value)
+
+
+ORDER_TEMPLATE = """
+query GetOrder($id: ID!) {
+    order(id: $id) {
+        __FIELDS
+    }
+}
+"""
+
+
+@pytest.fixture
+def items_schema():
+    schema = make_executable_schema(
+        """
+        type Query {
+            items: [Item!]!
+        }
+
+        type Item {
+            order: Order
+        }
+
+        type Order {
+            id: ID!
+            customer: String
+        }
+        """
+    )
+    schema.query_type.fields["items"].resolve = lambda *_: [
+        {"order": {"id": "1"}},
+        {"order": {"id": "2"}},
+        {"order": {"id": "1"}},
+    ]
+    return schema
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_resolver_batches_lookups(httpx_mock, items_schema):
+    httpx_mock.add_response(
+        url=GRAPHQL_URL,
+        json={
+            "data": {
+                "_0": {"id": "1", "customer": "John"},
+                "_1": {"id": "2", "customer": "Jane"},
+            }
+        },
+    )
+
+    set_resolver(
+        items_schema,
+        "Item",
+        "order",
+        ForeignKeyResolver(GRAPHQL_URL, ORDER_TEMPLATE, batch=True),
+    )
+
+    success, data = await graphql(
+        items_schema,
+        {"query": "{ items { order { id customer } } }"},
+        context_value={"headers": {}},
+    )
+
+    assert success
+    assert data == {
+        "data": {
+            "items": [
+                {"order": {"id": "1", "customer": "John"}},
+                {"order": {"id": "2", "customer": "Jane"}},
+                {"order": {"id": "1", "customer": "John"}},
+            ]
+        }
+    }
+
+    (request,) = httpx_mock.get_requests(url=GRAPHQL_URL)
+    assert json.loads(request.content) == {
+        "operationName": "GetOrder",
+        "variables": {"_0_id": "1", "_1_id": "2"},
+        "query": dedent(
+            """
+            query GetOrder($_0_id: ID!, $_1_id: ID!) {
+              _0: order(id: $_0_id) {
+                id
+                customer
+              }
+              _1: order(id: $_1_id) {
+                id
+                customer
+              }
+            }
+            """
+        ).strip(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_resolver_limits_batch_size(httpx_mock, items_schema):
+    httpx_mock.add_response(
+        url=GRAPHQL_URL, json={"data": {"_0": {"id": "1"}, "_1": {"id": "2"}}}
+    )
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"_0": {"id": "1"}}})
+
+    set_resolver(
+        items_schema,
+        "Item",
+        "order",
+        ForeignKeyResolver(GRAPHQL_URL, ORDER_TEMPLATE, batch=True, max_batch_size=2),
+    )
+
+    success, data = await graphql(
+        items_schema,
+        {"query": "{ items { order { id } } }"},
+        context_value={"headers": {}},
+    )
+
+    assert success
+    assert data == {
+        "data": {
+            "items": [
+                {"order": {"id": "1"}},
+                {"order": {"id": "2"}},
+                {"order": {"id": "1"}},
+            ]
+        }
+    }
+    assert len(httpx_mock.get_requests(url=GRAPHQL_URL)) == 2
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_resolver_batch_waits_for_window(
+    httpx_mock, items_schema, mocker
+):
+    httpx_mock.add_response(
+        url=GRAPHQL_URL, json={"data": {"_0": {"id": "1"}, "_1": {"id": "2"}}}
+    )
+
+    foreign_key_resolver = ForeignKeyResolver(
+        GRAPHQL_URL, ORDER_TEMPLATE, batch=True, batch_window=0.01
+    )
+    set_resolver(items_schema, "Item", "order", foreign_key_resolver)
+    call_later = mocker.spy(asyncio.get_running_loop(), "call_later")
+
+    success, _ = await graphql(
+        items_schema,
+        {"query": "{ items { order { id } } }"},
+        context_value={"headers": {}},
+    )
+
+    assert success
+    assert call_later.call_args.args[0] == 0.01
+    assert len(httpx_mock.get_requests(url=GRAPHQL_URL)) == 1
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_resolver_batch_errors_are_raised_for_all_lookups(
+    httpx_mock, items_schema
+):
+    httpx_mock.add_response(
+        url=GRAPHQL_URL, json={"data": None, "errors": [{"message": "Error"}]}
+    )
+
+    set_resolver(
+        items_schema,
+        "Item",
+        "order",
+        ForeignKeyResolver(GRAPHQL_URL, ORDER_TEMPLATE, batch=True),
+    )
+
+    success, data = await graphql(
+        items_schema,
+        {"query": "{ items { order { id } } }"},
+        context_value={"headers": {}},
+    )
+
+    assert success
+    assert data["data"] == {"items": [{"order": None}] * 3}
+    assert [error["path"] for error in data["errors"]] == [
+        ["items", 0, "order"],
+        ["items", 1, "order"],
+        ["items", 2, "order"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_resolver_batch_errors_are_raised_for_their_lookups(
+    httpx_mock, items_schema
+):
+    httpx_mock.add_response(
+        url=GRAPHQL_URL,
+        json={
+            "data": {"_0": {"id": "1"}, "_1": None},
+            "errors": [{"message": "Not found", "path": ["_1"]}],
+        },
+    )
+
+    set_resolver(
+        items_schema,
+        "Item",
+        "order",
+        ForeignKeyResolver(GRAPHQL_URL, ORDER_TEMPLATE, batch=True),
+    )
+
+    success, data = await graphql(
+        items_schema,
+        {"query": "{ items { order { id } } }"},
+        context_value={"headers": {}},
+    )
+
+    assert success
+    assert data["data"] == {
+        "items": [{"order": {"id": "1"}}, {"order": None}, {"order": {"id": "1"}}]
+    }
+    assert [error["path"] for error in data["errors"]] == [["items", 1, "order"]]
+    assert data["errors"][0]["extensions"]["upstream_response"]["json"] == {
+        "data": None,
+        "errors": [{"message": "Not found", "path": ["_1"]}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_resolver_batch_lookups_fail_when_fetch_is_cancelled(
+    items_schema, mocker
+):
+    async def fetch_response(*_):
+        raise asyncio.CancelledError()
+
+    foreign_key_resolver = ForeignKeyResolver(GRAPHQL_URL, ORDER_TEMPLATE, batch=True)
+    mocker.patch.object(
+        foreign_key_resolver, "fetch_response", side_effect=fetch_response
+    )
+    set_resolver(items_schema, "Item", "order", foreign_key_resolver)
+
+    success, data = await graphql(
+        items_schema,
+        {"query": "{ items { order { id } } }"},
+        context_value={"headers": {}},
+    )
+
+    assert success
+    assert data["data"] == {"items": [{"order": None}] * 3}
+    assert {error["message"] for error in data["errors"]} == {
+        "Upstream request cancelled."
+    }
+    assert not foreign_key_resolver._batch_tasks
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_resolver_batch_lookup_cancellation_is_not_shared(mocker):
+    fetched = asyncio.Event()
+
+    async def fetch_response(*_):
+        await fetched.wait()
+        return {"data": {"_0": {"id": "1"}}}
+
+    foreign_key_resolver = ForeignKeyResolver(GRAPHQL_URL, ORDER_TEMPLATE, batch=True)
+    mocker.patch.object(
+        foreign_key_resolver, "fetch_response", side_effect=fetch_response
+    )
+    mocker.patch.object(foreign_key_resolver, "get_proxy_headers", return_value={})
+    mocker.patch.object(foreign_key_resolver, "get_batch_payload", return_value={})
+    mocker.patch.object(foreign_key_resolver, "get_template_query")
+    info = mocker.Mock(field_nodes=[], path=None)
+
+    cancelled = asyncio.create_task(foreign_key_resolver.batch_query(info, {"id": "1"}))
+    lookup = asyncio.create_task(foreign_key_resolver.batch_query(info, {"id": "1"}))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    fetched.set()
+
+    assert await lookup == {"id": "1"}
+    assert cancelled.cancelled()
+
+
+def test_foreign_key_resolver_validates_batched_template():
+    with pytest.raises(ValueError):
+        ForeignKeyResolver(
+            GRAPHQL_URL,
+            "query GetOrders($id: ID!) { order(id: $id) { __FIELDS } noop }",
+            batch=True,
+        )
+
+
+def test_foreign_key_resolver_validates_max_batch_size():
+    with pytest.raises(ValueError):
+        ForeignKeyResolver(GRAPHQL_URL, ORDER_TEMPLATE, batch=True, max_batch_size=0)
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_resolver_reuses_query_for_same_selection(
+    httpx_mock, items_schema, mocker
+):
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"order": {"id": "1"}}})
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"order": {"id": "2"}}})
+
+    foreign_key_resolver = ForeignKeyResolver(GRAPHQL_URL, ORDER_TEMPLATE)
+    set_resolver(items_schema, "Item", "order", foreign_key_resolver)
+    get_field_selections = mocker.spy(
+        foreign_key_resolver_module, "get_field_selections"
+    )
+    make_final_operation = mocker.spy(
+        foreign_key_resolver_module, "make_final_operation"
+    )
+
+    success, _ = await graphql(
+        items_schema,
+        {"query": "{ items { order { id } } }"},
+        context_value={"headers": {}},
+    )
+
+    assert success
+    assert get_field_selections.call_count == 1
+    assert not make_final_operation.called
+    assert [
+        json.loads(request.content)["query"]
+        for request in httpx_mock.get_requests(url=GRAPHQL_URL)
+    ] == ["query GetOrder($id: ID!) {\n  order(id: $id) {\n    id\n  }\n}"] * 2
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_resolver_reuses_query_between_requests(
+    httpx_mock, items_schema, mocker
+):
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"order": {"id": "1"}}})
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"order": {"id": "2"}}})
+
+    foreign_key_resolver = ForeignKeyResolver(
+        GRAPHQL_URL, ORDER_TEMPLATE, cache=InMemoryCache()
+    )
+    set_resolver(items_schema, "Item", "order", foreign_key_resolver)
+    get_field_selections = mocker.spy(
+        foreign_key_resolver_module, "get_field_selections"
+    )
+    make_final_operation = mocker.spy(
+        foreign_key_resolver_module, "make_final_operation"
+    )
+
+    for _ in range(2):
+        success, _ = await graphql(
+            items_schema,
+            {"query": "{ items { order { id } } }"},
+            context_value={"headers": {}},
+        )
+        assert success
+
+    assert get_field_selections.call_count == 1
+    assert make_final_operation.call_count == 1
+
+
+def test_selection_key_includes_fragments_sources():
+    first_document = parse(
+        "{ items { order { ...OrderFields } } } fragment OrderFields on Order { id }"
+    )
+    second_document = parse(
+        "{ items { order { ...OrderFields } } } "
+        "fragment OrderFields on Order { customer }"
+    )
+
+    keys = []
+    for document in (first_document, second_document):
+        order_field = document.definitions[0].selection_set.selections[0]
+        order_field = order_field.selection_set.selections[0]
+        info = make_info(order_field, document.definitions[1])
+        keys.append(get_selection_key(info))
+
+    assert keys[0] != keys[1]
+    assert keys[0][0] == keys[1][0] == "{ ...OrderFields }"
+
+
+def make_info(field_node, fragment):
+    class Info:
+        field_name = field_node.name.value
+        field_nodes = [field_node]
+        fragments = {fragment.name.value: fragment}
+
+    return Info()
+
+
+def test_split_printed_template_splits_query_around_placeholder():
+    template = parse(
+        """
+        query GetOrder($id: ID!) {
+            store {
+                order(id: $id) {
+                    __FIELDS
+                }
+            }
+        }
+        """
+    ).definitions[0]
+
+    assert split_printed_template(template) == (
+        "query GetOrder($id: ID!) {\n  store {\n    order(id: $id) ",
+        "    ",
+        "\n  }\n}",
+    )
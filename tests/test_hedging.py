@@ -0,0 +1,210 @@
+import asyncio
+
+import pytest
+from graphql import graphql, parse
+from httpx import Response
+
+from ariadne_graphql_proxy import (
+    HedgingPolicy,
+    ProxyResolver,
+    ProxySchema,
+    set_resolver,
+)
+
+GRAPHQL_URL = "http://upstream.example.com/graphql/"
+
+
+def test_hedging_policy_requires_delay_or_percentile():
+    with pytest.raises(ValueError):
+        HedgingPolicy()
+
+
+def test_hedging_policy_requires_valid_percentile():
+    with pytest.raises(ValueError):
+        HedgingPolicy(percentile=100)
+
+
+def test_hedging_policy_uses_delay_until_enough_latencies_are_recorded():
+    policy = HedgingPolicy(0.5, percentile=90, min_samples=10)
+    for _ in range(9):
+        policy.record_latency(0.1)
+
+    assert policy.get_delay() == 0.5
+
+
+def test_hedging_policy_uses_latency_percentile():
+    policy = HedgingPolicy(percentile=90, min_samples=10)
+    for i in range(1, 11):
+        policy.record_latency(i / 10)
+
+    assert policy.get_delay() == 1.0
+    assert HedgingPolicy(percentile=50, min_samples=10).get_delay() is None
+
+
+@pytest.mark.asyncio
+async def test_hedging_policy_doesnt_hedge_fast_requests():
+    policy = HedgingPolicy(0.05)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await policy.run(fetch) == 1
+    assert calls == 1
+    assert policy.hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_hedging_policy_sends_second_request_after_delay():
+    policy = HedgingPolicy(0.01)
+    calls = 0
+    cancelled = []
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        attempt = calls
+        try:
+            await asyncio.sleep(1 if attempt == 1 else 0)
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+        return attempt
+
+    assert await policy.run(fetch) == 2
+    await asyncio.sleep(0)
+
+    assert calls == 2
+    assert cancelled == [1]
+    assert policy.hedges == 1
+
+
+@pytest.mark.asyncio
+async def test_hedging_policy_uses_second_request_if_first_fails():
+    policy = HedgingPolicy(0.01)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.02)
+            raise ValueError("First request failed")
+        await asyncio.sleep(0.05)
+        return "result"
+
+    assert await policy.run(fetch) == "result"
+
+
+@pytest.mark.asyncio
+async def test_hedging_policy_raises_error_if_all_requests_fail():
+    policy = HedgingPolicy(0.01)
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        raise ValueError("Request failed")
+
+    with pytest.raises(ValueError):
+        await policy.run(fetch)
+
+
+@pytest.mark.asyncio
+async def test_hedging_policy_budget_limits_hedged_requests():
+    policy = HedgingPolicy(0, budget=0, max_tokens=2)
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    for _ in range(4):
+        await policy.run(fetch)
+
+    assert policy.requests == 4
+    assert policy.hedges == 2
+
+
+@pytest.fixture
+def slow_first_fetch_data(mocker):
+    calls = []
+
+    async def fetch_data(schema_id, context, url, headers, json):
+        calls.append(json)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return schema_id, {"data": {"basic": "Lorem Ipsum"}}
+
+    mocker.patch.object(ProxySchema, "fetch_data", side_effect=fetch_data)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_hedges_slow_query(schema, slow_first_fetch_data):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(
+        schema, "http://graphql.example.com/", hedging=HedgingPolicy(0.01)
+    )
+    proxy_schema.get_final_schema()
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("query { basic }")
+    )
+
+    assert root_value == {"basic": "Lorem Ipsum"}
+    assert len(slow_first_fetch_data) == 2
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_doesnt_hedge_mutations(
+    httpx_mock, store_schema_json, mocker
+):
+    httpx_mock.add_response(json=store_schema_json)
+
+    async def fetch_data(schema_id, context, url, headers, json):
+        await asyncio.sleep(0.05)
+        return schema_id, {"data": {"login": "token"}}
+
+    fetch_data_mock = mocker.patch.object(
+        ProxySchema, "fetch_data", side_effect=fetch_data
+    )
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_remote_schema(
+        "http://graphql.example.com/store/", hedging=HedgingPolicy(0.01)
+    )
+    proxy_schema.get_final_schema()
+
+    await proxy_schema.root_resolver(
+        {}, None, None, parse('mutation { login(username: "a", password: "b") }')
+    )
+
+    assert fetch_data_mock.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_proxy_resolver_hedges_slow_query(mocker, schema, root_value):
+    calls = 0
+
+    async def post(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1)
+        return Response(status_code=200, json={"data": {"basic": "Success"}})
+
+    mocker.patch("ariadne_graphql_proxy.transport.AsyncClient.post", side_effect=post)
+
+    resolver = ProxyResolver(url=GRAPHQL_URL, hedging=HedgingPolicy(0.01))
+    set_resolver(schema, "Query", "basic", resolver)
+    root_value.pop("basic")
+
+    result = await graphql(
+        schema,
+        "{ basic }",
+        root_value=root_value,
+        context_value={"headers": {}},
+    )
+
+    assert result.data == {"basic": "Success"}
+    assert calls == 2
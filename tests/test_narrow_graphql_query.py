@@ -1,9 +1,14 @@
 from textwrap import dedent
 from typing import Dict, List
 
+import pytest
 from graphql import FragmentDefinitionNode, OperationDefinitionNode, parse, print_ast
 
 from ariadne_graphql_proxy import narrow_graphql_query
+from ariadne_graphql_proxy.narrow_graphql_query import (
+    NarrowedQueryCache,
+    get_narrowed_query,
+)
 
 
 class MockGraphQLResolveInfoPath:
@@ -491,3 +496,78 @@ def test_narrowed_query_inlines_fragments():
         """
         ).strip()
     )
+
+
+def test_narrowed_query_is_reused_for_every_list_item():
+    info = MockGraphQLResolveInfo(
+        ["items", 0, "field"],
+        "query Test($arg: Int) { items { field(arg: $arg) { id } other } }",
+    )
+    cache = NarrowedQueryCache()
+    narrowed_query = get_narrowed_query(info, cache)
+
+    info.path = MockGraphQLResolveInfoPath(["items", 1, "field"])
+    assert get_narrowed_query(info, cache) is narrowed_query
+    assert narrowed_query.variables == frozenset(["arg"])
+    assert (
+        narrowed_query.query
+        == dedent(
+            """
+        query Test($arg: Int) {
+          items {
+            field(arg: $arg) {
+              id
+            }
+          }
+        }
+        """
+        ).strip()
+    )
+
+
+def test_narrowed_query_is_reused_for_same_query_text():
+    cache = NarrowedQueryCache()
+    query = "{ items { field other } }"
+    narrowed_query = get_narrowed_query(MockGraphQLResolveInfo(["items"], query), cache)
+
+    assert (
+        get_narrowed_query(MockGraphQLResolveInfo(["items"], query), cache)
+        is narrowed_query
+    )
+
+
+def test_narrowed_query_is_not_reused_for_other_query_text():
+    cache = NarrowedQueryCache()
+    narrowed_query = get_narrowed_query(
+        MockGraphQLResolveInfo(["items"], "{ items { field other } }"), cache
+    )
+
+    assert (
+        get_narrowed_query(
+            MockGraphQLResolveInfo(["items"], "{ items { field } other }"), cache
+        )
+        is not narrowed_query
+    )
+
+
+def test_narrowed_query_is_not_cached_by_default():
+    info = MockGraphQLResolveInfo(["items"], "{ items { field other } }")
+
+    assert get_narrowed_query(info) is not get_narrowed_query(info)
+
+
+def test_narrowed_queries_cache_is_bounded():
+    cache = NarrowedQueryCache(2)
+    infos = [
+        MockGraphQLResolveInfo(["field"], query)
+        for query in ("{ field }", "{ field other }", "{ other field }")
+    ]
+    narrowed_queries = [get_narrowed_query(info, cache) for info in infos]
+
+    assert get_narrowed_query(infos[2], cache) is narrowed_queries[2]
+    assert get_narrowed_query(infos[0], cache) is not narrowed_queries[0]
+
+
+def test_narrowed_queries_cache_validates_max_size():
+    with pytest.raises(ValueError):
+        NarrowedQueryCache(0)
@@ -0,0 +1,248 @@
+import json
+
+import pytest
+from ariadne.graphql import graphql
+from ariadne.validation import cost_validator
+from graphql import GraphQLError, parse, specified_rules
+
+from ariadne_graphql_proxy import OperationRegistry, ProxySchema
+from ariadne_graphql_proxy.operation_registry import VALIDATION_RESULTS_CACHE_SIZE
+
+OPERATIONS = {
+    "GetBasic": "query GetBasic($arg: Generic) { basic(arg: $arg) other }",
+    "GetInvalid": "query GetInvalid { invalid }",
+}
+
+
+@pytest.fixture
+def registry():
+    return OperationRegistry(OPERATIONS)
+
+
+@pytest.fixture
+def proxy_schema(schema, other_schema, registry):
+    proxy_schema = ProxySchema(operation_registry=registry)
+    proxy_schema.add_schema(schema, "http://graphql.example.com/basic/")
+    proxy_schema.add_schema(other_schema, "http://graphql.example.com/other/")
+    proxy_schema.get_final_schema()
+    return proxy_schema
+
+
+def test_registry_parses_registered_operations(registry):
+    operation = registry.get_operation("GetBasic")
+
+    assert operation.query == OPERATIONS["GetBasic"]
+    assert operation.document.definitions[0].name.value == "GetBasic"
+
+
+def test_registry_raises_error_for_duplicate_operation_id(registry):
+    with pytest.raises(ValueError):
+        registry.register("GetBasic", "{ basic }")
+
+
+def test_registry_loads_operations_from_json_file(tmp_path):
+    manifest = tmp_path / "operations.json"
+    manifest.write_text(json.dumps({"GetBasic": "{ basic }"}))
+
+    registry = OperationRegistry()
+    registry.load_json(str(manifest))
+
+    assert registry.get_operation("GetBasic").query == "{ basic }"
+
+
+def test_registry_loads_operations_from_apollo_manifest(tmp_path):
+    manifest = tmp_path / "operations.json"
+    manifest.write_text(
+        json.dumps(
+            {
+                "format": "apollo-persisted-query-manifest",
+                "version": 1,
+                "operations": [
+                    {"id": "abc123", "name": "GetBasic", "body": "{ basic }"},
+                ],
+            }
+        )
+    )
+
+    registry = OperationRegistry()
+    registry.load_json(str(manifest))
+
+    assert registry.get_operation("abc123").query == "{ basic }"
+
+
+def test_registry_precomputes_query_plans(proxy_schema, registry):
+    operation = registry.get_operation("GetBasic")
+
+    assert operation.plan is not None
+    assert operation.plan.is_query
+    assert [
+        (subquery.schema_id, subquery.query, subquery.variables)
+        for subquery in operation.plan.subqueries
+    ] == [
+        (0, "query GetBasic($arg: Generic) {\n  basic(arg: $arg)\n}", {"arg"}),
+        (1, "query GetBasic {\n  other\n}", set()),
+    ]
+
+
+def test_registry_doesnt_create_plan_for_invalid_operation(proxy_schema, registry):
+    operation = registry.get_operation("GetInvalid")
+
+    assert operation.plan is None
+    assert operation.validation_results[tuple(specified_rules)]
+
+
+def test_registry_prepares_operation_registered_after_final_schema(
+    proxy_schema, registry
+):
+    operation = registry.register("GetOther", "{ other }")
+
+    assert operation.plan.subqueries[0].schema_id == 1
+
+
+def test_proxy_schema_uses_registered_query_plan(proxy_schema, registry):
+    operation = registry.get_operation("GetBasic")
+
+    assert proxy_schema.get_query_plan(operation.document) is operation.plan
+
+
+def test_proxy_schema_creates_query_plan_for_unregistered_document(
+    proxy_schema, registry
+):
+    document = parse(OPERATIONS["GetBasic"])
+
+    query_plan = proxy_schema.get_query_plan(document)
+
+    assert query_plan is not registry.get_operation("GetBasic").plan
+    assert len(query_plan.subqueries) == 2
+
+
+def test_query_parser_returns_document_for_operation_id(registry):
+    document = registry.query_parser(None, {"query": "GetBasic"})
+
+    assert document is registry.get_operation("GetBasic").document
+
+
+def test_query_parser_returns_document_for_registered_query(registry):
+    document = registry.query_parser(None, {"query": OPERATIONS["GetBasic"]})
+
+    assert document is registry.get_operation("GetBasic").document
+
+
+def test_query_parser_raises_error_for_unregistered_operation(registry):
+    with pytest.raises(GraphQLError):
+        registry.query_parser(None, {"query": "{ basic }"})
+
+
+def test_query_parser_parses_unregistered_operation_if_its_allowed():
+    registry = OperationRegistry(OPERATIONS, allow_unregistered=True)
+
+    document = registry.query_parser(None, {"query": "{ basic }"})
+
+    assert document.definitions[0].selection_set.selections[0].name.value == "basic"
+
+
+def test_query_validator_reuses_validation_result(proxy_schema, registry, mocker):
+    validate = mocker.patch("ariadne_graphql_proxy.operation_registry.validate")
+    document = registry.get_operation("GetBasic").document
+
+    errors = registry.query_validator(
+        proxy_schema.schema, document, rules=specified_rules
+    )
+
+    assert errors == []
+    validate.assert_not_called()
+
+
+def test_query_validator_doesnt_cache_results_of_dynamic_rules(proxy_schema, registry):
+    document = registry.get_operation("GetBasic").document
+
+    for _ in range(3):
+        rules = (*specified_rules, cost_validator(maximum_cost=10))
+        assert registry.query_validator(proxy_schema.schema, document, rules) == []
+
+    assert list(registry.get_operation("GetBasic").validation_results) == [
+        tuple(specified_rules)
+    ]
+
+
+def test_query_validator_limits_cached_results(proxy_schema, registry):
+    document = registry.get_operation("GetBasic").document
+
+    for rule in specified_rules[: VALIDATION_RESULTS_CACHE_SIZE + 2]:
+        registry.query_validator(proxy_schema.schema, document, (rule,))
+
+    assert (
+        len(registry.get_operation("GetBasic").validation_results)
+        == VALIDATION_RESULTS_CACHE_SIZE
+    )
+
+
+def test_query_validator_validates_unregistered_document(proxy_schema, registry):
+    errors = registry.query_validator(
+        proxy_schema.schema, parse("{ invalid }"), rules=specified_rules
+    )
+
+    assert errors
+
+
+@pytest.mark.asyncio
+async def test_registered_operation_is_executed_with_precomputed_plan(
+    proxy_schema, registry, mocker
+):
+    async def fetch_data(schema_id, context, url, headers, json):
+        if schema_id == 0:
+            return schema_id, {"data": {"basic": json["variables"]["arg"]}}
+        return schema_id, {"data": {"other": "Other"}}
+
+    fetch_data_mock = mocker.patch.object(
+        ProxySchema, "fetch_data", side_effect=fetch_data
+    )
+    plan_query = mocker.spy(proxy_schema.query_filter, "plan_query")
+
+    success, result = await graphql(
+        proxy_schema.schema,
+        {
+            "query": "GetBasic",
+            "operationName": "GetBasic",
+            "variables": {"arg": "Hello"},
+        },
+        context_value={},
+        root_value=proxy_schema.root_resolver,
+        query_parser=registry.query_parser,
+        query_validator=registry.query_validator,
+    )
+
+    assert success
+    assert result == {"data": {"basic": "Hello", "other": "Other"}}
+    assert fetch_data_mock.call_count == 2
+    plan_query.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_invalid_registered_operation_returns_validation_errors(
+    proxy_schema, registry
+):
+    success, result = await graphql(
+        proxy_schema.schema,
+        {"query": "GetInvalid"},
+        context_value={},
+        root_value=proxy_schema.root_resolver,
+        query_parser=registry.query_parser,
+        query_validator=registry.query_validator,
+    )
+
+    assert not success
+    assert "invalid" in result["errors"][0]["message"]
+
+
+def test_registry_precomputes_query_plan_for_every_operation(proxy_schema, registry):
+    operation = registry.register(
+        "GetMany", "query GetBasic { basic } query GetOther { other }"
+    )
+
+    assert operation.plan is None
+
+    basic_plan = registry.get_query_plan(operation.document, "GetBasic")
+    other_plan = registry.get_query_plan(operation.document, "GetOther")
+    assert basic_plan is operation.plans["GetBasic"]
+    assert [subquery.schema_id for subquery in other_plan.subqueries] == [1]
@@ -0,0 +1,214 @@
+import pytest
+from ariadne import make_executable_schema
+from graphql import parse
+
+from ariadne_graphql_proxy import (
+    CircuitBreaker,
+    LatencyOwnerPolicy,
+    PrimaryOwnerPolicy,
+    ProxySchema,
+    WeightedOwnerPolicy,
+)
+from ariadne_graphql_proxy.errors import UpstreamConnectionError
+from ariadne_graphql_proxy.fields_ownership import select_owner
+
+
+@pytest.fixture
+def mirror_schema():
+    return make_executable_schema(
+        """
+        scalar Generic
+
+        type Query {
+            basic(arg: Generic, other: Generic): String
+            mirror: String
+        }
+        """
+    )
+
+
+def create_proxy_schema(schema, mirror_schema, owner_policy=None):
+    proxy_schema = ProxySchema(owner_policy=owner_policy)
+    proxy_schema.add_schema(schema, "http://graphql.example.com/basic/")
+    proxy_schema.add_schema(mirror_schema, "http://graphql.example.com/mirror/")
+    proxy_schema.get_final_schema()
+    return proxy_schema
+
+
+def get_subqueries(query_plan):
+    return [(subquery.schema_id, subquery.query) for subquery in query_plan.subqueries]
+
+
+def test_select_owner_returns_first_owner_from_ranking():
+    assert select_owner(0b0110, (0, 2, 1)) == 0b0100
+    assert select_owner(0b0110, ()) == 0b0010
+
+
+def test_primary_owner_policy_ranks_schemas_by_order():
+    assert PrimaryOwnerPolicy().get_ranking(range(3)) == (0, 1, 2)
+    assert PrimaryOwnerPolicy([2, 0]).get_ranking(range(3)) == (2, 0, 1)
+
+
+def test_latency_owner_policy_ranks_schemas_by_average_latency():
+    owner_policy = LatencyOwnerPolicy(decay=0.5)
+    owner_policy.record_latency(0, 0.4)
+    owner_policy.record_latency(0, 0.2)
+    owner_policy.record_latency(1, 0.1)
+
+    assert owner_policy.latencies == {0: pytest.approx(0.3), 1: 0.1}
+    assert owner_policy.get_ranking(range(3)) == (2, 1, 0)
+
+
+def test_latency_owner_policy_validates_decay():
+    with pytest.raises(ValueError):
+        LatencyOwnerPolicy(decay=0)
+
+
+def test_latency_owner_policy_records_failure_as_penalty():
+    owner_policy = LatencyOwnerPolicy(decay=0.5, failure_penalty=2.0)
+    owner_policy.record_latency(0, 0.1)
+    owner_policy.record_latency(1, 0.2)
+    owner_policy.record_failure(0)
+
+    assert owner_policy.latencies == {0: pytest.approx(1.05), 1: 0.2}
+    assert owner_policy.get_ranking(range(2)) == (1, 0)
+
+
+def test_latency_owner_policy_validates_failure_penalty():
+    with pytest.raises(ValueError):
+        LatencyOwnerPolicy(failure_penalty=-1)
+
+
+def test_weighted_owner_policy_selects_schema_using_weights(mocker):
+    choices = mocker.patch(
+        "ariadne_graphql_proxy.owner_policy.choices", return_value=[1]
+    )
+    owner_policy = WeightedOwnerPolicy({0: 3, 1: 1})
+
+    assert owner_policy.get_ranking(range(3)) == (1, 0, 2)
+    choices.assert_called_once_with([0, 1, 2], [3, 1, 0.0])
+
+
+def test_weighted_owner_policy_validates_weights():
+    with pytest.raises(ValueError):
+        WeightedOwnerPolicy({0: -1})
+
+
+def test_shared_root_field_is_sent_to_all_owners_without_policy(schema, mirror_schema):
+    proxy_schema = create_proxy_schema(schema, mirror_schema)
+
+    query_plan = proxy_schema.get_query_plan(parse("{ basic mirror }"))
+
+    assert get_subqueries(query_plan) == [
+        (0, "{\n  basic\n}"),
+        (1, "{\n  basic\n  mirror\n}"),
+    ]
+
+
+def test_shared_root_field_is_sent_to_primary_owner(schema, mirror_schema):
+    proxy_schema = create_proxy_schema(
+        schema, mirror_schema, PrimaryOwnerPolicy([1, 0])
+    )
+
+    query_plan = proxy_schema.get_query_plan(parse("{ basic mirror }"))
+
+    assert get_subqueries(query_plan) == [(1, "{\n  basic\n  mirror\n}")]
+    assert query_plan.shared_fields_owners == (0b11,)
+
+
+def test_shared_root_field_in_fragment_is_sent_to_single_owner(schema, mirror_schema):
+    proxy_schema = create_proxy_schema(schema, mirror_schema, PrimaryOwnerPolicy())
+
+    query_plan = proxy_schema.get_query_plan(
+        parse("{ ...QueryFields mirror } fragment QueryFields on Query { basic }")
+    )
+
+    assert get_subqueries(query_plan) == [
+        (0, "{\n  basic\n}"),
+        (1, "{\n  mirror\n}"),
+    ]
+
+
+def test_query_plan_cache_key_includes_selected_owners(schema, mirror_schema):
+    owner_policy = LatencyOwnerPolicy()
+    proxy_schema = create_proxy_schema(schema, mirror_schema, owner_policy)
+    document = parse("{ basic }")
+
+    owner_policy.record_latency(0, 0.2)
+    owner_policy.record_latency(1, 0.1)
+    mirror_plan = proxy_schema.get_query_plan(document)
+
+    owner_policy.record_latency(1, 2.0)
+    basic_plan = proxy_schema.get_query_plan(document)
+
+    assert get_subqueries(mirror_plan) == [(1, "{\n  basic\n}")]
+    assert get_subqueries(basic_plan) == [(0, "{\n  basic\n}")]
+
+    owner_policy.latencies[1] = 0.1
+    assert proxy_schema.get_query_plan(document) is mirror_plan
+
+
+def test_query_plan_without_shared_fields_is_cached_once(schema, mirror_schema):
+    owner_policy = LatencyOwnerPolicy()
+    proxy_schema = create_proxy_schema(schema, mirror_schema, owner_policy)
+    document = parse("{ mirror }")
+
+    owner_policy.record_latency(1, 0.1)
+    query_plan = proxy_schema.get_query_plan(document)
+    owner_policy.record_latency(0, 0.01)
+
+    assert proxy_schema.get_query_plan(document) is query_plan
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_records_upstreams_latencies(schema, mirror_schema, mocker):
+    async def fetch_data(schema_id, context, url, headers, json):
+        return schema_id, {"data": {"basic": "Basic"}}
+
+    fetch_data_mock = mocker.patch.object(
+        ProxySchema, "fetch_data", side_effect=fetch_data
+    )
+
+    owner_policy = LatencyOwnerPolicy()
+    proxy_schema = create_proxy_schema(schema, mirror_schema, owner_policy)
+
+    root_value = await proxy_schema.root_resolver({}, None, None, parse("{ basic }"))
+
+    assert root_value == {"basic": "Basic"}
+    fetch_data_mock.assert_called_once()
+    assert list(owner_policy.latencies) == [0]
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_records_upstreams_failures(schema, mirror_schema, mocker):
+    mocker.patch.object(
+        ProxySchema,
+        "fetch_data",
+        side_effect=UpstreamConnectionError("Upstream request failed."),
+    )
+
+    owner_policy = LatencyOwnerPolicy(failure_penalty=5.0)
+    proxy_schema = create_proxy_schema(schema, mirror_schema, owner_policy)
+    await proxy_schema.root_resolver({}, None, None, parse("{ basic }"))
+
+    assert owner_policy.latencies == {0: 5.0}
+    assert get_subqueries(proxy_schema.get_query_plan(parse("{ basic }"))) == [
+        (1, "{\n  basic\n}")
+    ]
+
+
+def test_schema_with_open_circuit_is_ranked_last(schema, mirror_schema):
+    circuit_breaker = CircuitBreaker(min_calls=1, window_size=1)
+    proxy_schema = ProxySchema(owner_policy=PrimaryOwnerPolicy())
+    proxy_schema.add_schema(
+        schema, "http://graphql.example.com/basic/", circuit_breaker=circuit_breaker
+    )
+    proxy_schema.add_schema(mirror_schema, "http://graphql.example.com/mirror/")
+    proxy_schema.get_final_schema()
+
+    circuit_breaker.record(False, 0.1)
+
+    assert circuit_breaker.state == "open"
+    assert get_subqueries(proxy_schema.get_query_plan(parse("{ basic }"))) == [
+        (1, "{\n  basic\n}")
+    ]
@@ -0,0 +1,226 @@
+import json
+from hashlib import sha256
+
+import pytest
+from graphql import graphql, parse
+
+from ariadne_graphql_proxy import ProxyResolver, ProxySchema, set_resolver
+from ariadne_graphql_proxy.persisted_queries import (
+    get_persisted_query_payload,
+    get_query_hash,
+    is_persisted_query_not_found,
+)
+
+GRAPHQL_URL = "http://upstream.example.com/graphql/"
+QUERY_HASH = sha256(b"{\n  basic\n}").hexdigest()
+
+PERSISTED_QUERY_NOT_FOUND = {
+    "errors": [
+        {
+            "message": "PersistedQueryNotFound",
+            "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"},
+        }
+    ]
+}
+
+
+def test_get_query_hash_returns_sha256_of_query():
+    assert get_query_hash("{\n  basic\n}") == QUERY_HASH
+
+
+def test_get_query_hash_is_memoized():
+    get_query_hash.cache_clear()
+    get_query_hash("{ basic }")
+    get_query_hash("{ basic }")
+
+    assert get_query_hash.cache_info().hits == 1
+
+
+def test_persisted_query_payload_contains_hash_instead_of_query():
+    payload = get_persisted_query_payload(
+        {
+            "operationName": None,
+            "query": "{\n  basic\n}",
+            "variables": {"id": 1},
+        }
+    )
+
+    assert payload == {
+        "operationName": None,
+        "variables": {"id": 1},
+        "extensions": {
+            "persistedQuery": {"version": 1, "sha256Hash": QUERY_HASH},
+        },
+    }
+
+
+def test_persisted_query_payload_keeps_other_extensions():
+    payload = get_persisted_query_payload(
+        {"query": "{\n  basic\n}", "extensions": {"tracing": True}}
+    )
+
+    assert payload["extensions"]["tracing"] is True
+    assert payload["extensions"]["persistedQuery"]["sha256Hash"] == QUERY_HASH
+
+
+@pytest.mark.parametrize(
+    "response_json",
+    [
+        PERSISTED_QUERY_NOT_FOUND,
+        {"errors": [{"message": "PersistedQueryNotFound"}]},
+        {"errors": [{"message": "PersistedQueryNotSupported"}]},
+        {
+            "errors": [
+                {"message": "", "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"}}
+            ]
+        },
+    ],
+)
+def test_persisted_query_not_found_is_detected(response_json):
+    assert is_persisted_query_not_found(response_json)
+
+
+@pytest.mark.parametrize(
+    "response_json",
+    [
+        None,
+        {"data": {"basic": "Hello"}},
+        {"errors": [{"message": "Unknown field"}]},
+        {"errors": "PersistedQueryNotFound"},
+    ],
+)
+def test_other_responses_are_not_persisted_query_not_found(response_json):
+    assert not is_persisted_query_not_found(response_json)
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_sends_query_hash_to_upstream(httpx_mock, schema):
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"basic": "Hello"}})
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(schema, GRAPHQL_URL, persisted_queries=True)
+    proxy_schema.get_final_schema()
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("query { basic }")
+    )
+
+    assert root_value == {"basic": "Hello"}
+
+    request = httpx_mock.get_request()
+    assert json.loads(request.content) == {
+        "operationName": None,
+        "variables": None,
+        "extensions": {
+            "persistedQuery": {"version": 1, "sha256Hash": QUERY_HASH},
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_retries_with_query_if_upstream_doesnt_know_hash(
+    httpx_mock, schema
+):
+    httpx_mock.add_response(url=GRAPHQL_URL, json=PERSISTED_QUERY_NOT_FOUND)
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"basic": "Hello"}})
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(schema, GRAPHQL_URL, persisted_queries=True)
+    proxy_schema.get_final_schema()
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("query { basic }")
+    )
+
+    assert root_value == {"basic": "Hello"}
+
+    _, retry_request = httpx_mock.get_requests()
+    assert json.loads(retry_request.content) == {
+        "operationName": None,
+        "query": "{\n  basic\n}",
+        "variables": None,
+        "extensions": {
+            "persistedQuery": {"version": 1, "sha256Hash": QUERY_HASH},
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_sends_full_query_by_default(httpx_mock, schema):
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"basic": "Hello"}})
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(schema, GRAPHQL_URL)
+    proxy_schema.get_final_schema()
+
+    await proxy_schema.root_resolver({}, None, None, parse("query { basic }"))
+
+    request_json = json.loads(httpx_mock.get_request().content)
+    assert request_json["query"] == "{\n  basic\n}"
+    assert "extensions" not in request_json
+
+
+@pytest.mark.asyncio
+async def test_proxy_resolver_sends_query_hash_to_upstream(
+    httpx_mock, schema, root_value
+):
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"basic": "Hello"}})
+
+    resolver = ProxyResolver(url=GRAPHQL_URL, persisted_queries=True)
+    set_resolver(schema, "Query", "basic", resolver)
+    root_value.pop("basic")
+
+    result = await graphql(
+        schema, "{ basic }", root_value=root_value, context_value={"headers": {}}
+    )
+
+    assert result.data == {"basic": "Hello"}
+
+    request_json = json.loads(httpx_mock.get_request().content)
+    assert "query" not in request_json
+    assert request_json["extensions"]["persistedQuery"]["sha256Hash"]
+
+
+@pytest.mark.asyncio
+async def test_proxy_resolver_retries_with_query_if_upstream_doesnt_know_hash(
+    httpx_mock, schema, root_value
+):
+    httpx_mock.add_response(
+        url=GRAPHQL_URL, status_code=400, json=PERSISTED_QUERY_NOT_FOUND
+    )
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"basic": "Hello"}})
+
+    resolver = ProxyResolver(url=GRAPHQL_URL, persisted_queries=True)
+    set_resolver(schema, "Query", "basic", resolver)
+    root_value.pop("basic")
+
+    result = await graphql(
+        schema, "{ basic }", root_value=root_value, context_value={"headers": {}}
+    )
+
+    assert result.data == {"basic": "Hello"}
+
+    _, retry_request = httpx_mock.get_requests()
+    retry_json = json.loads(retry_request.content)
+    assert retry_json["query"]
+    assert retry_json["extensions"]["persistedQuery"]["sha256Hash"]
+
+
+@pytest.mark.asyncio
+async def test_proxy_resolver_raises_error_for_other_upstream_errors(
+    httpx_mock, schema, root_value
+):
+    httpx_mock.add_response(
+        url=GRAPHQL_URL, json={"errors": [{"message": "Unknown field"}]}
+    )
+
+    resolver = ProxyResolver(url=GRAPHQL_URL, persisted_queries=True)
+    set_resolver(schema, "Query", "basic", resolver)
+    root_value.pop("basic")
+
+    result = await graphql(
+        schema, "{ basic }", root_value=root_value, context_value={"headers": {}}
+    )
+
+    assert result.errors[0].message == "Upstream service error"
+    assert len(httpx_mock.get_requests()) == 1
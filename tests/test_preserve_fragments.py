@@ -0,0 +1,164 @@
+import pytest
+from ariadne import make_executable_schema
+from graphql import parse, print_ast
+
+from ariadne_graphql_proxy import ProxySchema
+
+
+@pytest.fixture
+def extra_schema():
+    return make_executable_schema(
+        """
+        scalar Generic
+
+        type Query {
+            extra: Complex
+        }
+
+        type Complex {
+            id: ID!
+            extra(arg: Generic): String!
+        }
+        """
+    )
+
+
+@pytest.fixture
+def proxy_schema(schema, other_schema, extra_schema):
+    proxy_schema = ProxySchema(preserve_fragments=True)
+    proxy_schema.add_schema(schema, "http://graphql.example.com/basic/")
+    proxy_schema.add_schema(other_schema, "http://graphql.example.com/other/")
+    proxy_schema.add_schema(extra_schema, "http://graphql.example.com/extra/")
+    proxy_schema.get_final_schema()
+    return proxy_schema
+
+
+def split_query(proxy_schema, query: str):
+    return [
+        (schema_id, print_ast(query_document), variables)
+        for schema_id, query_document, variables in (
+            proxy_schema.query_filter.split_query(parse(query))
+        )
+    ]
+
+
+def test_fragments_are_filtered_for_every_schema(proxy_schema):
+    assert split_query(
+        proxy_schema,
+        """
+        query GetComplex($arg: Generic) {
+            complex { ...ComplexFields group { id } }
+            extra { ...ComplexFields }
+        }
+
+        fragment ComplexFields on Complex {
+            id
+            name
+            extra(arg: $arg)
+        }
+        """,
+    ) == [
+        (
+            0,
+            "query GetComplex {\n"
+            "  complex {\n    ...ComplexFields\n    group {\n      id\n    }\n  }\n"
+            "}\n\n"
+            "fragment ComplexFields on Complex {\n  id\n  name\n}",
+            set(),
+        ),
+        (
+            2,
+            "query GetComplex($arg: Generic) {\n"
+            "  extra {\n    ...ComplexFields\n  }\n"
+            "}\n\n"
+            "fragment ComplexFields on Complex {\n  id\n  extra(arg: $arg)\n}",
+            {"arg"},
+        ),
+    ]
+
+
+def test_unchanged_fragment_definition_is_reused(proxy_schema):
+    document = parse(
+        "{ complex { ...ComplexFields } } fragment ComplexFields on Complex { name }"
+    )
+
+    ((_, query_document, _),) = proxy_schema.query_filter.split_query(document)
+
+    assert query_document.definitions[1] is document.definitions[1]
+
+
+def test_nested_fragments_are_included_in_document(proxy_schema):
+    assert split_query(
+        proxy_schema,
+        """
+        {
+            complex { ...ComplexFields }
+        }
+
+        fragment ComplexFields on Complex {
+            group { ...GroupFields }
+        }
+
+        fragment GroupFields on Group {
+            id
+            name
+        }
+        """,
+    ) == [
+        (
+            0,
+            "{\n  complex {\n    ...ComplexFields\n  }\n}\n\n"
+            "fragment GroupFields on Group {\n  id\n  name\n}\n\n"
+            "fragment ComplexFields on Complex {\n"
+            "  group {\n    ...GroupFields\n  }\n}",
+            set(),
+        )
+    ]
+
+
+def test_fragment_spread_is_skipped_for_schema_without_its_fields(proxy_schema):
+    assert split_query(
+        proxy_schema,
+        """
+        {
+            complex { id ...ExtraFields }
+        }
+
+        fragment ExtraFields on Complex {
+            extra
+        }
+        """,
+    ) == [(0, "{\n  complex {\n    id\n  }\n}", set())]
+
+
+def test_fragment_spread_is_kept_in_union(proxy_schema):
+    assert split_query(
+        proxy_schema,
+        """
+        {
+            unionField { ...ShippingFields }
+        }
+
+        fragment ShippingFields on Shipping {
+            id
+            name
+        }
+        """,
+    ) == [
+        (
+            0,
+            "{\n  unionField {\n    ...ShippingFields\n  }\n}\n\n"
+            "fragment ShippingFields on Shipping {\n  id\n  name\n}",
+            set(),
+        )
+    ]
+
+
+def test_root_type_fragments_are_inlined(proxy_schema):
+    assert split_query(
+        proxy_schema,
+        "{ ...QueryFields } fragment QueryFields on Query { basic other }",
+    ) == [
+        (0, "{\n  basic\n}", set()),
+        (1, "{\n  other\n}", set()),
+    ]
@@ -1,5 +1,6 @@
 import asyncio
-from unittest.mock import AsyncMock
+import json
+from unittest.mock import ANY, AsyncMock
 
 import pytest
 from graphql import graphql
@@ -7,6 +8,7 @@ from httpx import Response
 
 from ariadne_graphql_proxy import ProxyResolver, set_resolver, unset_resolver
 from ariadne_graphql_proxy.cache import InMemoryCache
+from ariadne_graphql_proxy.narrow_graphql_query import NarrowedQueryCache
 
 GRAPHQL_URL = "http://upstream.example.com/graphql/"
 
@@ -34,7 +36,7 @@ async def test_proxy_resolver_proxies_its_query_branch(
     post_mock = AsyncMock(
         return_value=Response(status_code=200, json={"data": {"basic": "Success"}}),
     )
-    mocker.patch("ariadne_graphql_proxy.proxy_resolver.AsyncClient.post", post_mock)
+    mocker.patch("ariadne_graphql_proxy.transport.AsyncClient.post", post_mock)
 
     result = await graphql(
         schema,
@@ -51,13 +53,14 @@ async def test_proxy_resolver_proxies_its_query_branch(
 
     post_mock.assert_called_with(
         GRAPHQL_URL,
-        headers=None,
-        json={
-            "operationName": None,
-            "query": "{\n  basic\n}",
-            "variables": {},
-        },
+        headers={"content-type": "application/json"},
+        content=ANY,
     )
+    assert json.loads(post_mock.call_args.kwargs["content"]) == {
+        "operationName": None,
+        "query": "{\n  basic\n}",
+        "variables": {},
+    }
 
 
 @pytest.mark.asyncio
@@ -83,7 +86,7 @@ async def test_proxy_resolver_proxies_specified_headers(
     post_mock = AsyncMock(
         return_value=Response(status_code=200, json={"data": {"basic": "Success"}}),
     )
-    mocker.patch("ariadne_graphql_proxy.proxy_resolver.AsyncClient.post", post_mock)
+    mocker.patch("ariadne_graphql_proxy.transport.AsyncClient.post", post_mock)
 
     result = await graphql(
         schema,
@@ -102,13 +105,14 @@ async def test_proxy_resolver_proxies_specified_headers(
 
     post_mock.assert_called_with(
         "http://upstream.example.com/graphql/",
-        headers={"authorization": auth_header},
-        json={
-            "operationName": None,
-            "query": "{\n  basic\n}",
-            "variables": {},
-        },
+        headers={"content-type": "application/json", "authorization": auth_header},
+        content=ANY,
     )
+    assert json.loads(post_mock.call_args.kwargs["content"]) == {
+        "operationName": None,
+        "query": "{\n  basic\n}",
+        "variables": {},
+    }
 
 
 @pytest.mark.asyncio
@@ -137,7 +141,7 @@ async def test_proxy_resolver_proxies_headers_via_callable(
     root_value.pop("basic")
 
     post_mock = mocker.patch(
-        "ariadne_graphql_proxy.proxy_resolver.AsyncClient.post",
+        "ariadne_graphql_proxy.transport.AsyncClient.post",
         return_value=Response(status_code=200, json={"data": {"basic": "Success"}}),
     )
 
@@ -158,13 +162,14 @@ async def test_proxy_resolver_proxies_headers_via_callable(
 
     post_mock.assert_called_with(
         "http://upstream.example.com/graphql/",
-        headers={"x-auth": auth_header},
-        json={
-            "operationName": None,
-            "query": "{\n  basic\n}",
-            "variables": {},
-        },
+        headers={"content-type": "application/json", "x-auth": auth_header},
+        content=ANY,
     )
+    assert json.loads(post_mock.call_args.kwargs["content"]) == {
+        "operationName": None,
+        "query": "{\n  basic\n}",
+        "variables": {},
+    }
 
 
 @pytest.mark.asyncio
@@ -184,7 +189,7 @@ async def test_proxy_resolver_with_cache_caches_result(
     root_value.pop("basic")
 
     post_mock = mocker.patch(
-        "ariadne_graphql_proxy.proxy_resolver.AsyncClient.post",
+        "ariadne_graphql_proxy.transport.AsyncClient.post",
         return_value=Response(status_code=200, json={"data": {"basic": "Success"}}),
     )
 
@@ -229,7 +234,7 @@ async def test_proxy_resolver_caches_results_with_ttl(
     root_value.pop("basic")
 
     post_mock = mocker.patch(
-        "ariadne_graphql_proxy.proxy_resolver.AsyncClient.post",
+        "ariadne_graphql_proxy.transport.AsyncClient.post",
         return_value=Response(status_code=200, json={"data": {"basic": "Success"}}),
     )
 
@@ -287,7 +292,7 @@ async def test_proxy_resolver_handles_error_text_response(
     root_value.pop("basic")
 
     mocker.patch(
-        "ariadne_graphql_proxy.proxy_resolver.AsyncClient.post",
+        "ariadne_graphql_proxy.transport.AsyncClient.post",
         return_value=Response(status_code=400, text="Not available"),
     )
 
@@ -326,7 +331,7 @@ async def test_proxy_resolver_handles_graphql_error_response(
     root_value.pop("basic")
 
     mocker.patch(
-        "ariadne_graphql_proxy.proxy_resolver.AsyncClient.post",
+        "ariadne_graphql_proxy.transport.AsyncClient.post",
         return_value=Response(status_code=400, json={"errors": ["invalid"]}),
     )
 
@@ -365,7 +370,7 @@ async def test_proxy_resolver_handles_graphql_partial_error_response(
     root_value.pop("basic")
 
     mocker.patch(
-        "ariadne_graphql_proxy.proxy_resolver.AsyncClient.post",
+        "ariadne_graphql_proxy.transport.AsyncClient.post",
         return_value=Response(
             status_code=400,
             json={
@@ -398,3 +403,32 @@ async def test_proxy_resolver_handles_graphql_partial_error_response(
         },
     }
     assert result.data == {"basic": None}
+
+
+@pytest.mark.asyncio
+async def test_proxy_resolver_reuses_narrowed_query_for_same_query_text(
+    mocker, schema, root_value
+):
+    set_resolver(schema, "Query", "basic", ProxyResolver(url=GRAPHQL_URL))
+    root_value.pop("basic")
+
+    post_mock = AsyncMock(
+        return_value=Response(status_code=200, json={"data": {"basic": "Success"}}),
+    )
+    mocker.patch("ariadne_graphql_proxy.transport.AsyncClient.post", post_mock)
+    cache_set = mocker.spy(NarrowedQueryCache, "set")
+
+    for _ in range(2):
+        result = await graphql(
+            schema, "{ basic }", root_value=root_value, context_value={"headers": {}}
+        )
+        assert result.data == {"basic": "Success"}
+
+    assert post_mock.call_count == 2
+    assert cache_set.call_count == 1
+
+
+def test_proxy_resolver_narrowed_queries_cache_can_be_disabled():
+    resolver = ProxyResolver(url=GRAPHQL_URL, narrowed_queries_cache_size=None)
+
+    assert resolver._narrowed_queries is None
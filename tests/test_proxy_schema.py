@@ -3,7 +3,7 @@ from textwrap import dedent
 from unittest.mock import ANY, Mock, call
 
 import pytest
-from graphql import GraphQLObjectType, parse, print_schema
+from graphql import GraphQLObjectType, graphql, parse, print_schema
 
 from ariadne_graphql_proxy import ProxyRootValue, ProxySchema
 
@@ -241,7 +241,7 @@ async def test_split_query_preserves_typename_under_interface(
     proxy_schema.get_final_schema()
     await proxy_schema.root_resolver(
         {},
-        "Query",
+        "Q",
         None,
         parse(
             """
@@ -261,7 +261,9 @@ async def test_split_query_preserves_typename_under_interface(
 
 
 @pytest.mark.asyncio
-async def test_split_query_preserves_root_introspection_fields(httpx_mock, schema_json):
+async def test_split_query_proxies_root_introspection_fields_if_enabled(
+    httpx_mock, schema_json
+):
     httpx_mock.add_response(json=schema_json)
     httpx_mock.add_response(
         json={
@@ -272,7 +274,7 @@ async def test_split_query_preserves_root_introspection_fields(httpx_mock, schem
         }
     )
 
-    proxy_schema = ProxySchema()
+    proxy_schema = ProxySchema(proxy_introspection=True)
     proxy_schema.add_remote_schema("http://graphql.example.com/")
     proxy_schema.get_final_schema()
     root_value = await proxy_schema.root_resolver(
@@ -307,6 +309,80 @@ async def test_split_query_preserves_root_introspection_fields(httpx_mock, schem
     assert payload["variables"] == {"typeName": "Complex"}
 
 
+@pytest.mark.asyncio
+async def test_root_introspection_fields_are_resolved_locally(
+    httpx_mock, schema_json, other_schema_json
+):
+    httpx_mock.add_response(url="http://graphql.example.com/1/", json=schema_json)
+    httpx_mock.add_response(url="http://graphql.example.com/2/", json=other_schema_json)
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_remote_schema("http://graphql.example.com/1/")
+    proxy_schema.add_remote_schema("http://graphql.example.com/2/")
+    final_schema = proxy_schema.get_final_schema()
+
+    result = await graphql(
+        final_schema,
+        """
+        query Introspection($typeName: String!) {
+          __typename
+          __schema {
+            queryType {
+              name
+            }
+          }
+          __type(name: $typeName) {
+            name
+          }
+        }
+        """,
+        root_value=proxy_schema.root_resolver,
+        context_value={},
+        variable_values={"typeName": "OtherComplex"},
+    )
+
+    assert not result.errors
+    assert result.data == {
+        "__typename": "Query",
+        "__schema": {"queryType": {"name": "Query"}},
+        "__type": {"name": "OtherComplex"},
+    }
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_root_typename_is_not_sent_to_upstreams(httpx_mock, schema_json):
+    httpx_mock.add_response(json=schema_json)
+    httpx_mock.add_response(json={"data": {"basic": "Lorem Ipsum"}})
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_remote_schema("http://graphql.example.com/")
+    proxy_schema.get_final_schema()
+
+    root_value = await proxy_schema.root_resolver(
+        {}, None, None, parse("{ __typename basic complex { __typename id } }")
+    )
+
+    assert root_value == {"basic": "Lorem Ipsum"}
+
+    upstream = httpx_mock.get_requests(url="http://graphql.example.com/")[-1]
+    payload = json.loads(upstream.content.decode())
+    assert (
+        payload["query"]
+        == dedent(
+            """
+        {
+          basic
+          complex {
+            __typename
+            id
+          }
+        }
+        """
+        ).strip()
+    )
+
+
 @pytest.mark.asyncio
 async def test_split_query_keeps_directives_and_directive_variables(
     httpx_mock, schema_json
@@ -0,0 +1,292 @@
+import asyncio
+
+import pytest
+from graphql import parse
+
+from ariadne_graphql_proxy import (
+    ForeignKeyResolver,
+    ProxyResolver,
+    ProxySchema,
+    ProxyTransport,
+    UpstreamSettings,
+    get_default_transport,
+)
+
+GRAPHQL_URL = "http://upstream.example.com/graphql/"
+
+
+def test_transport_reuses_client_for_same_upstream():
+    transport = ProxyTransport()
+
+    assert transport.get_client(GRAPHQL_URL) is transport.get_client(GRAPHQL_URL)
+
+
+def test_transport_creates_new_client_for_new_event_loop():
+    transport = ProxyTransport()
+
+    async def get_client():
+        return transport.get_client(GRAPHQL_URL)
+
+    client = asyncio.run(get_client())
+    other_client = asyncio.run(get_client())
+
+    assert other_client is not client
+
+
+def test_transport_client_created_outside_event_loop_is_used_in_loop():
+    transport = ProxyTransport()
+    client = transport.get_client(GRAPHQL_URL)
+
+    async def get_client():
+        return transport.get_client(GRAPHQL_URL)
+
+    assert asyncio.run(get_client()) is client
+
+
+def test_transport_shutdown_skips_clients_of_other_event_loops():
+    transport = ProxyTransport()
+
+    async def get_client():
+        return transport.get_client(GRAPHQL_URL)
+
+    client = asyncio.run(get_client())
+    asyncio.run(transport.shutdown())
+
+    assert not client.is_closed
+    assert not transport._clients
+
+
+def test_transport_uses_separate_clients_for_different_upstreams():
+    transport = ProxyTransport()
+
+    assert transport.get_client(GRAPHQL_URL) is not transport.get_client(
+        "http://other.example.com/graphql/"
+    )
+
+
+def test_transport_uses_default_settings_for_unconfigured_upstream():
+    transport = ProxyTransport(max_connections=42, keepalive_expiry=10.0)
+
+    settings = transport.get_upstream_settings(GRAPHQL_URL)
+    assert settings.max_connections == 42
+    assert settings.keepalive_expiry == 10.0
+
+
+def test_transport_uses_per_upstream_settings():
+    transport = ProxyTransport(
+        upstreams={GRAPHQL_URL: UpstreamSettings(max_connections=5)}
+    )
+    transport.configure_upstream(
+        "http://other.example.com/graphql/", max_keepalive_connections=2
+    )
+
+    assert transport.get_upstream_settings(GRAPHQL_URL).max_connections == 5
+    assert (
+        transport.get_upstream_settings(
+            "http://other.example.com/graphql/"
+        ).max_keepalive_connections
+        == 2
+    )
+
+
+@pytest.mark.asyncio
+async def test_transport_configure_upstream_raises_error_for_open_pool():
+    transport = ProxyTransport()
+    transport.get_client(GRAPHQL_URL)
+
+    with pytest.raises(ValueError):
+        transport.configure_upstream(GRAPHQL_URL, max_connections=5)
+
+    await transport.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_transport_startup_opens_configured_upstreams_pools():
+    transport = ProxyTransport(upstreams={GRAPHQL_URL: UpstreamSettings()})
+
+    await transport.startup()
+    client = transport.get_client(GRAPHQL_URL)
+    assert not client.is_closed
+
+    await transport.shutdown()
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_transport_creates_new_client_after_shutdown():
+    transport = ProxyTransport()
+    client = transport.get_client(GRAPHQL_URL)
+
+    await transport.shutdown()
+
+    assert transport.get_client(GRAPHQL_URL) is not client
+
+
+@pytest.mark.asyncio
+async def test_transport_lifespan_closes_clients_on_exit():
+    transport = ProxyTransport()
+
+    async with transport.lifespan():
+        client = transport.get_client(GRAPHQL_URL)
+        assert not client.is_closed
+
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_transport_wrapped_asgi_app_handles_lifespan_for_app_without_it():
+    transport = ProxyTransport()
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def app(scope, receive, send):
+        raise AssertionError("Lifespan should not reach wrapped app")
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    client = transport.get_client(GRAPHQL_URL)
+    await transport.wrap_asgi_app(app)({"type": "lifespan"}, receive, send)
+
+    assert sent == [
+        {"type": "lifespan.startup.complete"},
+        {"type": "lifespan.shutdown.complete"},
+    ]
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_transport_wrapped_asgi_app_forwards_lifespan_to_app():
+    transport = ProxyTransport()
+    transport.configure_upstream(GRAPHQL_URL)
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+    events = []
+
+    async def app(scope, receive, send):
+        assert scope == {"type": "lifespan"}
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                events.append(("startup", GRAPHQL_URL in transport._clients))
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                events.append(("shutdown", GRAPHQL_URL in transport._clients))
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await transport.wrap_asgi_app(app)({"type": "lifespan"}, receive, send)
+
+    assert events == [("startup", True), ("shutdown", True)]
+    assert sent == [
+        {"type": "lifespan.startup.complete"},
+        {"type": "lifespan.shutdown.complete"},
+    ]
+    assert not transport._clients
+
+
+@pytest.mark.asyncio
+async def test_transport_wrapped_asgi_app_reports_failed_startup(mocker):
+    transport = ProxyTransport()
+    mocker.patch.object(transport, "startup", side_effect=ValueError("No h2"))
+    sent = []
+
+    async def app(scope, receive, send):
+        await receive()
+        raise AssertionError("Startup should fail before app handles it")
+
+    async def receive():
+        return {"type": "lifespan.startup"}
+
+    async def send(message):
+        sent.append(message)
+
+    await transport.wrap_asgi_app(app)({"type": "lifespan"}, receive, send)
+
+    assert sent == [{"type": "lifespan.startup.failed", "message": "No h2"}]
+
+
+@pytest.mark.asyncio
+async def test_transport_wrapped_asgi_app_raises_app_lifespan_errors():
+    transport = ProxyTransport()
+
+    async def app(scope, receive, send):
+        await receive()
+        raise ValueError("App failed")
+
+    async def receive():
+        return {"type": "lifespan.startup"}
+
+    with pytest.raises(ValueError):
+        await transport.wrap_asgi_app(app)({"type": "lifespan"}, receive, None)
+
+
+@pytest.mark.asyncio
+async def test_transport_wrapped_asgi_app_passes_http_requests_to_app():
+    transport = ProxyTransport()
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["type"])
+
+    await transport.wrap_asgi_app(app)({"type": "http"}, None, None)
+
+    assert calls == ["http"]
+
+
+@pytest.mark.asyncio
+async def test_proxy_schema_reuses_transport_client_between_requests(
+    httpx_mock, mocker, schema_json
+):
+    httpx_mock.add_response(json=schema_json)
+    httpx_mock.add_response(json={"data": {"basic": "Lorem Ipsum"}})
+    httpx_mock.add_response(json={"data": {"basic": "Dolor Met"}})
+
+    transport = ProxyTransport()
+    create_client = mocker.spy(transport, "create_client")
+
+    proxy_schema = ProxySchema(transport=transport)
+    proxy_schema.add_remote_schema("http://graphql.example.com/")
+    proxy_schema.get_final_schema()
+
+    for _ in range(2):
+        await proxy_schema.root_resolver({}, None, None, parse("query { basic }"))
+
+    create_client.assert_called_once_with("http://graphql.example.com/")
+    await transport.shutdown()
+
+
+def test_proxy_resolvers_use_provided_transport():
+    transport = ProxyTransport()
+
+    proxy_resolver = ProxyResolver(GRAPHQL_URL, transport=transport)
+    foreign_key_resolver = ForeignKeyResolver(
+        GRAPHQL_URL,
+        "query GetOrder($id: ID!) { order(id: $id) { __FIELDS } }",
+        transport=transport,
+    )
+
+    assert proxy_resolver._transport is transport
+    assert foreign_key_resolver._transport is transport
+
+
+def test_proxy_resolvers_and_schema_share_default_transport():
+    proxy_resolver = ProxyResolver(GRAPHQL_URL)
+    foreign_key_resolver = ForeignKeyResolver(
+        GRAPHQL_URL,
+        "query GetOrder($id: ID!) { order(id: $id) { __FIELDS } }",
+    )
+
+    transport = get_default_transport()
+    assert proxy_resolver._transport is transport
+    assert foreign_key_resolver._transport is transport
+    assert ProxySchema().transport is transport
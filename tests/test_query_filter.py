@@ -0,0 +1,274 @@
+import pytest
+from ariadne import make_executable_schema
+from graphql import GraphQLError, parse, print_ast
+
+from ariadne_graphql_proxy import ProxySchema
+
+
+@pytest.fixture
+def extra_schema():
+    return make_executable_schema(
+        """
+        scalar Generic
+
+        type Query {
+            extra(arg: Generic): Complex
+        }
+
+        type Complex {
+            id: ID!
+            extra(arg: Generic): String!
+        }
+        """
+    )
+
+
+@pytest.fixture
+def proxy_schema(schema, other_schema, extra_schema, search_schema):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(schema, "http://graphql.example.com/basic/")
+    proxy_schema.add_schema(other_schema, "http://graphql.example.com/other/")
+    proxy_schema.add_schema(extra_schema, "http://graphql.example.com/extra/")
+    proxy_schema.add_schema(search_schema, "http://graphql.example.com/search/")
+    proxy_schema.add_foreign_key("OtherComplex", "group", "id")
+    proxy_schema.add_field_dependencies(2, "Complex", "extra", "{ name }")
+    proxy_schema.get_final_schema()
+    return proxy_schema
+
+
+def split_query(proxy_schema, document, operation_name=None):
+    return [
+        (schema_id, print_ast(query_document), variables)
+        for schema_id, query_document, variables in (
+            proxy_schema.query_filter.split_query(document, operation_name)
+        )
+    ]
+
+
+def print_query(query):
+    return print_ast(parse(query))
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (
+            "{ basic other }",
+            [(0, "{ basic }", set()), (1, "{ other }", set())],
+        ),
+        (
+            """
+            query GetData($arg: Generic) {
+                basic(arg: $arg)
+                extra(arg: $arg) { id }
+            }
+            """,
+            [
+                (0, "query GetData($arg: Generic) { basic(arg: $arg) }", {"arg"}),
+                (
+                    2,
+                    "query GetData($arg: Generic) { extra(arg: $arg) { id } }",
+                    {"arg"},
+                ),
+            ],
+        ),
+        (
+            """
+            query GetComplex($arg: Generic, $other: Generic) {
+                complex(arg: $arg) {
+                    id
+                    name(other: $other)
+                    extra
+                    group { id name }
+                }
+            }
+            """,
+            [
+                (
+                    0,
+                    """
+                    query GetComplex($arg: Generic, $other: Generic) {
+                        complex(arg: $arg) {
+                            id
+                            name(other: $other)
+                            group { id name }
+                        }
+                    }
+                    """,
+                    {"arg", "other"},
+                ),
+            ],
+        ),
+        (
+            """
+            query GetOtherComplex {
+                otherComplex {
+                    id
+                    group { id name rank }
+                }
+            }
+            """,
+            [
+                (
+                    1,
+                    "query GetOtherComplex { otherComplex { id group { id } } }",
+                    set(),
+                ),
+            ],
+        ),
+        (
+            """
+            query GetComplex {
+                complex { ...ComplexFields }
+                extra { ...ComplexFields }
+            }
+
+            fragment ComplexFields on Complex {
+                id
+                name
+                extra
+            }
+            """,
+            [
+                (0, "query GetComplex { complex { id name } }", set()),
+                (2, "query GetComplex { extra { id name extra } }", set()),
+            ],
+        ),
+        (
+            """
+            query GetUnion {
+                unionField {
+                    __typename
+                    ... on Shipping { id name }
+                    ... on Warehouse { id address }
+                }
+            }
+            """,
+            [
+                (
+                    0,
+                    """
+                    query GetUnion {
+                        unionField {
+                            __typename
+                            ... on Shipping { id name }
+                            ... on Warehouse { id address }
+                        }
+                    }
+                    """,
+                    set(),
+                ),
+            ],
+        ),
+        (
+            """
+            query Search($query: String!) {
+                search(query: $query) {
+                    id
+                    url
+                    ... on User { username email }
+                    ...OrderFields
+                }
+            }
+
+            fragment OrderFields on Order {
+                id
+            }
+            """,
+            [
+                (
+                    3,
+                    """
+                    query Search($query: String!) {
+                        search(query: $query) {
+                            id
+                            url
+                            ... on User { username email }
+                            id
+                        }
+                    }
+                    """,
+                    {"query"},
+                ),
+            ],
+        ),
+    ],
+)
+def test_split_query_returns_schemas_queries(proxy_schema, query, expected):
+    assert split_query(proxy_schema, parse(query)) == [
+        (schema_id, print_query(schema_query), variables)
+        for schema_id, schema_query, variables in expected
+    ]
+
+
+def test_split_query_visits_only_schemas_owning_fields(proxy_schema):
+    document = parse("query GetData($arg: Generic) { other extra(arg: $arg) { id } }")
+
+    assert split_query(proxy_schema, document) == [
+        (1, "query GetData {\n  other\n}", set()),
+        (
+            2,
+            "query GetData($arg: Generic) {\n  extra(arg: $arg) {\n    id\n  }\n}",
+            {"arg"},
+        ),
+    ]
+
+
+def test_split_query_splits_only_selected_operation(proxy_schema):
+    document = parse(
+        """
+        query GetBasic($arg: Generic) { basic(arg: $arg) }
+        query GetComplex($other: Generic) { ...ComplexFields other(other: $other) }
+        query GetExtra { extra { id extra } }
+
+        fragment ComplexFields on Query { complex { id } }
+        """
+    )
+
+    assert split_query(proxy_schema, document, "GetComplex") == [
+        (0, "query GetComplex {\n  complex {\n    id\n  }\n}", set()),
+        (
+            1,
+            "query GetComplex($other: Generic) {\n  other(other: $other)\n}",
+            {"other"},
+        ),
+    ]
+
+
+def test_split_query_raises_error_for_unknown_operation(proxy_schema):
+    document = parse("query GetBasic { basic } query GetOther { other }")
+
+    with pytest.raises(GraphQLError):
+        split_query(proxy_schema, document)
+
+    with pytest.raises(GraphQLError):
+        split_query(proxy_schema, document, "GetExtra")
+
+
+def get_root_selection(document):
+    return document.definitions[0].selection_set.selections[0]
+
+
+def test_split_query_copies_selections_with_removed_fields(proxy_schema):
+    document = parse("{ complex { id extra group { id name } } }")
+
+    [(_, query_document, _)] = proxy_schema.query_filter.split_query(document)
+
+    filtered_complex = get_root_selection(query_document)
+    original_complex = get_root_selection(document)
+    assert filtered_complex is not original_complex
+    assert (
+        filtered_complex.selection_set.selections[1]
+        is original_complex.selection_set.selections[2]
+    )
+
+
+def test_split_query_reuses_unchanged_selections(proxy_schema):
+    document = parse("{ complex { id group { id name } } other }")
+
+    ((schema_id, query_document, _), _) = proxy_schema.query_filter.split_query(
+        document
+    )
+
+    assert schema_id == 0
+    assert get_root_selection(query_document) is get_root_selection(document)
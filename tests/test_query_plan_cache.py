@@ -0,0 +1,217 @@
+import pytest
+from graphql import parse
+
+from ariadne_graphql_proxy import PrimaryOwnerPolicy, ProxySchema, QueryPlanCache
+from ariadne_graphql_proxy.query_plan import QueryPlan, get_query_plan_key
+
+
+@pytest.fixture
+def proxy_schema(schema, other_schema):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(schema, "http://graphql.example.com/basic/")
+    proxy_schema.add_schema(other_schema, "http://graphql.example.com/other/")
+    proxy_schema.get_final_schema()
+    return proxy_schema
+
+
+def test_query_plan_key_uses_query_text():
+    assert get_query_plan_key(parse("{ basic }")) == ("{ basic }", None)
+
+
+def test_query_plan_key_uses_printed_document_without_location():
+    assert get_query_plan_key(parse("{ basic }", no_location=True)) == (
+        "{\n  basic\n}",
+        None,
+    )
+
+
+def test_query_plan_key_is_different_for_different_documents():
+    assert get_query_plan_key(parse("{ basic }")) != get_query_plan_key(
+        parse("{ other }")
+    )
+
+
+def test_query_plan_key_ignores_operation_name_for_single_operation():
+    document = parse("query GetBasic { basic }")
+
+    assert get_query_plan_key(document, "GetBasic") == get_query_plan_key(document)
+
+
+def test_query_plan_key_includes_operation_name_for_multiple_operations():
+    document = parse("query GetBasic { basic } query GetOther { other }")
+
+    assert get_query_plan_key(document, "GetBasic") != get_query_plan_key(
+        document, "GetOther"
+    )
+
+
+def test_query_plan_cache_counts_hits_and_misses():
+    cache = QueryPlanCache()
+    query_plan = QueryPlan(parse("{ basic }"), [])
+
+    assert cache.get(("a", None)) is None
+    cache.set(("a", None), query_plan)
+    assert cache.get(("a", None)) is query_plan
+
+    assert cache.get_metrics() == {
+        "size": 1,
+        "max_size": 1000,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+    }
+
+
+def test_query_plan_cache_evicts_least_recently_used_plan():
+    cache = QueryPlanCache(max_size=2)
+    query_plan = QueryPlan(parse("{ basic }"), [])
+
+    cache.set(("a", None), query_plan)
+    cache.set(("b", None), query_plan)
+    cache.get(("a", None))
+    cache.set(("c", None), query_plan)
+
+    assert cache.get(("a", None)) is query_plan
+    assert cache.get(("b", None)) is None
+    assert cache.get(("c", None)) is query_plan
+    assert cache.evictions == 1
+
+
+def test_query_plan_cache_validates_max_size():
+    with pytest.raises(ValueError):
+        QueryPlanCache(max_size=0)
+
+
+def test_proxy_schema_reuses_cached_query_plan(proxy_schema, mocker):
+    plan_query = mocker.spy(proxy_schema.query_filter, "plan_query")
+
+    query_plan = proxy_schema.get_query_plan(parse("{ basic other }"))
+
+    assert proxy_schema.get_query_plan(parse("{ basic other }")) is query_plan
+    assert plan_query.call_count == 1
+    assert proxy_schema.query_plan_cache.hits == 1
+
+
+def test_proxy_schema_query_plan_cache_can_be_disabled(schema, mocker):
+    proxy_schema = ProxySchema(query_plan_cache_size=None)
+    proxy_schema.add_schema(schema, "http://graphql.example.com/basic/")
+    proxy_schema.get_final_schema()
+
+    plan_query = mocker.spy(proxy_schema.query_filter, "plan_query")
+
+    proxy_schema.get_query_plan(parse("{ basic }"))
+    proxy_schema.get_query_plan(parse("{ basic }"))
+
+    assert proxy_schema.query_plan_cache is None
+    assert plan_query.call_count == 2
+
+
+def test_proxy_schema_query_plan_cache_is_warmed_with_queries(proxy_schema, mocker):
+    proxy_schema.warm_query_plan_cache(
+        [
+            "{ basic }",
+            parse("query GetBasic { basic } query GetOther { other }"),
+        ]
+    )
+
+    plan_query = mocker.spy(proxy_schema.query_filter, "plan_query")
+
+    proxy_schema.get_query_plan(parse("{ basic }"))
+    proxy_schema.get_query_plan(
+        parse("query GetBasic { basic } query GetOther { other }"), "GetOther"
+    )
+
+    plan_query.assert_not_called()
+    assert proxy_schema.query_plan_cache.get_metrics()["size"] == 3
+
+
+def test_proxy_schema_query_plan_cache_is_warmed_with_variables(proxy_schema, mocker):
+    query = "query GetBasic($skip: Boolean!) { basic @skip(if: $skip) other }"
+    proxy_schema.warm_query_plan_cache([query], [{"skip": True}, {"skip": False}])
+
+    plan_query = mocker.spy(proxy_schema.query_filter, "plan_query")
+
+    skipped_plan = proxy_schema.get_query_plan(parse(query), None, {"skip": True})
+    query_plan = proxy_schema.get_query_plan(parse(query), None, {"skip": False})
+
+    plan_query.assert_not_called()
+    assert [s.schema_id for s in skipped_plan.subqueries] == [1]
+    assert [s.schema_id for s in query_plan.subqueries] == [0, 1]
+
+
+def test_proxy_schema_query_plan_cache_is_warmed_for_owners_ranking(
+    schema, other_schema, mocker
+):
+    proxy_schema = ProxySchema(owner_policy=PrimaryOwnerPolicy([1]))
+    proxy_schema.add_schema(schema, "http://graphql.example.com/basic/")
+    proxy_schema.add_schema(schema, "http://graphql.example.com/mirror/")
+    proxy_schema.get_final_schema()
+    proxy_schema.warm_query_plan_cache(["{ basic }"])
+
+    plan_query = mocker.spy(proxy_schema.query_filter, "plan_query")
+
+    query_plan = proxy_schema.get_query_plan(parse("{ basic }"))
+
+    plan_query.assert_not_called()
+    assert [s.schema_id for s in query_plan.subqueries] == [1]
+
+
+def test_proxy_schema_warming_disabled_query_plan_cache_raises_error():
+    proxy_schema = ProxySchema(query_plan_cache_size=None)
+
+    with pytest.raises(RuntimeError):
+        proxy_schema.warm_query_plan_cache(["{ basic }"])
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_uses_cached_query_plan(proxy_schema, mocker):
+    async def fetch_data(schema_id, context, url, headers, json):
+        if schema_id == 0:
+            return schema_id, {"data": {"basic": "Basic"}}
+        return schema_id, {"data": {"other": "Other"}}
+
+    mocker.patch.object(ProxySchema, "fetch_data", side_effect=fetch_data)
+    plan_query = mocker.spy(proxy_schema.query_filter, "plan_query")
+
+    for _ in range(3):
+        root_value = await proxy_schema.root_resolver(
+            {}, None, None, parse("{ basic other }")
+        )
+        assert root_value == {"basic": "Basic", "other": "Other"}
+
+    assert plan_query.call_count == 1
+
+
+def test_proxy_schema_creates_query_plan_for_selected_operation(proxy_schema):
+    document = parse("query GetBasic { basic } query GetOther { other }")
+
+    basic_plan = proxy_schema.get_query_plan(document, "GetBasic")
+    other_plan = proxy_schema.get_query_plan(document, "GetOther")
+
+    assert basic_plan.operation.name.value == "GetBasic"
+    assert [subquery.query for subquery in basic_plan.subqueries] == [
+        "query GetBasic {\n  basic\n}"
+    ]
+    assert [subquery.query for subquery in other_plan.subqueries] == [
+        "query GetOther {\n  other\n}"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_sends_only_selected_operation(proxy_schema, mocker):
+    async def fetch_data(schema_id, context, url, headers, json):
+        return schema_id, {"data": {"other": "Other"}}
+
+    fetch_data_mock = mocker.patch.object(
+        ProxySchema, "fetch_data", side_effect=fetch_data
+    )
+
+    root_value = await proxy_schema.root_resolver(
+        {},
+        "GetOther",
+        None,
+        parse("query GetBasic { basic } query GetOther { other }"),
+    )
+
+    assert root_value == {"other": "Other"}
+    fetch_data_mock.assert_called_once()
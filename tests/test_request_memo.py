@@ -0,0 +1,188 @@
+import asyncio
+
+import pytest
+from ariadne import make_executable_schema
+from ariadne.graphql import graphql
+
+from ariadne_graphql_proxy import ForeignKeyResolver, set_resolver
+from ariadne_graphql_proxy.request_memo import REQUEST_MEMO_CONTEXT_KEY, run_memoized
+
+GRAPHQL_URL = "http://upstream.example.com/graphql/"
+
+ORDER_TEMPLATE = """
+query GetOrder($id: ID!) {
+    order(id: $id) {
+        __FIELDS
+    }
+}
+"""
+
+
+@pytest.mark.asyncio
+async def test_run_memoized_shares_result_in_context():
+    context: dict = {}
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return calls
+
+    assert await run_memoized(context, "key", fetch) == 1
+    assert await run_memoized(context, "key", fetch) == 1
+    assert calls == 1
+    assert list(context[REQUEST_MEMO_CONTEXT_KEY]) == ["key"]
+
+
+@pytest.mark.asyncio
+async def test_run_memoized_doesnt_share_result_between_contexts():
+    async def fetch():
+        return object()
+
+    assert await run_memoized({}, "key", fetch) is not await run_memoized(
+        {}, "key", fetch
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_memoized_doesnt_share_result_between_different_keys():
+    context: dict = {}
+
+    async def fetch(value):
+        return value
+
+    assert await run_memoized(context, "a", lambda: fetch("a")) == "a"
+    assert await run_memoized(context, "b", lambda: fetch("b")) == "b"
+
+
+@pytest.mark.asyncio
+async def test_run_memoized_calls_function_for_context_that_is_not_dict():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await run_memoized(None, "key", fetch) == 1
+    assert await run_memoized(None, "key", fetch) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_memoized_call_is_not_cancelled_with_one_of_waiting_tasks():
+    context: dict = {}
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    first = asyncio.create_task(run_memoized(context, "key", fetch))
+    second = asyncio.create_task(run_memoized(context, "key", fetch))
+    await asyncio.sleep(0)
+
+    first.cancel()
+
+    assert await second == "result"
+
+
+@pytest.fixture
+def items_schema():
+    schema = make_executable_schema(
+        """
+        type Query {
+            items: [Item!]!
+        }
+
+        type Mutation {
+            createItems: [Item!]!
+        }
+
+        type Item {
+            order: Order
+        }
+
+        type Order {
+            id: ID!
+        }
+        """
+    )
+    items = [{"order": {"id": "1"}}, {"order": {"id": "2"}}, {"order": {"id": "1"}}]
+    schema.query_type.fields["items"].resolve = lambda *_: items
+    schema.mutation_type.fields["createItems"].resolve = lambda *_: items
+    return schema
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_resolver_memoizes_identical_queries(
+    httpx_mock, items_schema
+):
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"order": {"id": "1"}}})
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"order": {"id": "2"}}})
+
+    set_resolver(
+        items_schema, "Item", "order", ForeignKeyResolver(GRAPHQL_URL, ORDER_TEMPLATE)
+    )
+
+    success, data = await graphql(
+        items_schema,
+        {"query": "{ items { order { id } } }"},
+        context_value={"headers": {}},
+    )
+
+    assert success
+    assert data == {
+        "data": {
+            "items": [
+                {"order": {"id": "1"}},
+                {"order": {"id": "2"}},
+                {"order": {"id": "1"}},
+            ]
+        }
+    }
+    assert len(httpx_mock.get_requests(url=GRAPHQL_URL)) == 2
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_resolver_doesnt_memoize_queries_if_disabled(
+    httpx_mock, items_schema
+):
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"order": {"id": "1"}}})
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"order": {"id": "2"}}})
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"order": {"id": "1"}}})
+
+    set_resolver(
+        items_schema,
+        "Item",
+        "order",
+        ForeignKeyResolver(GRAPHQL_URL, ORDER_TEMPLATE, memoize_requests=False),
+    )
+
+    success, _ = await graphql(
+        items_schema,
+        {"query": "{ items { order { id } } }"},
+        context_value={"headers": {}},
+    )
+
+    assert success
+    assert len(httpx_mock.get_requests(url=GRAPHQL_URL)) == 3
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_resolver_doesnt_memoize_mutations(httpx_mock, items_schema):
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"order": {"id": "1"}}})
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"order": {"id": "2"}}})
+    httpx_mock.add_response(url=GRAPHQL_URL, json={"data": {"order": {"id": "1"}}})
+
+    set_resolver(
+        items_schema, "Item", "order", ForeignKeyResolver(GRAPHQL_URL, ORDER_TEMPLATE)
+    )
+
+    success, _ = await graphql(
+        items_schema,
+        {"query": "mutation { createItems { order { id } } }"},
+        context_value={"headers": {}},
+    )
+
+    assert success
+    assert len(httpx_mock.get_requests(url=GRAPHQL_URL)) == 3
@@ -0,0 +1,306 @@
+import asyncio
+
+import pytest
+from graphql import graphql, parse
+from httpx import Response
+
+from ariadne_graphql_proxy import (
+    ForeignKeyResolver,
+    ProxyResolver,
+    ProxySchema,
+    set_resolver,
+)
+from ariadne_graphql_proxy.singleflight import SingleFlight, get_request_key
+
+GRAPHQL_URL = "http://upstream.example.com/graphql/"
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_result_between_concurrent_calls():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"data": calls}
+
+    results = await asyncio.gather(*[single_flight.run("key", fetch) for _ in range(5)])
+
+    assert calls == 1
+    assert results == [{"data": 1}] * 5
+    assert not single_flight._calls
+
+
+@pytest.mark.asyncio
+async def test_single_flight_doesnt_share_result_between_different_keys():
+    single_flight = SingleFlight()
+
+    async def fetch(value):
+        await asyncio.sleep(0)
+        return value
+
+    results = await asyncio.gather(
+        single_flight.run("a", lambda: fetch("a")),
+        single_flight.run("b", lambda: fetch("b")),
+    )
+
+    assert results == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_doesnt_share_result_between_sequential_calls():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await single_flight.run("key", fetch) == 1
+    assert await single_flight.run("key", fetch) == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_exception_between_concurrent_calls():
+    single_flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("Upstream failed")
+
+    results = await asyncio.gather(
+        single_flight.run("key", fetch),
+        single_flight.run("key", fetch),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not single_flight._calls
+
+
+@pytest.mark.asyncio
+async def test_single_flight_call_is_not_cancelled_with_one_of_waiting_tasks():
+    single_flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    first = asyncio.create_task(single_flight.run("key", fetch))
+    second = asyncio.create_task(single_flight.run("key", fetch))
+    await asyncio.sleep(0)
+
+    first.cancel()
+
+    assert await second == "result"
+
+
+def test_request_key_ignores_variables_and_headers_order():
+    assert get_request_key(
+        0, {"query": "{ a }", "variables": {"a": 1, "b": 2}}, {"x": "1", "y": "2"}
+    ) == get_request_key(
+        0, {"query": "{ a }", "variables": {"b": 2, "a": 1}}, {"y": "2", "x": "1"}
+    )
+
+
+def test_request_key_includes_headers():
+    assert get_request_key(0, {"query": "{ a }"}, {"authorization": "a"}) != (
+        get_request_key(0, {"query": "{ a }"}, {"authorization": "b"})
+    )
+
+
+@pytest.fixture
+def slow_fetch_data(mocker):
+    async def fetch_data(schema_id, context, url, headers, json):
+        await asyncio.sleep(0.01)
+        return schema_id, {"data": {"basic": "Lorem Ipsum"}}
+
+    return mocker.patch.object(ProxySchema, "fetch_data", side_effect=fetch_data)
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_coalesces_identical_concurrent_queries(
+    schema, slow_fetch_data
+):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(
+        schema, "http://graphql.example.com/", coalesce_requests=True
+    )
+    proxy_schema.get_final_schema()
+
+    results = await asyncio.gather(
+        *[
+            proxy_schema.root_resolver({}, None, None, parse("query { basic }"))
+            for _ in range(3)
+        ]
+    )
+
+    assert results == [{"basic": "Lorem Ipsum"}] * 3
+    assert slow_fetch_data.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_doesnt_coalesce_queries_by_default(
+    schema, slow_fetch_data
+):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(schema, "http://graphql.example.com/")
+    proxy_schema.get_final_schema()
+
+    await asyncio.gather(
+        *[
+            proxy_schema.root_resolver({}, None, None, parse("query { basic }"))
+            for _ in range(3)
+        ]
+    )
+
+    assert slow_fetch_data.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_doesnt_coalesce_queries_with_different_headers(
+    schema, slow_fetch_data
+):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(
+        schema,
+        "http://graphql.example.com/",
+        lambda context: {"authorization": context["token"]},
+        coalesce_requests=True,
+    )
+    proxy_schema.get_final_schema()
+
+    await asyncio.gather(
+        proxy_schema.root_resolver({"token": "a"}, None, None, parse("{ basic }")),
+        proxy_schema.root_resolver({"token": "b"}, None, None, parse("{ basic }")),
+    )
+
+    assert slow_fetch_data.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_doesnt_coalesce_mutations(
+    httpx_mock, store_schema_json, mocker
+):
+    httpx_mock.add_response(json=store_schema_json)
+
+    async def fetch_data(schema_id, context, url, headers, json):
+        await asyncio.sleep(0.01)
+        return schema_id, {"data": {"login": "token"}}
+
+    fetch_data_mock = mocker.patch.object(
+        ProxySchema, "fetch_data", side_effect=fetch_data
+    )
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_remote_schema(
+        "http://graphql.example.com/store/", coalesce_requests=True
+    )
+    proxy_schema.get_final_schema()
+
+    mutation = parse('mutation { login(username: "a", password: "b") }')
+    await asyncio.gather(
+        proxy_schema.root_resolver({}, None, None, mutation),
+        proxy_schema.root_resolver({}, None, None, mutation),
+    )
+
+    assert fetch_data_mock.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_doesnt_mutate_errors_shared_between_requests(
+    schema, mocker
+):
+    errors = [{"message": "Error", "path": ["basic"]}]
+
+    async def fetch_data(schema_id, context, url, headers, json):
+        await asyncio.sleep(0.01)
+        return schema_id, {"data": {"basic": None}, "errors": errors}
+
+    mocker.patch.object(ProxySchema, "fetch_data", side_effect=fetch_data)
+
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(
+        schema, "http://graphql.example.com/", label="test", coalesce_requests=True
+    )
+    proxy_schema.get_final_schema()
+
+    results = await asyncio.gather(
+        proxy_schema.root_resolver({}, None, None, parse("{ basic }")),
+        proxy_schema.root_resolver({}, None, None, parse("{ basic }")),
+    )
+
+    for result in results:
+        assert result.errors == [{"message": "Error", "path": ["test", "basic"]}]
+    assert errors == [{"message": "Error", "path": ["basic"]}]
+
+
+@pytest.fixture
+def slow_post(mocker):
+    async def post(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return Response(status_code=200, json={"data": {"basic": "Success"}})
+
+    return mocker.patch(
+        "ariadne_graphql_proxy.transport.AsyncClient.post", side_effect=post
+    )
+
+
+@pytest.mark.asyncio
+async def test_proxy_resolver_coalesces_identical_concurrent_queries(
+    schema, root_value, slow_post
+):
+    resolver = ProxyResolver(url=GRAPHQL_URL, coalesce_requests=True)
+    set_resolver(schema, "Query", "basic", resolver)
+    root_value.pop("basic")
+
+    results = await asyncio.gather(
+        *[
+            graphql(
+                schema,
+                "{ basic }",
+                root_value=root_value,
+                context_value={"headers": {}},
+            )
+            for _ in range(3)
+        ]
+    )
+
+    assert all(result.data == {"basic": "Success"} for result in results)
+    assert slow_post.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_proxy_resolver_doesnt_coalesce_queries_by_default(
+    schema, root_value, slow_post
+):
+    resolver = ProxyResolver(url=GRAPHQL_URL)
+    set_resolver(schema, "Query", "basic", resolver)
+    root_value.pop("basic")
+
+    await asyncio.gather(
+        *[
+            graphql(
+                schema,
+                "{ basic }",
+                root_value=root_value,
+                context_value={"headers": {}},
+            )
+            for _ in range(3)
+        ]
+    )
+
+    assert slow_post.call_count == 3
+
+
+def test_foreign_key_resolver_accepts_coalesce_requests_option():
+    resolver = ForeignKeyResolver(
+        GRAPHQL_URL,
+        "query GetOrder($id: ID!) { order(id: $id) { __FIELDS } }",
+        coalesce_requests=True,
+    )
+
+    assert resolver._singleflight is not None
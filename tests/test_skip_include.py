@@ -0,0 +1,211 @@
+import pytest
+from ariadne import graphql
+from graphql import parse
+
+from ariadne_graphql_proxy import ProxySchema
+from ariadne_graphql_proxy.skip_include import (
+    get_directives_values,
+    get_directives_variables,
+    is_selection_excluded,
+)
+
+
+@pytest.fixture
+def proxy_schema(schema, other_schema):
+    proxy_schema = ProxySchema()
+    proxy_schema.add_schema(schema, "http://graphql.example.com/basic/")
+    proxy_schema.add_schema(other_schema, "http://graphql.example.com/other/")
+    proxy_schema.get_final_schema()
+    return proxy_schema
+
+
+def get_selection(query: str):
+    return parse(query).definitions[0].selection_set.selections[0]
+
+
+@pytest.mark.parametrize(
+    "query, excluded",
+    [
+        ("{ basic @skip(if: true) }", True),
+        ("{ basic @skip(if: false) }", False),
+        ("{ basic @include(if: false) }", True),
+        ("{ basic @include(if: true) }", False),
+        ("{ basic @skip(if: $yes) }", True),
+        ("{ basic @include(if: $no) }", True),
+        ("{ basic @include(if: $yes) @skip(if: $no) }", False),
+        ("{ basic @include(if: $unknown) }", False),
+        ("{ ... on Query @include(if: $no) { basic } }", True),
+        ("{ ...Fragment @skip(if: $yes) }", True),
+    ],
+)
+def test_selection_is_excluded_by_skip_and_include_directives(query, excluded):
+    directives_values = {"yes": True, "no": False}
+
+    assert is_selection_excluded(get_selection(query), directives_values) is excluded
+
+
+def test_directives_values_are_read_from_variables_and_defaults():
+    operation = parse(
+        "query Q($a: Boolean!, $b: Boolean = true, $c: Boolean, $d: String) { basic }"
+    ).definitions[0]
+
+    assert get_directives_values(operation, {"a": False, "d": "text"}) == {
+        "a": False,
+        "b": True,
+    }
+
+
+def test_directives_variables_are_collected_from_operation_and_fragments():
+    document = parse(
+        """
+        query Q($a: Boolean!, $b: Boolean!, $c: Boolean!) {
+            basic @include(if: $a)
+            complex {
+                ...ComplexFields
+            }
+        }
+
+        fragment ComplexFields on Complex {
+            id @skip(if: $b)
+            name(arg: $c)
+        }
+        """
+    )
+
+    assert get_directives_variables(document, document.definitions[0]) == {"a", "b"}
+
+
+def test_query_plan_skips_statically_excluded_fields(proxy_schema):
+    document = parse(
+        """
+        query Q($withOther: Boolean!) {
+            basic
+            complex @skip(if: true) { id }
+            other @include(if: $withOther)
+        }
+        """
+    )
+
+    query_plan = proxy_schema.get_query_plan(document, None, {"withOther": False})
+
+    assert [subquery.query for subquery in query_plan.subqueries] == [
+        "query Q {\n  basic\n}"
+    ]
+    assert query_plan.directives_variables == ("withOther",)
+
+
+COMPLEX_TYPENAME_QUERY = "query Q {\n  complex {\n    __typename\n  }\n}"
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (
+            "query Q($x: Boolean!) { other complex { name @include(if: $x) } }",
+            COMPLEX_TYPENAME_QUERY,
+        ),
+        (
+            "query Q($x: Boolean!) { other complex { ... @include(if: $x) { name } } }",
+            COMPLEX_TYPENAME_QUERY,
+        ),
+        (
+            """
+            query Q($x: Boolean!) { other complex { ...ComplexFields } }
+            fragment ComplexFields on Complex { name @include(if: $x) }
+            """,
+            COMPLEX_TYPENAME_QUERY,
+        ),
+        (
+            "query Q($x: Boolean!) { other complex { group { name @skip(if: $x) } } }",
+            "query Q {\n  complex {\n    group {\n      __typename\n    }\n  }\n}",
+        ),
+    ],
+)
+def test_query_plan_keeps_field_with_all_subfields_excluded(
+    proxy_schema, query, expected
+):
+    directives_values = {"x": "@skip" in query}
+    query_plan = proxy_schema.get_query_plan(parse(query), None, directives_values)
+
+    assert [subquery.query for subquery in query_plan.subqueries] == [
+        expected,
+        "query Q {\n  other\n}",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_returns_field_with_all_subfields_excluded(
+    proxy_schema, mocker
+):
+    async def fetch_data(schema_id, context, url, headers, json):
+        if schema_id == 0:
+            return schema_id, {"data": {"complex": {"__typename": "Complex"}}}
+        return schema_id, {"data": {"other": "Other"}}
+
+    mocker.patch.object(ProxySchema, "fetch_data", side_effect=fetch_data)
+
+    success, result = await graphql(
+        proxy_schema.schema,
+        {
+            "query": (
+                "query Q($x: Boolean!) { other complex { name @include(if: $x) } }"
+            ),
+            "variables": {"x": False},
+        },
+        context_value={},
+        root_value=proxy_schema.root_resolver,
+    )
+
+    assert success
+    assert result == {"data": {"other": "Other", "complex": {}}}
+
+
+def test_query_plan_keeps_included_fields_with_directives(proxy_schema):
+    document = parse("query Q($withOther: Boolean!) { other @include(if: $withOther) }")
+
+    query_plan = proxy_schema.get_query_plan(document, None, {"withOther": True})
+
+    assert [subquery.query for subquery in query_plan.subqueries] == [
+        "query Q($withOther: Boolean!) {\n  other @include(if: $withOther)\n}"
+    ]
+
+
+def test_query_plan_cache_key_includes_directives_variables_values(proxy_schema):
+    document = parse(
+        "query Q($withOther: Boolean!) { basic other @include(if: $withOther) }"
+    )
+
+    without_other = proxy_schema.get_query_plan(document, None, {"withOther": False})
+    with_other = proxy_schema.get_query_plan(document, None, {"withOther": True})
+
+    assert without_other is not with_other
+    assert len(without_other.subqueries) == 1
+    assert len(with_other.subqueries) == 2
+
+    assert (
+        proxy_schema.get_query_plan(document, None, {"withOther": False})
+        is without_other
+    )
+    assert proxy_schema.query_plan_cache.get_metrics()["size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_root_resolver_doesnt_call_upstream_with_excluded_fields(
+    proxy_schema, mocker
+):
+    async def fetch_data(schema_id, context, url, headers, json):
+        return schema_id, {"data": {"basic": "Basic"}}
+
+    fetch_data_mock = mocker.patch.object(
+        ProxySchema, "fetch_data", side_effect=fetch_data
+    )
+
+    root_value = await proxy_schema.root_resolver(
+        {},
+        None,
+        {"withOther": False},
+        parse("query Q($withOther: Boolean!) { basic other @include(if: $withOther) }"),
+    )
+
+    assert root_value == {"basic": "Basic"}
+    fetch_data_mock.assert_called_once()